@@ -7,8 +7,14 @@ import os
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY', '').strip()
 GROQ_MODEL = os.environ.get('GROQ_MODEL', 'llama-3.3-70b-versatile')
 GROQ_TEMPERATURE = float(os.environ.get('GROQ_TEMPERATURE', '0.3'))
+# Teto de max_tokens: cada análise usa o orçamento proporcional ao código
 GROQ_MAX_TOKENS = int(os.environ.get('GROQ_MAX_TOKENS', '2000'))
 
+# Limites de tamanho do código (acima de CHUNK_CHARS a análise é feita em trechos)
+MAX_CODE_CHARS = int(os.environ.get('MAX_CODE_CHARS', '200000'))
+CHUNK_CHARS = int(os.environ.get('CHUNK_CHARS', '6000'))
+CHUNK_WORKERS = int(os.environ.get('CHUNK_WORKERS', '4'))
+
 # Debug
 print(f"\n{'='*60}")
 print("CONFIG MODULE - Variáveis carregadas:")
@@ -19,28 +25,54 @@ if GROQ_API_KEY:
 print(f"  GROQ_MODEL: {GROQ_MODEL}")
 print(f"{'='*60}\n")
 
-# Inicializar cliente Groq
-client = None
-if GROQ_API_KEY and len(GROQ_API_KEY) > 10:
+# Clientes Groq (um por chave do pool) criados no primeiro uso: importar o
+# SDK custa ~200ms e não deve entrar no cold start da função serverless
+_clients = {}
+
+
+def get_client(key=None):
+    """Retorna o cliente Groq da chave (padrão GROQ_API_KEY; None sem chave), criando-o sob demanda"""
+    key = key or GROQ_API_KEY
+    if key in _clients or not (key and len(key) > 10):
+        return _clients.get(key)
+    client = None
     try:
         from groq import Groq
-        # Inicializar apenas com api_key (sem argumentos extras)
+        # Retries ficam com o ResilientCaller (backoff com jitter e prazo)
         client = Groq(
-            api_key=GROQ_API_KEY,
-            max_retries=2
+            api_key=key,
+            max_retries=0
         )
         print("✓ Cliente Groq inicializado com sucesso!")
     except TypeError as e:
         # Fallback: tentar sem nenhum argumento extra
         print(f"⚠️ Tentando inicialização alternativa: {e}")
         try:
-            client = Groq(api_key=GROQ_API_KEY)
+            client = Groq(api_key=key)
             print("✓ Cliente Groq inicializado (modo fallback)!")
         except Exception as e2:
             print(f"✗ Erro ao criar cliente Groq: {e2}")
-            client = None
     except Exception as e:
         print(f"✗ Erro ao criar cliente Groq: {e}")
-        client = None
-else:
+    if client is not None:
+        _clients[key] = client
+    return client
+
+
+if not GROQ_API_KEY:
     print("⚠️ GROQ_API_KEY não configurada!")
+
+# Cache persistente de respostas Groq (compartilhado entre workers do gunicorn)
+from review_engine.cache.response_cache import DiskResponseCache
+
+response_cache = DiskResponseCache.from_env()
+if response_cache:
+    print(f"✓ Cache de respostas Groq: {response_cache.path}")
+
+# Retry com backoff, circuit breaker e hedging das chamadas Groq (por worker)
+from review_engine.resilience import RateLimiter, ResilientCaller
+
+resilience = ResilientCaller.from_env()
+
+# Cota por chave e pool de chaves (GROQ_API_KEYS) das chamadas Groq (por worker)
+rate_limiter = RateLimiter.from_env(GROQ_API_KEY)
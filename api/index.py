@@ -12,19 +12,30 @@ Data: Dezembro 2025
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
-import markdown2
 
 # Importar configuração centralizada
 from api import config
+from review_engine.cache.response_cache import hash_prompt
+from review_engine.chunking import (split_code, prepare_code, response_budget, request_tokens,
+                                    REVIEW_MODES, PatchError, locate_edits, make_patch)
+from review_engine.resilience import create_with_headers
 
 # Usar valores do config
 GROQ_MODEL = config.GROQ_MODEL
 GROQ_TEMPERATURE = config.GROQ_TEMPERATURE
 GROQ_MAX_TOKENS = config.GROQ_MAX_TOKENS
 GROQ_API_KEY = config.GROQ_API_KEY
-client = config.client
+get_client = config.get_client  # cliente Groq criado no primeiro /analyze
+API_CONFIGURED = bool(GROQ_API_KEY) and len(GROQ_API_KEY) > 10
+response_cache = config.response_cache
+resilience = config.resilience
+rate_limiter = config.rate_limiter
+MAX_CODE_CHARS = config.MAX_CODE_CHARS
+CHUNK_CHARS = config.CHUNK_CHARS
+CHUNK_WORKERS = config.CHUNK_WORKERS
 
 # Inicializar Flask
 app = Flask(__name__, 
@@ -85,45 +96,99 @@ class AICodeAnalyzer:
   * Delphi: TStringList.Sorted, TDictionary vs loops, gerenciamento de interfaces
 
 **FORMATO DE RESPOSTA (JSON ESTRITO):**
-{{
-  "hasIssues": true/false,
-  "optimizedCode": "CÓDIGO COMPLETO OTIMIZADO AQUI - OBRIGATÓRIO incluir todo o código corrigido, nunca apenas comentários",
-  "issues": [
-    {{
+{response_format}
+
+**REGRAS CRÍTICAS:**
+{rules}
+
+**IMPORTANTE:**
+- Se o código estiver perfeito: {perfect}
+- Seja RIGOROSO mas CONSTRUTIVO
+- Cite documentação oficial quando aplicável
+- Foque em impacto REAL (não teórico)
+- Use terminologia técnica precisa
+"""
+
+    _ISSUE_FORMAT = """  "issues": [
+    {
       "type": "complexity|memory|idiom|green_it",
       "severity": "critical|high|medium|low",
       "title": "Título conciso do problema",
       "description": "Explicação técnica com referência à documentação",
       "originalCode": "Trecho do código problemático",
       "impact": "Impacto em performance/memória/energia"
-    }}
-  ],
-  "metrics": {{
+    }
+  ]"""
+    _METRICS_FORMAT = """  "metrics": {
     "complexityReduction": "Alta|Média|Baixa|Nenhuma",
     "memoryImpact": "Descrição do impacto (ex: -40% allocations)",
     "estimatedSpeedup": "Descrição (ex: O(n²) -> O(n), 3.5x faster)",
     "energySavings": "Estimativa de economia energética (ex: -25% CPU cycles)"
-  }},
+  }"""
+
+    # Modos de saída (REVIEW_MODES): formato, regras e campos obrigatórios de cada um
+    RESPONSE_FORMATS = {
+        'full': f"""{{
+  "hasIssues": true/false,
+  "optimizedCode": "CÓDIGO COMPLETO OTIMIZADO AQUI - OBRIGATÓRIO incluir todo o código corrigido, nunca apenas comentários",
+{_ISSUE_FORMAT},
+{_METRICS_FORMAT},
   "explanation": "Explicação didática em Markdown sobre as otimizações aplicadas. NUNCA inclua blocos de código completo aqui. Use apenas pequenos trechos inline com backticks quando necessário. Cite documentação oficial e conceitos técnicos.",
   "qualityScore": 0-100
-}}
-
-**REGRAS CRÍTICAS:**
-1. Campo 'optimizedCode': SEMPRE retorne o código COMPLETO otimizado, nunca apenas comentários ou placeholders
+}}""",
+        'patch': f"""{{
+  "hasIssues": true/false,
+  "patch": "@@ -3,4 +3,2 @@\\n def total(items):\\n-    s = 0\\n-    for i in items: s += i\\n-    return s\\n+    return sum(items)\\n",
+{_ISSUE_FORMAT},
+{_METRICS_FORMAT},
+  "explanation": "Resumo curto das mudanças (no máximo 3 frases, sem blocos de código)",
+  "qualityScore": 0-100
+}}""",
+        'issues': f"""{{
+  "hasIssues": true/false,
+{_ISSUE_FORMAT},
+{_METRICS_FORMAT},
+  "qualityScore": 0-100
+}}""",
+    }
+    MODE_RULES = {
+        'full': """1. Campo 'optimizedCode': SEMPRE retorne o código COMPLETO otimizado, nunca apenas comentários ou placeholders
 2. Se não houver otimizações possíveis, retorne o código original intacto no campo 'optimizedCode'
 3. Campo 'explanation': APENAS texto explicativo, SEM blocos de código
-4. O código vai em 'optimizedCode', a explicação vai em 'explanation'
-
-**IMPORTANTE:**
-- Se o código estiver perfeito: hasIssues=false, qualityScore=100, explanation="✅ Código excelente!"
-- Seja RIGOROSO mas CONSTRUTIVO
-- Cite documentação oficial quando aplicável
-- Foque em impacto REAL (não teórico)
-- Use terminologia técnica precisa
-"""
+4. O código vai em 'optimizedCode', a explicação vai em 'explanation'""",
+        'patch': """1. NÃO retorne 'optimizedCode' nem reescreva o código inteiro
+2. Campo 'patch': unified diff (hunks "@@ -a,b +c,d @@", linhas com ' ', '-' ou '+') contra o código EXATAMENTE como enviado, só com os trechos alterados e 2 linhas de contexto
+3. Se não houver otimizações possíveis, retorne 'patch' vazio ("")
+4. Campo 'explanation': no máximo 3 frases, SEM blocos de código""",
+        'issues': """1. NÃO retorne 'optimizedCode' nem 'explanation'; apenas hasIssues, issues, metrics e qualityScore
+2. Em cada issue descreva o problema e a correção em texto, SEM blocos de código""",
+    }
+    PERFECT_CODE = {
+        'full': 'hasIssues=false, qualityScore=100, explanation="✅ Código excelente!"',
+        'patch': 'hasIssues=false, qualityScore=100, patch="", explanation="✅ Código excelente!"',
+        'issues': 'hasIssues=false, qualityScore=100, issues=[]',
+    }
+    # Linhas [omitido #n: ...] e contexto de trechos de arquivo grande, por modo
+    OMITTED_RULES = {
+        'full': "copie-as inalteradas no optimizedCode",
+        'patch': "não as altere (podem aparecer como contexto no patch)",
+        'issues': "ignore-as",
+    }
+    CONTEXT_RULES = {
+        'full': "NÃO analise e NÃO inclua no optimizedCode",
+        'patch': "NÃO analise e NÃO inclua no patch",
+        'issues': "NÃO analise",
+    }
+    REQUIRED_KEYS = {
+        'full': ['hasIssues', 'metrics', 'explanation', 'qualityScore'],
+        'patch': ['hasIssues', 'patch', 'qualityScore'],
+        'issues': ['hasIssues', 'issues', 'qualityScore'],
+    }
 
-    def __init__(self, code: str, language: str):
+    def __init__(self, code: str, language: str, context: str = "", mode: str = "full"):
         self.code = code
+        self.context = context
+        self.mode = mode
         self.language = language.lower()
         self.docs = self.LANGUAGE_DOCS.get(self.language, 'General programming best practices')
     
@@ -133,51 +198,115 @@ class AICodeAnalyzer:
         Retorna análise estruturada em JSON.
         """
         
+        client = get_client()
         if not client:
             return self._fallback_response("API Groq não configurada. Configure GROQ_API_KEY nas variáveis de ambiente da Vercel")
         
         try:
             system_prompt = self.SYSTEM_PROMPT_TEMPLATE.format(
                 language=self.language.upper(),
-                docs=self.docs
+                docs=self.docs,
+                response_format=self.RESPONSE_FORMATS[self.mode],
+                rules=self.MODE_RULES[self.mode],
+                perfect=self.PERFECT_CODE[self.mode]
             )
             
+            # Licença, comentários longos e linhas minificadas saem do prompt
+            prepared = prepare_code(self.code, self.language)
+            max_tokens = response_budget(prepared.tokens, GROQ_MAX_TOKENS, self.mode)
+            
             user_prompt = f"""Analise este código {self.language.upper()} focando em Green IT:
 
 ```{self.language}
-{self.code}
+{prepared.text}
 ```
 
 Retorne APENAS o JSON estruturado (sem texto adicional antes ou depois)."""
+            
+            if prepared.regions:
+                user_prompt += ("\nLinhas com [omitido #n: ...] substituem licença, comentários longos "
+                                f"ou linhas minificadas: {self.OMITTED_RULES[self.mode]}.")
+            
+            if self.context:
+                # Trecho de arquivo grande: linhas anteriores só como referência
+                user_prompt = f"""**Contexto (linhas imediatamente anteriores, apenas referência; {self.CONTEXT_RULES[self.mode]}):**
 
-            response = client.chat.completions.create(
-                model=GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=GROQ_TEMPERATURE,
-                max_tokens=GROQ_MAX_TOKENS,
-                response_format={"type": "json_object"}
-            )
+```{self.language}
+{prepare_code(self.context, self.language).text}
+```
+
+{user_prompt}"""
+
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
             
-            result = json.loads(response.choices[0].message.content)
+            # Cache em disco: reaproveita respostas de outros workers/deploys
+            cache_key = hash_prompt(GROQ_MODEL, messages,
+                                    temperature=GROQ_TEMPERATURE,
+                                    max_tokens=max_tokens,
+                                    response_format="json_object")
+            cached = response_cache.get(cache_key) if response_cache else None
+            
+            if cached is not None:
+                content = cached
+                total_tokens = 0
+            else:
+                # Cada tentativa espera a cota e sai pela chave escolhida no pool
+                response = resilience.call(rate_limiter.schedule(
+                    lambda key, timeout: create_with_headers(
+                        get_client(key).chat.completions,
+                        model=GROQ_MODEL,
+                        messages=messages,
+                        temperature=GROQ_TEMPERATURE,
+                        max_tokens=max_tokens,
+                        response_format={"type": "json_object"},
+                        timeout=timeout
+                    ),
+                    request_tokens(messages, max_tokens)
+                ))
+                content = response.choices[0].message.content
+                total_tokens = response.usage.total_tokens
+            
+            result = json.loads(content)
             
             # Validar estrutura
-            if not all(k in result for k in ['hasIssues', 'metrics', 'explanation', 'qualityScore']):
+            if not all(k in result for k in self.REQUIRED_KEYS[self.mode]):
                 return self._fallback_response("Resposta da IA em formato inválido")
             
+            if self.mode == 'patch':
+                try:
+                    edits = locate_edits(prepared.text.split("\n"), str(result['patch']))
+                except PatchError as e:
+                    return self._fallback_response(f"Patch da IA não se aplica ao código: {e}")
+            
+            # Só armazenar respostas válidas
+            if cached is None and response_cache:
+                response_cache.set(cache_key, content)
+            
+            if self.mode == 'patch':
+                # Diff aplicado aqui: o cliente recebe o mesmo optimizedCode do modo full
+                result['optimizedCode'] = prepared.apply_edits(edits) if edits else self.code
+                result['patch'] = make_patch(self.code, result['optimizedCode']) if edits else ""
+            elif self.mode == 'issues':
+                result['optimizedCode'] = None
             # CRÍTICO: Garantir que optimizedCode contenha código real
-            if 'optimizedCode' not in result or not result['optimizedCode'] or \
+            elif 'optimizedCode' not in result or not result['optimizedCode'] or \
                result['optimizedCode'].strip() in ['', '// Código otimizado aqui (se aplicável)', 
                                                      '// Código otimizado disponível abaixo',
                                                      '// Código otimizado abaixo']:
                 # Se a IA não forneceu código, usar o código original
                 result['optimizedCode'] = self.code
+            else:
+                # Trechos omitidos do prompt voltam ao código otimizado
+                result['optimizedCode'] = prepared.restore(result['optimizedCode'])
+            
+            result['mode'] = self.mode
             
             # Converter explanation para HTML (Markdown)
             if 'explanation' in result:
-                result['explanationHtml'] = markdown2.markdown(
+                result['explanationHtml'] = _markdown(
                     result['explanation'],
                     extras=['fenced-code-blocks', 'tables', 'code-friendly']
                 )
@@ -186,7 +315,8 @@ Retorne APENAS o JSON estruturado (sem texto adicional antes ou depois)."""
                 'success': True,
                 'data': result,
                 'model': GROQ_MODEL,
-                'tokens': response.usage.total_tokens
+                'tokens': total_tokens,
+                'cached': cached is not None
             }
             
         except json.JSONDecodeError as e:
@@ -216,6 +346,82 @@ Retorne APENAS o JSON estruturado (sem texto adicional antes ou depois)."""
         }
 
 
+def analyze_chunked(code: str, language: str, mode: str = "full") -> dict:
+    """
+    Análise de código grande: divide em trechos (fronteiras de função/classe),
+    analisa em paralelo e junta as respostas em um único resultado
+    """
+    chunks = split_code(code, max_chars=CHUNK_CHARS)
+    
+    def run(chunk):
+        return AICodeAnalyzer(chunk.code, language, context=chunk.context, mode=mode).analyze()
+    
+    with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunks))) as executor:
+        results = list(executor.map(run, chunks))
+    
+    issues = []
+    seen = set()
+    explanations = []
+    for chunk, result in zip(chunks, results):
+        data = result['data']
+        for issue in data.get('issues') or []:
+            key = (str(issue.get('title', '')).strip().lower(),
+                   str(issue.get('originalCode', '')).strip())
+            if key not in seen:
+                seen.add(key)
+                issues.append(issue)
+        if data.get('explanation') and not any(data['explanation'] in text for text in explanations):
+            explanations.append(f"**Linhas {chunk.start_line}-{chunk.end_line}:** {data['explanation']}")
+    
+    # Nota ponderada pelo tamanho de cada trecho
+    total_chars = sum(len(chunk.code) for chunk in chunks) or 1
+    quality_score = round(sum(
+        (result['data'].get('qualityScore') or 0) * len(chunk.code)
+        for chunk, result in zip(chunks, results)
+    ) / total_chars)
+    
+    explanation = "\n\n".join(explanations)
+    optimized_code = None
+    if mode != 'issues':
+        optimized_code = "\n".join(result['data'].get('optimizedCode') or chunk.code
+                                   for chunk, result in zip(chunks, results))
+    data = {
+        'hasIssues': any(result['data'].get('hasIssues') for result in results),
+        'optimizedCode': optimized_code,
+        'issues': issues,
+        'metrics': results[0]['data'].get('metrics', {}),
+        'explanation': explanation,
+        'explanationHtml': _markdown(
+            explanation,
+            extras=['fenced-code-blocks', 'tables', 'code-friendly']
+        ),
+        'qualityScore': quality_score,
+        'chunks': len(chunks),
+        'mode': mode
+    }
+    if mode == 'patch':
+        # Diff canônico do arquivo inteiro (os dos trechos têm linhas locais)
+        data['patch'] = make_patch(code, optimized_code) if optimized_code != code else ""
+    
+    errors = [result['error'] for result in results if not result.get('success')]
+    response = {
+        'success': not errors,
+        'data': data,
+        'model': GROQ_MODEL,
+        'tokens': sum(result.get('tokens', 0) for result in results),
+        'cached': all(result.get('cached') for result in results)
+    }
+    if errors:
+        response['error'] = errors[0]
+    return response
+
+
+def _markdown(text: str, extras: list = None) -> str:
+    """markdown2 importado só quando há explicação para converter (cold start)"""
+    import markdown2
+    return markdown2.markdown(text, extras=extras)
+
+
 # ========== ROTAS FLASK ==========
 
 @app.route('/')
@@ -232,7 +438,8 @@ def analyze_code():
     Request Body:
     {
         "code": "string",
-        "language": "python|java|csharp|..."
+        "language": "python|java|csharp|...",
+        "mode": "full|patch|issues"   (opcional, padrão full)
     }
     
     Response:
@@ -245,7 +452,8 @@ def analyze_code():
             "metrics": {...},
             "explanation": "markdown",
             "explanationHtml": "html",
-            "qualityScore": 0-100
+            "qualityScore": 0-100,
+            "patch": "unified diff (modo patch)"
         },
         "model": "llama-3.3-70b-versatile",
         "tokens": 1234
@@ -263,15 +471,25 @@ def analyze_code():
                 'error': 'Código vazio. Por favor, insira um trecho de código para análise.'
             }), 400
         
-        if len(code) > 10000:
+        mode = data.get('mode') or 'full'
+        if mode not in REVIEW_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"mode deve ser um de: {', '.join(REVIEW_MODES)}"
+            }), 400
+        
+        if len(code) > MAX_CODE_CHARS:
             return jsonify({
                 'success': False,
-                'error': 'Código muito longo. Limite: 10.000 caracteres.'
+                'error': f'Código muito longo. Limite: {MAX_CODE_CHARS} caracteres.'
             }), 400
         
-        # Análise via IA
-        analyzer = AICodeAnalyzer(code, language)
-        result = analyzer.analyze()
+        # Análise via IA (código grande é dividido em trechos paralelos)
+        if len(code) > CHUNK_CHARS:
+            result = analyze_chunked(code, language, mode)
+        else:
+            analyzer = AICodeAnalyzer(code, language, mode=mode)
+            result = analyzer.analyze()
         
         return jsonify(result)
     
@@ -290,15 +508,15 @@ def health():
     # Ler variáveis diretamente aqui (sem cache)
     key_from_env = os_module.environ.get('GROQ_API_KEY', '')
     
-    api_status = 'configured' if client else 'not_configured'
+    api_status = 'configured' if API_CONFIGURED else 'not_configured'
     
     # Debug detalhado
     debug_info = {
         'groq_key_exists': bool(GROQ_API_KEY),
         'groq_key_length': len(GROQ_API_KEY) if GROQ_API_KEY else 0,
         'groq_key_preview': f"{GROQ_API_KEY[:10]}...{GROQ_API_KEY[-4:]}" if GROQ_API_KEY and len(GROQ_API_KEY) > 14 else "NOT SET",
-        'client_initialized': bool(client),
-        'client_type': str(type(client)),
+        'client_initialized': API_CONFIGURED,
+        'client_type': 'groq.Groq (sob demanda)' if API_CONFIGURED else str(type(None)),
         'all_env_keys': [k for k in os.environ.keys() if 'GROQ' in k],
         'direct_read': {
             'key_exists': bool(key_from_env),
@@ -314,6 +532,8 @@ def health():
         'engine': 'Groq API (FREE)',
         'model': GROQ_MODEL,
         'api_status': api_status,
+        'resilience': resilience.stats(),
+        'rate_limit': rate_limiter.stats(),
         'debug': debug_info
     })
 
@@ -325,7 +545,7 @@ def config():
         'model': GROQ_MODEL,
         'temperature': GROQ_TEMPERATURE,
         'max_tokens': GROQ_MAX_TOKENS,
-        'api_configured': bool(client),
+        'api_configured': API_CONFIGURED,
         'supported_languages': list(AICodeAnalyzer.LANGUAGE_DOCS.keys())
     })
 
@@ -370,7 +590,7 @@ def env_check_live():
         'total_env_vars': len(os_check.environ),
         'groq_vars_found': len(all_groq),
         'groq_vars': groq_preview,
-        'client_initialized': bool(client),
+        'client_initialized': bool(get_client()),
         'global_GROQ_API_KEY_var': {
             'exists': bool(GROQ_API_KEY),
             'length': len(GROQ_API_KEY) if GROQ_API_KEY else 0
@@ -390,7 +610,7 @@ def debug_env():
         'GROQ_TEMPERATURE': GROQ_TEMPERATURE,
         'GROQ_MAX_TOKENS': GROQ_MAX_TOKENS,
         'GROQ_TIMEOUT': GROQ_TIMEOUT,
-        'client_initialized': bool(client),
+        'client_initialized': bool(get_client()),
         'vercel_env': os.environ.get('VERCEL_ENV', 'local'),
         'all_env_keys': [k for k in os.environ.keys() if 'GROQ' in k or 'FLASK' in k],
         'direct_read_from_os': {
@@ -419,7 +639,7 @@ def status_check_v2():
         'groq_key_first_10': groq_key[:10] if groq_key else 'NONE',
         'groq_key_last_4': groq_key[-4:] if len(groq_key) > 4 else 'NONE',
         'all_groq_vars': [k for k in os_module.environ.keys() if 'GROQ' in k],
-        'client_ok': bool(client)
+        'client_ok': bool(get_client())
     })
 
 
@@ -13,13 +13,20 @@ Mantém compatibilidade total com frontend existente
 """
 
 import os
+import json
+import math
 import logging
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 # Importar novo Review Engine v2.0
 from review_engine.core import ReviewEngine
+from review_engine.chunking import REVIEW_MODES
+from review_engine.resilience import (
+    AdmissionController, AdmissionRejected, Deadline, watch_disconnect
+)
+from review_engine.resilience.admission import LANES
 
 # Configuração de logging estruturado
 logging.basicConfig(
@@ -40,10 +47,18 @@ CORS(app)
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 PORT = int(os.getenv('PORT', 5000))
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', 200))
+# Prazo padrão de /analyze (abaixo do --timeout 120 do gunicorn); 0 desativa
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', 110))
+# Prioridade de quem não envia X-Review-Priority (jobs de CI)
+ADMISSION_DEFAULT_PRIORITY = os.getenv('ADMISSION_DEFAULT_PRIORITY', 'batch')
 
 # Inicializar Review Engine v2.0
 review_engine = ReviewEngine(groq_api_key=GROQ_API_KEY)
 
+# Admissão por prioridade na frente do engine (interativo x lote)
+admission = AdmissionController.from_env()
+
 # Banner de inicialização
 print("=" * 70)
 print("🚀 Eco-Code Reviewer v2.0 - MODULAR ARCHITECTURE ENGINE")
@@ -76,8 +91,93 @@ def health_check():
         'model': 'llama-3.3-70b-versatile',
         'api_status': 'configured' if GROQ_API_KEY else 'not_configured',
         'plugins': list(review_engine.plugins.keys()),
-        'supported_languages': review_engine.get_supported_languages()
+        'supported_languages': review_engine.get_supported_languages(),
+        'ai_gate': review_engine.ai_gate.stats(),
+        'similar_reuse': review_engine.similar_index.stats(),
+        'ai_parse': review_engine.ai_adapter.parse_stats() if review_engine.ai_adapter else None,
+        'ai_async': review_engine.async_ai_adapter.stats() if review_engine.async_ai_adapter else None,
+        'ai_resilience': review_engine.ai_adapter.resilience.stats() if review_engine.ai_adapter else None,
+        'ai_rate_limit': review_engine.ai_adapter.rate_limiter.stats() if review_engine.ai_adapter else None,
+        'admission': admission.stats()
+    })
+
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    """Profundidade das filas e tempos de espera por prioridade (autoscaling)"""
+    return jsonify({'success': True, 'data': admission.stats()})
+
+
+def _latency_budget(data: dict):
+    """latencyBudgetMs opcional do corpo da requisição, em segundos"""
+    value = data.get('latencyBudgetMs')
+    if value is None:
+        return None
+    try:
+        budget = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('latencyBudgetMs deve ser numérico')
+    if budget < 0:
+        raise ValueError('latencyBudgetMs deve ser >= 0')
+    return budget / 1000
+
+
+def _request_deadline(data: dict) -> Deadline:
+    """
+    Prazo da requisição: deadlineMs opcional do corpo, limitado por
+    REQUEST_DEADLINE_SECONDS
+    """
+    seconds = REQUEST_DEADLINE_SECONDS if REQUEST_DEADLINE_SECONDS > 0 else None
+    value = data.get('deadlineMs')
+    if value is not None:
+        try:
+            requested = float(value) / 1000
+        except (TypeError, ValueError):
+            raise ValueError('deadlineMs deve ser numérico')
+        if requested <= 0:
+            raise ValueError('deadlineMs deve ser > 0')
+        seconds = requested if seconds is None else min(seconds, requested)
+    return Deadline(seconds)
+
+
+def _watch_client(deadline: Deadline):
+    """Cancela o deadline se o cliente desconectar; retorna a função que para a vigilância"""
+    sock = request.environ.get('gunicorn.socket') or request.environ.get('werkzeug.socket')
+    if sock is None:
+        return lambda: None
+    return watch_disconnect(sock, deadline)
+
+
+def _priority(data: dict) -> str:
+    """Prioridade: header X-Review-Priority ou priority do corpo (interactive/batch)"""
+    priority = (request.headers.get('X-Review-Priority') or data.get('priority')
+                or ADMISSION_DEFAULT_PRIORITY)
+    priority = str(priority).lower()
+    if priority not in LANES:
+        raise ValueError(f"priority deve ser um de: {', '.join(LANES)}")
+    return priority
+
+
+def _overloaded(error: AdmissionRejected):
+    """503 com Retry-After: cliente tenta de novo depois da espera medida"""
+    retry_after = max(1, math.ceil(error.retry_after))
+    logger.warning(f"Análise recusada por sobrecarga: {error}")
+    response = jsonify({
+        'success': False,
+        'error': f'Servidor sobrecarregado ({error}); tente novamente em {retry_after}s',
+        'retryAfter': retry_after
     })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def _review_mode(data: dict) -> str:
+    """mode opcional do corpo: issues, patch ou full (padrão)"""
+    mode = data.get('mode') or 'full'
+    if mode not in REVIEW_MODES:
+        raise ValueError(f"mode deve ser um de: {', '.join(REVIEW_MODES)}")
+    return mode
 
 
 @app.route('/analyze', methods=['POST'])
@@ -105,28 +205,61 @@ def analyze_code():
                 'error': 'Código não fornecido'
             }), 400
         
-        logger.info(f"Análise iniciada - Linguagem: {language}, Tamanho: {len(code)} chars")
+        try:
+            latency_budget = _latency_budget(data)
+            mode = _review_mode(data)
+            deadline = _request_deadline(data)
+            priority = _priority(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        logger.info(f"Análise iniciada - Linguagem: {language}, Tamanho: {len(code)} chars, "
+                   f"Modo: {mode}, Prioridade: {priority}")
         
         # Executar análise usando Review Engine v2.0
-        result = review_engine.analyze(
-            code=code,
-            language=language,
-            filename=filename,
-            use_ai=True
-        )
+        # Caminho assíncrono: a thread aguarda sem prender uma conexão Groq própria
+        # Prazo esgotado/cliente desconectado: o engine devolve o resultado parcial;
+        # o timeout aqui é só a rede de segurança
+        # Sobrecarga: espera na fila da prioridade, cai para só estática ou 503
+        stop_watch = _watch_client(deadline)
+        try:
+            try:
+                ticket = admission.admit(priority, deadline)
+            except AdmissionRejected as e:
+                return _overloaded(e)
+            try:
+                remaining = deadline.remaining()
+                result = review_engine.run_coroutine(review_engine.analyze_async(
+                    code=code,
+                    language=language,
+                    filename=filename,
+                    use_ai=not ticket.degraded,
+                    latency_budget=latency_budget,
+                    mode=mode,
+                    deadline=deadline
+                ), timeout=remaining + 5 if remaining is not None else None)
+            finally:
+                ticket.release()
+        finally:
+            stop_watch()
         
         # Converter ReviewResult para formato compatível com frontend
         response = {
             'success': True,
             'data': result.to_dict(),
             'model': 'review-engine-v2.0',
-            'tokens': 0  # Placeholder - pode ser calculado futuramente
+            'tokens': 0,  # Placeholder - pode ser calculado futuramente
+            'analysisPath': result.analysis_path,
+            'partial': result.partial,
+            'admission': ticket.to_dict()
         }
         
         # Log estruturado para auditoria
         logger.info(f"Análise concluída - Score: {result.quality_score}, "
                    f"Issues: {len(result.issues)}, "
-                   f"Confiança: {result.confidence_level}%")
+                   f"Confiança: {result.confidence_level}%, "
+                   f"Caminho: {result.analysis_path} ({result.gate_reason})"
+                   f"{', parcial' if result.partial else ''}")
         
         return jsonify(response)
     
@@ -138,6 +271,222 @@ def analyze_code():
         }), 500
 
 
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_code_stream():
+    """
+    Novo endpoint: Análise em streaming (NDJSON, um evento por linha)
+    Emite detecção e resultado do plugin antes da AI terminar
+    
+    Eventos: admission → detection → plugin → ai_issue (n) → result
+    """
+    data = request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({
+            'success': False,
+            'error': 'JSON inválido'
+        }), 400
+    
+    code = data.get('code', '').strip()
+    language = data.get('language', 'auto').lower()
+    filename = data.get('filename')
+    
+    if not code:
+        return jsonify({
+            'success': False,
+            'error': 'Código não fornecido'
+        }), 400
+    
+    try:
+        latency_budget = _latency_budget(data)
+        mode = _review_mode(data)
+        deadline = _request_deadline(data)
+        priority = _priority(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    logger.info(f"Análise (stream) iniciada - Linguagem: {language}, Tamanho: {len(code)} chars, "
+               f"Prioridade: {priority}")
+    
+    # Admissão antes do 200: a recusa ainda pode ser um 503 com Retry-After
+    stop_admission_watch = _watch_client(deadline)
+    try:
+        ticket = admission.admit(priority, deadline)
+    except AdmissionRejected as e:
+        return _overloaded(e)
+    finally:
+        stop_admission_watch()
+    
+    def generate():
+        stop_watch = _watch_client(deadline)
+        try:
+            yield json.dumps({'event': 'admission', 'data': ticket.to_dict()}) + "\n"
+            for event in review_engine.analyze_stream(
+                    code=code, language=language, filename=filename, use_ai=not ticket.degraded,
+                    latency_budget=latency_budget, mode=mode, deadline=deadline):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except GeneratorExit:
+            # Servidor fechou o gerador: cliente foi embora no meio do stream
+            deadline.cancel("client_disconnected")
+            raise
+        except Exception as e:
+            logger.error(f"Erro na análise (stream): {str(e)}", exc_info=True)
+            yield json.dumps({'event': 'error', 'data': {'error': f'Erro interno: {str(e)}'}}) + "\n"
+        finally:
+            stop_watch()
+            ticket.release()
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # desabilita buffering em proxies nginx
+        }
+    )
+    # Gerador que nunca começou não roda o finally: libera o slot ao fechar a resposta
+    response.call_on_close(ticket.release)
+    return response
+
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Novo endpoint: Análise em lote (vários arquivos, ex: PR inteiro)
+    
+    Request Body:
+    {
+        "files": [{"filename": "a.py", "code": "...", "language": "auto"}],
+        "use_ai": true,
+        "mode": "full"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('files'), list):
+            return jsonify({
+                'success': False,
+                'error': 'Campo "files" (lista) não fornecido'
+            }), 400
+        
+        files = [f for f in data['files'] if isinstance(f, dict) and (f.get('code') or '').strip()]
+        
+        if not files:
+            return jsonify({
+                'success': False,
+                'error': 'Nenhum arquivo com código fornecido'
+            }), 400
+        
+        if len(files) > MAX_BATCH_FILES:
+            return jsonify({
+                'success': False,
+                'error': f'Lote muito grande. Limite: {MAX_BATCH_FILES} arquivos.'
+            }), 400
+        
+        try:
+            mode = _review_mode(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        logger.info(f"Análise em lote iniciada - Arquivos: {len(files)}")
+        
+        batch = review_engine.analyze_many(
+            files,
+            use_ai=bool(data.get('use_ai', True)),
+            mode=mode
+        )
+        
+        logger.info(f"Análise em lote concluída - Score médio: {batch.average_score}, "
+                   f"Issues: {batch.total_issues}, Falhas: {batch.failed_files}")
+        
+        return jsonify({
+            'success': True,
+            'data': batch.to_dict(),
+            'model': 'review-engine-v2.0'
+        })
+    
+    except Exception as e:
+        logger.error(f"Erro na análise em lote: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Erro interno: {str(e)}'
+        }), 500
+
+
+@app.route('/analyze/diff', methods=['POST'])
+def analyze_diff():
+    """
+    Novo endpoint: Review incremental (apenas trechos alterados de um PR)
+    
+    Request Body (unified diff):
+    {
+        "diff": "--- a/app.py\n+++ b/app.py\n@@ ...",
+        "language": "auto",
+        "use_ai": true,
+        "mode": "full"
+    }
+    
+    Ou par antigo/novo de um arquivo:
+    {
+        "old_code": "...",
+        "new_code": "...",
+        "filename": "app.py",
+        "context_lines": 3
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not (data.get('diff') or data.get('new_code')):
+            return jsonify({
+                'success': False,
+                'error': 'Campo "diff" ou "new_code" não fornecido'
+            }), 400
+        
+        diff = data.get('diff')
+        if diff and diff.count('\n+++ ') + diff.startswith('+++ ') > MAX_BATCH_FILES:
+            return jsonify({
+                'success': False,
+                'error': f'Diff muito grande. Limite: {MAX_BATCH_FILES} arquivos.'
+            }), 400
+        
+        context_lines = int(data.get('context_lines', 3))
+        
+        batch = review_engine.analyze_diff(
+            diff=diff,
+            old_code=data.get('old_code'),
+            new_code=data.get('new_code'),
+            language=(data.get('language') or 'auto').lower(),
+            filename=data.get('filename'),
+            use_ai=bool(data.get('use_ai', True)),
+            context_lines=max(0, min(context_lines, 20)),
+            mode=_review_mode(data)
+        )
+        
+        logger.info(f"Review de diff concluído - Arquivos: {len(batch.files)}, "
+                   f"Issues: {batch.total_issues}")
+        
+        return jsonify({
+            'success': True,
+            'data': batch.to_dict(),
+            'model': 'review-engine-v2.0'
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Erro no review de diff: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': f'Erro interno: {str(e)}'
+        }), 500
+
+
 @app.route('/detect', methods=['POST'])
 def detect_language():
     """
@@ -155,7 +504,8 @@ def detect_language():
                 'error': 'Código não fornecido'
             }), 400
         
-        detection = review_engine.detector.detect(code, filename)
+        # Chamado a cada colagem no frontend: lê só o necessário para decidir
+        detection = review_engine.detector.detect_bounded(code, filename)
         
         return jsonify({
             'success': True,
@@ -192,6 +542,30 @@ def list_plugins():
         }), 500
 
 
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Novo endpoint: Estatísticas do cache de resultados
+    Hits, misses e evictions para acompanhar reuso de análises
+    """
+    try:
+        ai_adapter = review_engine.ai_adapter
+        response_cache = ai_adapter.response_cache if ai_adapter else None
+        
+        return jsonify({
+            'success': True,
+            'cache': review_engine.get_cache_stats(),
+            'responseCache': response_cache.stats() if response_cache else None,
+            'similarIndex': review_engine.similar_index.stats()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/audit/export', methods=['GET'])
 def export_audit_log():
     """
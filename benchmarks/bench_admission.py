@@ -0,0 +1,105 @@
+"""
+Benchmark - admissão por prioridade e descarte de carga
+Rajada de um job de CI (batch) seguida de usuários interativos chegando
+em intervalo fixo, contra slots de análise simulados (AI lenta; só
+estática rápida), em duas configurações:
+    fila única   - FIFO sem prioridade nem descarte (como a fila de sockets)
+    prioridades  - AdmissionController: interactive na frente, batch
+                   degrada para só estática ou recebe 503
+Mede p50/p95 da latência interativa e o destino das análises batch.
+
+Uso: python benchmarks/bench_admission.py [--batch 40] [--interactive 20] [--ai 0.5]
+     [--interval 0.05 --shed-wait 1]  (interativos além da capacidade: batch recebe 503)
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.resilience import AdmissionController, AdmissionRejected, Deadline  # noqa: E402
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def run(args, label: str, controller: AdmissionController, single_lane: bool):
+    latencies = {"interactive": [], "batch": []}
+    outcomes = {"ai": 0, "static": 0, "503": 0}
+    lock = threading.Lock()
+
+    def request(lane: str):
+        start = time.perf_counter()
+        try:
+            ticket = controller.admit("interactive" if single_lane else lane, Deadline(args.deadline))
+        except AdmissionRejected:
+            with lock:
+                outcomes["503"] += lane == "batch"
+            return
+        try:
+            time.sleep(args.static if ticket.degraded else args.ai)
+        finally:
+            ticket.release()
+        with lock:
+            latencies[lane].append(time.perf_counter() - start)
+            if lane == "batch":
+                outcomes["static" if ticket.degraded else "ai"] += 1
+
+    threads = [threading.Thread(target=request, args=("batch",)) for _ in range(args.batch)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for _ in range(args.interactive):
+        time.sleep(args.interval)
+        thread = threading.Thread(target=request, args=("interactive",))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    interactive = latencies["interactive"]
+    stats = controller.stats()
+    print(f"  {label:<12} interativo p50 {statistics.median(interactive) * 1000:6.0f} ms  "
+          f"p95 {percentile(interactive, 0.95) * 1000:6.0f} ms  |  batch AI {outcomes['ai']:>3}  "
+          f"só estática {outcomes['static']:>3}  503 {outcomes['503']:>3}  |  total {elapsed:4.1f}s")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", type=int, default=40, help="análises do job de CI (rajada)")
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.25, help="intervalo entre interativos (s)")
+    parser.add_argument("--ai", type=float, default=0.5, help="duração com AI (s)")
+    parser.add_argument("--static", type=float, default=0.02, help="duração só estática (s)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--deadline", type=float, default=110.0)
+    parser.add_argument("--degrade-wait", type=float, default=2.0)
+    parser.add_argument("--shed-wait", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{args.batch} batch de uma vez + {args.interactive} interativos a cada "
+          f"{args.interval * 1000:.0f} ms; {args.concurrency} slots, AI {args.ai * 1000:.0f} ms")
+    unbounded = {"interactive": 10 ** 6, "batch": 10 ** 6}
+    run(args, "fila única", AdmissionController(max_concurrency=args.concurrency, queue_limits=unbounded,
+                                                degrade_wait=10 ** 6, shed_wait=10 ** 6),
+        single_lane=True)
+    stats = run(args, "prioridades", AdmissionController(max_concurrency=args.concurrency,
+                                                          queue_limits={"interactive": 8, "batch": 8},
+                                                          degrade_wait=args.degrade_wait,
+                                                          shed_wait=args.shed_wait),
+                single_lane=False)
+    for lane, lane_stats in stats["lanes"].items():
+        print(f"    {lane:<12} admitidas {lane_stats['admitted']:>3}  degradadas {lane_stats['degraded']:>3}  "
+              f"recusadas {lane_stats['shed']:>3}  espera p95 {lane_stats['waitP95Ms']:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark - prazo da requisição e cancelamento por desconexão
+Cliente Groq falso lento (latência bem acima do prazo):
+    deadline   - prazo curto: tempo até a resposta e resultado parcial
+                 (sync e async) contra a espera pelo upstream sem prazo
+    disconnect - cliente fecha o socket no meio da chamada: tempo até o
+                 engine devolver o parcial (watch_disconnect + socketpair)
+    expired    - prazo esgotado antes do plugin: resultado vazio parcial
+
+Uso: python benchmarks/bench_deadline.py [--latency 1.0] [--deadline 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.core.engine import ReviewEngine  # noqa: E402
+from review_engine.core.ai_gate import AIGatePolicy  # noqa: E402
+from review_engine.cache.result_cache import InMemoryResultCache  # noqa: E402
+from review_engine.resilience import (  # noqa: E402
+    CircuitBreaker, Deadline, ResilientCaller, RetryPolicy, watch_disconnect
+)
+
+
+REVIEW = json.dumps({"qualityScore": 80, "issues": [], "explanation": "ok", "optimizedCode": ""})
+
+CODE = """def total(items):
+    result = 0
+    for item in items:
+        result = result + item
+    return result
+"""
+
+
+class SlowCompletions:
+    """Sync e async: dorme latency (limitado pelo timeout da tentativa)"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, timeout: float = 60.0, **kwargs):
+        time.sleep(min(self.latency, timeout))
+        return self._response()
+
+    async def acreate(self, timeout: float = 60.0, **kwargs):
+        await asyncio.sleep(min(self.latency, timeout))
+        return self._response()
+
+    @staticmethod
+    def _response():
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=REVIEW))])
+
+
+def build_engine(latency: float) -> ReviewEngine:
+    engine = ReviewEngine(groq_api_key="bench", result_cache=InMemoryResultCache(),
+                          ai_gate=AIGatePolicy(enabled=False))
+    engine.similar_index.enabled = False
+    engine.ai_adapter.response_cache = None
+    engine.ai_adapter.rate_limiter.enabled = False  # cliente falso: sem cota Groq
+    engine.async_ai_adapter.response_cache = None
+    resilience = ResilientCaller(RetryPolicy(max_attempts=1, deadline=30), CircuitBreaker(enabled=False))
+    engine.ai_adapter.resilience = resilience
+    engine.async_ai_adapter.resilience = resilience
+    completions = SlowCompletions(latency)
+    engine.ai_adapter.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=completions.acreate)))
+    adapter = engine.async_ai_adapter
+    loop_state = adapter._state
+
+    def state():
+        # Cliente AsyncGroq é criado por loop: troca pelo falso
+        current = loop_state()
+        current.client = fake
+        return current
+    adapter._state = state
+    return engine
+
+
+def timed(label: str, run):
+    start = time.perf_counter()
+    result = run()
+    print(f"  {label:<22}{(time.perf_counter() - start) * 1000:>8.0f} ms  "
+          f"caminho={result.analysis_path} motivo={result.gate_reason} parcial={result.partial}")
+    return result
+
+
+def deadline(args):
+    print(f"deadline: upstream {args.latency * 1000:.0f} ms, prazo {args.deadline * 1000:.0f} ms")
+    engine = build_engine(args.latency)
+    timed("sem prazo (sync)", lambda: engine.analyze(CODE + "# a\n", "python"))
+    sync = timed("com prazo (sync)", lambda: engine.analyze(CODE + "# b\n", "python",
+                                                            deadline=Deadline(args.deadline)))
+    timed("sem prazo (async)", lambda: engine.run_coroutine(engine.analyze_async(CODE + "# c\n", "python")))
+    result = timed("com prazo (async)", lambda: engine.run_coroutine(engine.analyze_async(
+        CODE + "# d\n", "python", deadline=Deadline(args.deadline))))
+    assert sync.partial and result.partial and result.gate_reason == "deadline"
+
+
+def disconnect(args):
+    print(f"disconnect: cliente fecha a conexão após {args.deadline * 1000:.0f} ms")
+    engine = build_engine(args.latency)
+    for label, analyze in (
+            ("sync", lambda d: engine.analyze(CODE + "# e\n", "python", deadline=d)),
+            ("async", lambda d: engine.run_coroutine(engine.analyze_async(CODE + "# f\n", "python",
+                                                                          deadline=d)))):
+        server, client = socket.socketpair()
+        request_deadline = Deadline(30)
+        stop = watch_disconnect(server, request_deadline, interval=0.05)
+        threading.Timer(args.deadline, client.close).start()
+        result = timed(f"desconexão ({label})", lambda: analyze(request_deadline))
+        stop()
+        server.close()
+        assert result.partial and result.gate_reason == "client_disconnected"
+
+
+def expired(args):
+    print("expired: prazo esgotado antes do plugin")
+    engine = build_engine(args.latency)
+    result = timed("prazo zero", lambda: engine.analyze(CODE, "python", deadline=Deadline(0)))
+    assert result.partial and not result.issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=1.0, help="latência do upstream falso (s)")
+    parser.add_argument("--deadline", type=float, default=0.2, help="prazo / momento da desconexão (s)")
+    args = parser.parse_args()
+
+    deadline(args)
+    disconnect(args)
+    expired(args)
+
+
+if __name__ == "__main__":
+    main()
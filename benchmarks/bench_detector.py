@@ -0,0 +1,100 @@
+"""
+Benchmark - LanguageDetector (camadas de palavras-chave e sintaxe)
+Compara a implementação anterior (um `keyword in code` por palavra-chave
+de cada linguagem; re.search com string a cada chamada) com o matcher
+multi-padrão (backends substring e aho-corasick) e o RuleEngine com hints;
+inclui o custo do classificador de tokens (camada "model")
+
+Uso: python benchmarks/bench_detector.py [--sizes 1,100,1024] [--repeat 10]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.detectors.language_detector import LanguageDetector  # noqa: E402
+from review_engine.detectors.multi_pattern import MultiPatternMatcher, ahocorasick  # noqa: E402
+
+
+SAMPLES = {
+    "python": "import os\n\ndef total(items):\n    result = 0\n    for item in items:\n"
+              "        result = result + item.price\n    return result\n\n",
+    "yaml": "services:\n  web:\n    image: app:1.2\n    ports:\n      - \"80:80\"\n",
+    "csharp": "using System;\nnamespace Shop {\n    public class Cart {\n"
+              "        public int Count() { return items.Count; }\n    }\n}\n",
+}
+
+
+def legacy_keywords(code: str):
+    scores = {}
+    for language, keywords in LanguageDetector.KEYWORDS.items():
+        matches = 0
+        for keyword in keywords:
+            if keyword in code:
+                matches += 1
+        if matches > 0:
+            scores[language] = min(70 + (matches * 5), 90)
+    return max(scores, key=scores.get) if scores else None
+
+
+def legacy_syntax(code: str):
+    scores = {}
+    for language, patterns in LanguageDetector.SYNTAX_PATTERNS.items():
+        matches = 0
+        for pattern in patterns:
+            if re.search(pattern, code, re.MULTILINE | re.IGNORECASE):
+                matches += 1
+        if matches > 0:
+            scores[language] = min(70 + (matches * 10), 90)
+    return max(scores, key=scores.get) if scores else None
+
+
+def detector_with(backend: str) -> LanguageDetector:
+    """Detector cujo matcher usa o backend pedido"""
+    class BenchDetector(LanguageDetector):
+        pass
+    keywords = [k for keywords in LanguageDetector.KEYWORDS.values() for k in keywords]
+    BenchDetector._compiled_patterns = (MultiPatternMatcher(keywords, backend=backend),
+                                        LanguageDetector.compile_patterns()[1])
+    return BenchDetector()
+
+
+def measure(fn, code: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(code)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,100,1024", help="Tamanhos em KB")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    candidates = [("keywords", "anterior", legacy_keywords)]
+    backends = ["substring"] + (["aho-corasick"] if ahocorasick is not None else [])
+    for backend in backends:
+        candidates.append(("keywords", backend, detector_with(backend)._detect_by_keywords))
+    candidates.append(("syntax", "anterior", legacy_syntax))
+    candidates.append(("syntax", "rule-engine", LanguageDetector()._detect_by_syntax))
+    candidates.append(("model", "naive-bayes", LanguageDetector()._detect_by_model))
+
+    if ahocorasick is None:
+        print("(pyahocorasick não instalado: apenas backend substring)")
+    print(f"{'amostra':<9}{'KB':>6}  {'camada':<10}{'versão':<14}{'ms':>10}")
+    for size_kb in [int(s) for s in args.sizes.split(",")]:
+        repeat = max(1, args.repeat if size_kb < 1024 else args.repeat // 5)
+        for name, unit in SAMPLES.items():
+            code = (unit * (size_kb * 1024 // len(unit) + 1))[:size_kb * 1024]
+            for layer, version, fn in candidates:
+                print(f"{name:<9}{size_kb:>6}  {layer:<10}{version:<14}"
+                      f"{measure(fn, code, repeat):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
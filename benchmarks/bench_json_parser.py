@@ -0,0 +1,196 @@
+"""
+Benchmark - leitura da resposta JSON da AI
+Compara a limpeza anterior de GroqAdapter._parse_ai_response (regex gulosa
+para achar o objeto, regex com quantificadores aninhados para re-escapar
+campos, json.loads e extração manual por regex) com loads_tolerant
+
+Para cada entrada mede o tempo em n e 8n (melhor de --repeat): a razão
+t(8n)/t(n) perto de 8 indica tempo linear. Antes de medir, confere o resultado do
+leitor tolerante em entradas adversariais.
+
+Uso: python benchmarks/bench_json_parser.py [--sizes 10,100,1000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.ai_layer.tolerant_json import loads_tolerant  # noqa: E402
+
+
+def legacy_parse(content: str):
+    """Pipeline anterior de _parse_ai_response até o dict (ou None)"""
+    json_match = re.search(r'\{[\s\S]*\}', content)
+    if not json_match:
+        return None
+    json_str = json_match.group()
+    json_str = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', json_str)
+
+    def escape_newlines_in_strings(match):
+        field_value = match.group(2)
+        field_value = field_value.replace('\\', '\\\\').replace('\n', '\\n')
+        field_value = field_value.replace('\r', '\\r').replace('\t', '\\t').replace('"', '\\"')
+        return f'"{match.group(1)}": "{field_value}"'
+
+    json_str = re.sub(r'"(explanation|optimizedCode|description|impact|title)":\s*"([^"]*(?:"[^"]*)*?)"(?=\s*[,}])',
+                      escape_newlines_in_strings, json_str, flags=re.DOTALL)
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        return legacy_extract_fields(content)
+
+
+def legacy_extract_fields(content: str):
+    data = {}
+    score_match = re.search(r'"qualityScore"\s*:\s*(\d+)', content)
+    if score_match:
+        data['qualityScore'] = int(score_match.group(1))
+    explanation_match = re.search(r'"explanation"\s*:\s*"([^"]+(?:\\.[^"]*)*?)"', content, re.DOTALL)
+    if explanation_match:
+        data['explanation'] = explanation_match.group(1)
+    issue_pattern = (r'\{\s*"title"\s*:\s*"([^"]+)"\s*,\s*"description"\s*:\s*"([^"]+)"\s*,'
+                     r'\s*"severity"\s*:\s*"([^"]+)"\s*,\s*"impact"\s*:\s*"([^"]+)"\s*\}')
+    issues = [dict(zip(("title", "description", "severity", "impact"), m.groups()))
+              for m in re.finditer(issue_pattern, content)]
+    if issues:
+        data['issues'] = issues
+    return data or None
+
+
+# ---------------------------------------------------------------------------
+# Entradas
+
+ISSUE = ('{"title": "Loop manual", "description": "Use sum() em vez de acumular", '
+         '"severity": "medium", "impact": "CPU"}')
+
+
+def valid(size: int) -> str:
+    count = max(1, size // (len(ISSUE) + 2))
+    return json.dumps({
+        "qualityScore": 72,
+        "issues": [json.loads(ISSUE)] * count,
+        "explanation": "## Resumo\nTexto.",
+        "optimizedCode": "total = sum(items)",
+    })
+
+
+def raw_newlines(size: int) -> str:
+    body = "linha de explicação\n" * (size // 21 + 1)
+    return '```json\n{"qualityScore": 60, "explanation": "' + body + '", "issues": []}\n```'
+
+
+def unescaped_quotes(size: int) -> str:
+    body = 'use "const" em vez de "var", ' * (size // 29 + 1)
+    return '{"explanation": "' + body + '", "qualityScore": 55, "issues": []}'
+
+
+def truncated(size: int) -> str:
+    return valid(size)[:-40]
+
+
+def issue_fields_without_close(size: int) -> str:
+    # Cada título termina em ']' (não em ',' ou '}'): a regex anterior
+    # estende o casamento até o fim do texto a partir de cada campo
+    unit = '{"title": "x"]'
+    return '{"issues": [' + unit * (size // len(unit) + 1) + '], "qualityScore": 50}'
+
+
+def quote_runs(size: int) -> str:
+    return '{"explanation": "' + '"' * size + '}'
+
+
+def deep_nesting(size: int) -> str:
+    return '{"a": ' + "[" * size + "]" * size + "}"
+
+
+def backslashes(size: int) -> str:
+    return '{"optimizedCode": "' + "\\d+\\" * (size // 4) + '", "qualityScore": 40}'
+
+
+INPUTS = {
+    "válido": valid,
+    "quebras cruas": raw_newlines,
+    "aspas cruas": unescaped_quotes,
+    "truncado": truncated,
+    "campos sem fim": issue_fields_without_close,
+    "só aspas": quote_runs,
+    "aninhado": deep_nesting,
+    "barras": backslashes,
+}
+
+QUADRATIC_BEFORE = ("campos sem fim", "só aspas")
+
+
+ADVERSARIAL_CHECKS = [
+    ('Resposta:\n```json\n{"qualityScore": 80, "issues": []}\n```\nfim {x}',
+     {"qualityScore": 80, "issues": []}),
+    ('{"explanation": "a\nb\tc", "qualityScore": 70}',
+     {"explanation": "a\nb\tc", "qualityScore": 70}),
+    ('{"explanation": "use "const" e "let", sempre", "issues": [{"title": "Use "let""}]}',
+     {"explanation": 'use "const" e "let", sempre', "issues": [{"title": 'Use "let"'}]}),
+    ('{"optimizedCode": "re.compile(\\"\\d+\\")", "qualityScore": 1,}',
+     {"optimizedCode": 're.compile("\\d+")', "qualityScore": 1}),
+    ('{"issues": [{"title": "x"}, {"title": "y", "descr',
+     {"issues": [{"title": "x"}, {"title": "y"}]}),
+    ("{qualityScore: 85, hasIssues: True, metrics: {speed: '2x'}}",
+     {"qualityScore": 85, "hasIssues": True, "metrics": {"speed": "2x"}}),
+    ('{"e": "\\ud83d\\ude00", "bad": "\\u12", "n": -1.5e3}',
+     {"e": "\U0001F600", "bad": "\\u12", "n": -1500.0}),
+    ('{"explanation": "troque "var" por "let", ", "qualityScore": 55}',
+     {"explanation": 'troque "var" por "let", ', "qualityScore": 55}),
+    ('{"path": "C:\\dir\\", "x": 1, "y": "a\\"}',
+     {"path": "C:\\dir\\", "x": 1, "y": "a\\"}),
+    ("sem objeto nenhum", None),
+]
+
+
+def check() -> None:
+    for text, expected in ADVERSARIAL_CHECKS:
+        got = loads_tolerant(text)
+        assert got == expected, f"{text!r}: {got!r} != {expected!r}"
+    for name, build in INPUTS.items():
+        assert isinstance(loads_tolerant(build(100_000)), dict), name
+    print(f"ok: {len(ADVERSARIAL_CHECKS)} casos adversariais, {len(INPUTS)} entradas grandes")
+
+
+def measure(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000", help="Tamanhos base em KB")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    check()
+    print(f"{'entrada':<16}{'KB':>6}  {'versão':<10}{'ms':>10}{'t(8n)/t(n)':>12}")
+    for name, build in INPUTS.items():
+        for size_kb in [int(s) for s in args.sizes.split(",")]:
+            size = size_kb * 1024
+            for version, fn in (("anterior", legacy_parse), ("tolerante", loads_tolerant)):
+                # Regex anterior é quadrática nessas entradas (minutos a partir de 100 KB)
+                if version == "anterior" and size_kb > 10 and name in QUADRATIC_BEFORE:
+                    print(f"{name:<16}{size_kb:>6}  {version:<10}{'(omitido)':>10}")
+                    continue
+                try:
+                    base = measure(fn, build(size), args.repeat)
+                    ratio = measure(fn, build(size * 8), args.repeat) / base if base else 0.0
+                except RecursionError:
+                    print(f"{name:<16}{size_kb:>6}  {version:<10}{'RecursionError':>10}")
+                    continue
+                print(f"{name:<16}{size_kb:>6}  {version:<10}{base:>10.2f}{ratio:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark - prompts agrupados (analyze_many) sob limite de requisições
+Cliente Groq falso com latência fixa e limite de requisições por minuto
+(fila única, como o rate limit da API): compara chamadas upstream e tempo
+total do lote com um prompt por arquivo (pack_max_files=1) e agrupado.
+Com --drop, a resposta agrupada omite um a cada N arquivos, para conferir
+que só esses são reenviados sozinhos.
+
+Uso: python benchmarks/bench_packing.py DIR [--files 40] [--rpm 600] [--latency 0.05] [--drop 5]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.core.engine import ReviewEngine  # noqa: E402
+from review_engine.core.ai_gate import AIGatePolicy  # noqa: E402
+from review_engine.cache.result_cache import InMemoryResultCache  # noqa: E402
+from review_engine.chunking.packing import PACK_FILE_TOKENS, PACK_MAX_FILES  # noqa: E402
+from review_engine.chunking.prompt_budget import estimate_tokens  # noqa: E402
+
+
+_FILE = re.compile(r'<<<ARQUIVO id=(\w+) linguagem=')
+
+REVIEW = {"qualityScore": 80,
+          "issues": [{"title": "Loop manual", "severity": "low", "description": "", "impact": ""}],
+          "explanation": "ok", "optimizedCode": ""}
+
+
+class FakeCompletions:
+    """Fila única com intervalo mínimo entre requisições (rpm) + latência"""
+
+    def __init__(self, rpm: float, latency: float, drop: int):
+        self.interval = 60.0 / rpm
+        self.latency = latency
+        self.drop = drop
+        self.calls = 0
+        self.packed = 0
+        self.dropped = 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            now = time.perf_counter()
+            start = max(now, self._next)
+            self._next = start + self.interval
+            self.calls += 1
+        time.sleep(start - now + self.latency)
+
+        prompt = kwargs["messages"][0]["content"]
+        ids = _FILE.findall(prompt)
+        if ids:
+            files = [dict(REVIEW, id=file_id) for position, file_id in enumerate(ids, start=1)
+                     if not self.drop or position % self.drop]
+            with self._lock:
+                self.packed += 1
+                self.dropped += len(ids) - len(files)
+            content = json.dumps({"files": files})
+        else:
+            content = json.dumps(REVIEW)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def collect(root_dir: str, limit: int):
+    files = []
+    for root, _, names in os.walk(root_dir):
+        for name in sorted(names):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            with open(path, encoding="utf-8") as handle:
+                code = handle.read()
+            if code.strip() and estimate_tokens(code) <= PACK_FILE_TOKENS:
+                files.append({"filename": name, "code": code, "language": "python"})
+    return sorted(files, key=lambda entry: entry["filename"])[:limit]
+
+
+def run(files, pack_max_files: int, args):
+    engine = ReviewEngine(groq_api_key="bench", result_cache=InMemoryResultCache(),
+                          ai_gate=AIGatePolicy(enabled=False), pack_max_files=pack_max_files)
+    engine.ai_adapter.response_cache = None
+    engine.ai_adapter.rate_limiter.enabled = False  # cliente falso: sem cota Groq
+    completions = FakeCompletions(args.rpm, args.latency, args.drop)
+    engine.ai_adapter.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    start = time.perf_counter()
+    batch = engine.analyze_many(files)
+    elapsed = time.perf_counter() - start
+
+    assert batch.failed_files == 0, batch.to_dict()
+    assert all(item.result.analysis_path == "ai" for item in batch.files)
+    return completions, elapsed, engine.ai_adapter.parse_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("dir")
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--rpm", type=float, default=600, help="limite de requisições por minuto")
+    parser.add_argument("--latency", type=float, default=0.05, help="latência por chamada (s)")
+    parser.add_argument("--drop", type=int, default=0, help="omite 1 a cada N arquivos agrupados")
+    args = parser.parse_args()
+
+    files = collect(args.dir, args.files)
+    print(f"{len(files)} arquivos pequenos, rpm={args.rpm:.0f}, latência={args.latency * 1000:.0f}ms")
+
+    single, single_time, _ = run(files, 1, args)
+    packed, packed_time, stats = run(files, PACK_MAX_FILES, args)
+
+    # Só os arquivos omitidos da resposta agrupada são reenviados
+    assert stats["packMisses"] == packed.dropped, (stats, packed.dropped)
+    print(f"{'modo':<12}{'chamadas':>10}{'agrupadas':>11}{'tempo (s)':>11}")
+    print(f"{'individual':<12}{single.calls:>10}{0:>11}{single_time:>11.2f}")
+    print(f"{'agrupado':<12}{packed.calls:>10}{packed.packed:>11}{packed_time:>11.2f}")
+    print(f"arquivos agrupados {stats['packedFiles']}, reenviados sozinhos {stats['packMisses']}; "
+          f"{1 - packed.calls / single.calls:.0%} menos chamadas, "
+          f"{1 - packed_time / single_time:.0%} menos tempo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark - compactação do código e orçamento de tokens do prompt
+Para arquivos reais (linguagem pela extensão) mede tokens estimados do
+código antes/depois de prepare_code, o max_tokens de response_budget
+frente ao teto fixo anterior (e por modo de saída) e o tempo de
+preparação por KB. Antes de medir, confere que restore() devolve os
+trechos omitidos e que um patch sobre o texto compactado se aplica ao
+código original.
+
+Uso: python benchmarks/bench_prompt_budget.py DIR [DIR...] [--limit 500] [--ceiling 3000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.chunking.chunker import DEFAULT_CHUNK_CHARS  # noqa: E402
+from review_engine.chunking.prompt_budget import (  # noqa: E402
+    POLICIES, REVIEW_MODES, prepare_code, response_budget
+)
+from review_engine.chunking.patch import locate_edits  # noqa: E402
+from review_engine.detectors.language_detector import LanguageDetector  # noqa: E402
+
+
+LICENSED = (
+    "/*\n * Copyright (c) 2024 Exemplo\n * Licensed under the Apache License, Version 2.0\n */\n"
+    "const data = \"" + "QUJD" * 300 + "\";\n"
+    "/**\n * Soma os itens.\n *\n * @param items lista\n * @param fn mapeamento\n"
+    " * @returns total\n * @example sum([1, 2])\n */\n"
+    "function sum(items) {   \n  let t = 0;\n\n\n\n  for (const i of items) t += i;\n  return t;\n}\n"
+)
+
+
+def check() -> None:
+    prepared = prepare_code(LICENSED, "javascript")
+    assert len(prepared.regions) == 3, prepared.regions
+    optimized = prepared.text.replace("let t = 0;", "let t = 0.0;")
+    restored = prepared.restore(optimized)
+    assert "Apache License" in restored and "QUJD" * 300 in restored and "@example" in restored
+    assert prepared.original_line(len(prepared.line_map)) == len(LICENSED.split("\n"))
+    print(f"ok: restore() com {len(prepared.regions)} trechos omitidos")
+
+    patch = "@@ -1,3 +1,3 @@\n function sum(items) {\n-  let t = 0;\n+  let t = 0.0;\n"
+    patched = prepared.apply_edits(locate_edits(prepared.text.split("\n"), patch))
+    assert patched == LICENSED.replace("let t = 0;", "let t = 0.0;"), patched
+    print("ok: patch do texto compactado aplicado ao código original")
+
+
+def collect(dirs, limit):
+    extensions = {}
+    for language, suffixes in LanguageDetector.EXTENSIONS.items():
+        for suffix in suffixes:
+            if language in POLICIES:
+                extensions.setdefault(suffix, language)
+    files = []
+    for root_dir in dirs:
+        for root, _, names in os.walk(root_dir):
+            for name in names:
+                language = extensions.get(os.path.splitext(name)[1].lower())
+                if language:
+                    files.append((os.path.join(root, name), language))
+    random.Random(0).shuffle(files)
+    return files[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("dirs", nargs="+")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--ceiling", type=int, default=3000, help="max_tokens fixo anterior")
+    args = parser.parse_args()
+
+    check()
+    totals = defaultdict(lambda: [0, 0, 0, 0, 0])  # arquivos, tokens antes, depois, budget, bytes
+    elapsed = 0.0
+    mode_budget = dict.fromkeys(REVIEW_MODES, 0)
+    for path, language in collect(args.dirs, args.limit):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                # Trecho do tamanho de um chunk: o que vai num prompt
+                code = handle.read()[:DEFAULT_CHUNK_CHARS]
+        except (OSError, UnicodeDecodeError):
+            continue
+        start = time.perf_counter()
+        prepared = prepare_code(code, language)
+        elapsed += time.perf_counter() - start
+        row = totals[language]
+        row[0] += 1
+        row[1] += prepared.original_tokens
+        row[2] += prepared.tokens
+        row[3] += response_budget(prepared.tokens, args.ceiling)
+        row[4] += len(code)
+        for mode in REVIEW_MODES:
+            mode_budget[mode] += response_budget(prepared.tokens, args.ceiling, mode)
+
+    print(f"{'linguagem':<12}{'arquivos':>9}{'tokens':>10}{'compact.':>10}{'economia':>10}"
+          f"{'max_tokens':>12}{'chars/tok':>11}")
+    summary = [0, 0, 0, 0, 0]
+    for language, row in sorted(totals.items()):
+        summary = [a + b for a, b in zip(summary, row)]
+        print(f"{language:<12}{row[0]:>9}{row[1]:>10}{row[2]:>10}{1 - row[2] / row[1]:>10.1%}"
+              f"{row[3] / row[0]:>12.0f}{row[4] / row[1]:>11.2f}")
+    files, before, after, budget, size = summary
+    if files:
+        print(f"{'total':<12}{files:>9}{before:>10}{after:>10}{1 - after / before:>10.1%}"
+              f"{budget / files:>12.0f}{size / before:>11.2f}")
+        print(f"max_tokens médio {budget / files:.0f} (antes {args.ceiling} fixo); "
+              f"preparação {elapsed * 1000 / (size / 1024):.3f} ms/KB")
+        print("max_tokens médio por modo: " + ", ".join(
+            f"{mode} {total / files:.0f}" for mode, total in mode_budget.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark - agendador de cota Groq e pool de chaves
+GroqAdapter real (SDK groq) contra o servidor falso com cota por chave
+(fake_groq_server.py), N análises concorrentes em três configurações:
+    sem agendador  - dispara e descobre o limite pelos 429 (retry com backoff)
+    1 chave        - RateLimiter com a cota da chave: espera a vez
+    2 chaves       - RateLimiter distribuindo entre duas chaves
+Mede sucessos, 429 recebidos do servidor e tempo total.
+
+Uso: python benchmarks/bench_rate_limit.py [--requests 40] [--rpm 8] [--window 2]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.ai_layer.groq_adapter import GroqAdapter  # noqa: E402
+from review_engine.resilience import (  # noqa: E402
+    CircuitBreaker, RateLimiter, ResilientCaller, RetryPolicy
+)
+from fake_groq_server import FakeGroqServer  # noqa: E402
+
+
+KEYS = ["gsk_bench_key_aaaa", "gsk_bench_key_bbbb"]
+
+CODE = """def total_{n}(items):
+    result = 0
+    for item in items:
+        result = result + item
+    return result
+"""
+
+
+def run(args, label: str, limiter: RateLimiter):
+    server = FakeGroqServer(args.rpm, args.tpm, window=args.window, latency=args.latency).start()
+    os.environ["GROQ_BASE_URL"] = server.url
+    resilience = ResilientCaller(RetryPolicy(max_attempts=args.attempts, base_delay=0.05,
+                                             deadline=args.deadline),
+                                 CircuitBreaker(enabled=False))
+    adapter = GroqAdapter(KEYS[0], resilience=resilience, rate_limiter=limiter)
+    adapter.response_cache = None
+
+    def analyze(n: int) -> bool:
+        try:
+            adapter.analyze(CODE.format(n=n), "python", raise_errors=True, mode="issues")
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(analyze, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    served = server.stats()
+    server.stop()
+    stats = limiter.stats()
+    print(f"  {label:<16} sucesso {sum(results):>3}/{args.requests}  429 {served['rejected']:>4}  "
+          f"tempo {elapsed:5.1f}s  ({sum(results) / elapsed:.1f} análises/s)  "
+          f"esperas {stats['waits']}, trocas de chave {stats['failovers']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=8, help="requisições por janela e chave")
+    parser.add_argument("--tpm", type=int, default=20000, help="tokens por janela e chave")
+    parser.add_argument("--window", type=float, default=2.0, help="janela da cota (s); 60 = por minuto")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--deadline", type=float, default=30.0)
+    args = parser.parse_args()
+
+    limits = dict(requests_per_minute=args.rpm, tokens_per_minute=args.tpm, period=args.window)
+    print(f"cota por chave: {args.rpm} req e {args.tpm} tokens a cada {args.window:g}s; "
+          f"{args.requests} análises, {args.concurrency} concorrentes")
+    run(args, "sem agendador", RateLimiter(KEYS[:1], enabled=False, **limits))
+    run(args, "1 chave", RateLimiter(KEYS[:1], **limits))
+    run(args, "2 chaves", RateLimiter(KEYS, **limits))
+
+
+if __name__ == "__main__":
+    main()
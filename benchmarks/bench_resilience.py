@@ -0,0 +1,155 @@
+"""
+Benchmark - retry, circuit breaker e hedging das chamadas Groq
+Cliente Groq falso em três cenários:
+    transient - 20% das chamadas falham com 503: taxa de sucesso sem e com retry
+    outage    - toda chamada trava até o timeout: latência por análise do
+                engine sem e com circuit breaker (caminho só plugin)
+    tail      - 5% das chamadas demoram 20x: p50/p99 sem e com hedging
+
+Uso: python benchmarks/bench_resilience.py [--requests 200] [--latency 0.02]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.core.engine import ReviewEngine  # noqa: E402
+from review_engine.core.ai_gate import AIGatePolicy  # noqa: E402
+from review_engine.cache.result_cache import InMemoryResultCache  # noqa: E402
+from review_engine.resilience import (  # noqa: E402
+    CircuitBreaker, HedgePolicy, ResilientCaller, RetryPolicy
+)
+
+
+REVIEW = json.dumps({"qualityScore": 80, "issues": [], "explanation": "ok", "optimizedCode": ""})
+
+CODE = """def total(items):
+    result = 0
+    for item in items:
+        result = result + item
+    return result
+"""
+
+
+class UpstreamError(Exception):
+    """Erro HTTP do SDK (status_code como em groq.APIStatusError)"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class APITimeoutError(Exception):
+    """Mesmo nome do timeout do SDK"""
+
+
+class FakeCompletions:
+    def __init__(self, latency: float, error_rate: float = 0.0, hang: bool = False,
+                 slow_rate: float = 0.0, slow_factor: float = 20.0, seed: int = 7):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hang = hang
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create(self, timeout: float = 60.0, **kwargs):
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+        if self.hang:
+            time.sleep(min(timeout, 10 * self.latency))
+            raise APITimeoutError("Request timed out.")
+        latency = self.latency * (self.slow_factor if roll < self.slow_rate else 1)
+        time.sleep(min(latency, timeout))
+        if latency > timeout:
+            raise APITimeoutError("Request timed out.")
+        if roll > 1 - self.error_rate:
+            raise UpstreamError(503)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=REVIEW))])
+
+
+def transient(args):
+    print("transient: 20% das chamadas com 503")
+    for attempts in (1, 3):
+        completions = FakeCompletions(args.latency, error_rate=0.2)
+        caller = ResilientCaller(RetryPolicy(max_attempts=attempts, base_delay=args.latency),
+                                 CircuitBreaker(enabled=False))
+        ok = 0
+        for _ in range(args.requests):
+            try:
+                caller.call(lambda timeout: completions.create(timeout=timeout))
+                ok += 1
+            except UpstreamError:
+                pass
+        print(f"  tentativas={attempts}: sucesso {ok / args.requests:.1%}, "
+              f"chamadas upstream {completions.calls}, retries {caller.retries}")
+
+
+def outage(args):
+    print("outage: toda chamada trava até o timeout")
+    for breaker in (False, True):
+        engine = ReviewEngine(groq_api_key="bench", result_cache=InMemoryResultCache(),
+                              ai_gate=AIGatePolicy(enabled=False))
+        engine.similar_index.enabled = False
+        engine.ai_adapter.response_cache = None
+        engine.ai_adapter.rate_limiter.enabled = False  # cliente falso: sem cota Groq
+        engine.ai_adapter.resilience = ResilientCaller(
+            RetryPolicy(max_attempts=2, base_delay=args.latency, deadline=5 * args.latency),
+            CircuitBreaker(enabled=breaker, min_calls=10, cooldown=60)
+        )
+        completions = FakeCompletions(args.latency, hang=True)
+        engine.ai_adapter.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        durations, reasons = [], {}
+        for index in range(args.requests):
+            start = time.perf_counter()
+            result = engine.analyze(CODE + f"# {index}\n", "python")
+            durations.append(time.perf_counter() - start)
+            reasons[result.gate_reason] = reasons.get(result.gate_reason, 0) + 1
+        print(f"  breaker={'on' if breaker else 'off'}: média {statistics.mean(durations) * 1000:.1f} ms, "
+              f"chamadas upstream {completions.calls}, motivos {reasons}")
+
+
+def tail(args):
+    print("tail: 5% das chamadas 20x mais lentas")
+    for hedge in (False, True):
+        completions = FakeCompletions(args.latency, slow_rate=0.05)
+        caller = ResilientCaller(RetryPolicy(max_attempts=1), CircuitBreaker(enabled=False),
+                                 HedgePolicy(enabled=hedge, max_fraction=0.2))
+        durations = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            caller.call(lambda timeout: completions.create(timeout=timeout))
+            durations.append(time.perf_counter() - start)
+        durations.sort()
+        p50 = durations[len(durations) // 2]
+        p99 = durations[int(0.99 * len(durations)) - 1]
+        print(f"  hedge={'on' if hedge else 'off'}: p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, "
+              f"chamadas upstream {completions.calls}, hedges {caller.hedges} "
+              f"(venceram {caller.hedge_wins})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="latência normal por chamada (s)")
+    args = parser.parse_args()
+
+    transient(args)
+    outage(args)
+    tail(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark - Rule Engine dos plugins
+Compara a avaliação antiga (re.search/re.findall com string a cada chamada,
+uma varredura completa por regra) com RuleEngine (regex pré-compilado +
+pré-filtro por literais)
+
+Uso: python benchmarks/bench_rule_engine.py [--sizes 1,100] [--repeat 20]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_CACHE_ENABLED", "false")
+
+from review_engine.core import ReviewEngine  # noqa: E402
+
+
+SAMPLE = {
+    "python": "def total(items):\n    result = 0\n    for item in items:\n        result = result + item.price\n    return result\n\n",
+    "go": "func load(ctx context.Context) error {\n\tif err := fetch(ctx); err != nil {\n\t\treturn err\n\t}\n\treturn nil\n}\n\n",
+    "yaml": "services:\n  web:\n    image: app:1.2\n    ports:\n      - \"80:80\"\n",
+    "terraform": "variable \"region\" {\n  default = \"us-east-1\"\n}\n",
+    "swift": "struct Point {\n    let x: Double\n    let y: Double\n}\n\n",
+    "php": "<?php\nfunction soma($a, $b) {\n    return $a + $b;\n}\n",
+}
+
+
+def build_code(language: str, size_kb: int) -> str:
+    unit = SAMPLE.get(language, SAMPLE["python"])
+    return (unit * (size_kb * 1024 // len(unit) + 1))[:size_kb * 1024]
+
+
+def legacy_scan(patterns, code: str):
+    """Comportamento anterior: cada regra percorre o código inteiro"""
+    for rule in patterns.values():
+        if rule.find_all:
+            re.findall(rule.regex, code, rule.flags)
+        else:
+            re.search(rule.regex, code, rule.flags)
+
+
+def engine_scan(engine, patterns, code: str):
+    matches = engine.scan(code)
+    for rule_id in patterns:
+        matches.found(rule_id)
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,100", help="Tamanhos em KB")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = ReviewEngine()
+    plugins = {}
+    for plugin in list(engine.plugins.values()) + [engine.universal_plugin]:
+        if plugin.PATTERNS:
+            plugins[plugin.name] = plugin
+
+    print(f"{'plugin':<20}{'KB':>6}{'antes ms/KB':>14}{'depois ms/KB':>14}{'ganho':>8}")
+    for size_kb in [int(s) for s in args.sizes.split(",")]:
+        for name, plugin in sorted(plugins.items()):
+            language = plugin.get_supported_languages()[0]
+            code = build_code(language, size_kb)
+            rule_engine = plugin.compile_rules()
+
+            before = measure(lambda: legacy_scan(plugin.PATTERNS, code), args.repeat)
+            after = measure(lambda: engine_scan(rule_engine, plugin.PATTERNS, code), args.repeat)
+
+            speedup = before / after if after else float("inf")
+            print(f"{name:<20}{size_kb:>6}{before * 1000 / size_kb:>14.4f}"
+                  f"{after * 1000 / size_kb:>14.4f}{speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark - reuso de reviews AI de trechos quase idênticos
+Para arquivos Python reais, analisa o original (chamada AI) e depois
+variantes: renomeado (nomes locais trocados + linhas em branco e
+comentários), editado (uma linha nova no meio) e os outros arquivos.
+Conta chamadas ao cliente Groq falso, acertos por motivo, falsos
+positivos entre arquivos distintos e o custo do fingerprint por KB.
+
+Uso: python benchmarks/bench_similar.py DIR [--files 60] [--threshold 0.9] [--near-duplicates]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.core.engine import ReviewEngine  # noqa: E402
+from review_engine.core.ai_gate import AIGatePolicy  # noqa: E402
+from review_engine.cache.result_cache import InMemoryResultCache  # noqa: E402
+from review_engine.cache.similar_index import SimilarReviewIndex  # noqa: E402
+from review_engine.chunking.chunker import DEFAULT_CHUNK_CHARS  # noqa: E402
+
+
+STRINGS = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+
+REVIEW = {"qualityScore": 80,
+          "issues": [{"title": "Loop manual", "severity": "low", "description": "", "impact": ""}],
+          "explanation": "ok", "optimizedCode": ""}
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(REVIEW)))])
+
+
+def collect(root_dir: str, limit: int, index: SimilarReviewIndex):
+    files = []
+    for root, _, names in os.walk(root_dir):
+        for name in sorted(names):
+            if not name.endswith(".py"):
+                continue
+            with open(os.path.join(root, name), encoding="utf-8") as handle:
+                code = handle.read()
+            if len(code) <= DEFAULT_CHUNK_CHARS and index.fingerprint(code, "python") is not None:
+                files.append(code)
+    return files[:limit]
+
+
+def renamed(code: str, bound) -> str:
+    """Nomes locais trocados (fora de atributos e strings) + linhas em branco e comentários"""
+    pattern = re.compile(r'(' + STRINGS + r')|(?<![\w.])('
+                         + "|".join(map(re.escape, sorted(bound, key=len, reverse=True))) + r')(?!\w)')
+    code = pattern.sub(lambda match: match.group(1) or f"{match.group(2)}_v2", code)
+    lines = []
+    for number, line in enumerate(code.split("\n")):
+        lines.append(line.rstrip())
+        if number % 7 == 3:
+            lines.extend(["", "# revisado"])
+    return "\n".join(lines)
+
+
+def edited(code: str) -> str:
+    lines = code.split("\n")
+    middle = len(lines) // 2
+    indent = re.match(r'\s*', lines[middle]).group(0)
+    return "\n".join(lines[:middle] + [f"{indent}print('debug')"] + lines[middle:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("dir")
+    parser.add_argument("--files", type=int, default=60)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--near-duplicates", action="store_true", help="reaproveita também near_duplicate")
+    args = parser.parse_args()
+
+    index = SimilarReviewIndex(threshold=args.threshold, max_entries=4 * args.files,
+                               near_duplicates=args.near_duplicates)
+    files = collect(args.dir, args.files, index)
+
+    total_bytes = sum(len(code.encode("utf-8")) for code in files)
+    start = time.perf_counter()
+    for code in files:
+        index.fingerprint(code, "python")
+    per_kb = (time.perf_counter() - start) * 1000 / (total_bytes / 1024)
+    print(f"{len(files)} arquivos, fingerprint {per_kb:.3f} ms/KB")
+
+    engine = ReviewEngine(groq_api_key="bench", result_cache=InMemoryResultCache(),
+                          ai_gate=AIGatePolicy(enabled=False), similar_index=index,
+                          chunk_chars=4 * DEFAULT_CHUNK_CHARS)  # variantes crescem: sem chunks
+    engine.ai_adapter.response_cache = None
+    engine.ai_adapter.rate_limiter.enabled = False  # cliente falso: sem cota Groq
+    completions = FakeCompletions()
+    engine.ai_adapter.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    # Originais: todos vão para a AI (nenhum arquivo casa com outro)
+    originals = Counter(engine.analyze(code, "python").analysis_path for code in files)
+    assert originals == {"ai": len(files)}, f"falso positivo entre arquivos distintos: {originals}"
+
+    print(f"{'variante':<10}{'chamadas':>10}{'equivalent':>12}{'near':>8}{'reuso':>8}")
+    for name, variant in (("renomeado", lambda code: renamed(code, index.fingerprint(code, "python").bound)),
+                          ("editado", edited)):
+        before = completions.calls
+        reasons = Counter()
+        for code in files:
+            result = engine.analyze(variant(code), "python")
+            reasons[result.gate_reason if result.analysis_path == "similar" else "ai"] += 1
+        hits = reasons["equivalent"] + reasons["near_duplicate"]
+        print(f"{name:<10}{completions.calls - before:>10}{reasons['equivalent']:>12}"
+              f"{reasons['near_duplicate']:>8}{hits / len(files):>8.0%}")
+
+    print(json.dumps(index.stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark - Tempo de cold start
+Cada cenário roda em um processo Python novo (como uma função serverless
+fria) e mede import, construção do ReviewEngine e primeira análise
+
+Uso: python benchmarks/bench_startup.py [--repeat 7]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Chave fictícia: o cliente Groq é construído, mas nenhuma chamada é feita
+ENV = dict(os.environ, GROQ_API_KEY="gsk_" + "x" * 48, GROQ_CACHE_ENABLED="false")
+
+SCENARIOS = {
+    "engine": """
+t0 = time.perf_counter()
+from review_engine.core import ReviewEngine
+t1 = time.perf_counter()
+engine = ReviewEngine(groq_api_key=os.environ["GROQ_API_KEY"])
+t2 = time.perf_counter()
+engine.analyze("def f(x):\\n    return [i for i in x]\\n", "python", use_ai=False)
+t3 = time.perf_counter()
+result = {"import": t1 - t0, "init": t2 - t1, "first_analyze": t3 - t2}
+""",
+    "api.index": """
+t0 = time.perf_counter()
+import api.index
+t1 = time.perf_counter()
+result = {"import": t1 - t0}
+""",
+}
+
+PRELUDE = """
+import contextlib, io, json, os, sys, time
+sys.path.insert(0, {root!r})
+with contextlib.redirect_stdout(io.StringIO()):
+{body}
+print(json.dumps(result))
+"""
+
+
+def run_once(body: str) -> dict:
+    indented = "\n".join("    " + line for line in body.strip().splitlines())
+    script = PRELUDE.format(root=ROOT, body=indented)
+    output = subprocess.run([sys.executable, "-c", script], env=ENV, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'cenário':<12}{'etapa':<16}{'mediana ms':>12}{'mín ms':>10}")
+    for name, body in SCENARIOS.items():
+        runs = [run_once(body) for _ in range(args.repeat)]
+        for step in runs[0]:
+            values = [run[step] * 1000 for run in runs]
+            print(f"{name:<12}{step:<16}{statistics.median(values):>12.1f}{min(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Servidor Groq falso - harness local com cota por chave
+POST /openai/v1/chat/completions compatível com o SDK groq (base_url
+apontando para cá): cada chave (Authorization: Bearer) tem limite de
+requisições e tokens por janela, reabastecidos continuamente como na API
+real (x-ratelimit-reset-* = tempo até a cota encher); acima dele responde
+429 com retry-after e os headers x-ratelimit-*.
+
+Uso direto: python benchmarks/fake_groq_server.py [--port 8765] [--rpm 30] [--tpm 6000]
+Em benchmarks: FakeGroqServer(...).start() e GROQ_BASE_URL=server.url
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+
+REVIEW = {"qualityScore": 80,
+          "issues": [{"title": "Loop manual", "description": "Use sum()", "severity": "low",
+                      "impact": "Menos iterações em Python"}],
+          "explanation": "ok", "optimizedCode": ""}
+
+
+def count_tokens(text: str) -> int:
+    """Contagem do servidor (~4 caracteres por token), diferente da estimativa do cliente"""
+    return max(1, len(text) // 4)
+
+
+class _Quota:
+    """Cota restante de uma chave (requisições e tokens)"""
+
+    def __init__(self, requests: float, tokens: float):
+        self.requests = requests
+        self.tokens = tokens
+        self.updated = time.monotonic()
+        self.accepted = 0
+        self.rejected = 0
+
+
+class FakeGroqServer:
+    """
+    Groq local: requests_per_window e tokens_per_window por chave em
+    window segundos (60 = limites por minuto); latency simula o modelo
+    """
+
+    def __init__(self, requests_per_window: int = 30, tokens_per_window: int = 6000,
+                 window: float = 60.0, latency: float = 0.05, port: int = 0):
+        self.requests_per_window = requests_per_window
+        self.tokens_per_window = tokens_per_window
+        self.window = window
+        self.latency = latency
+        self._quotas: Dict[str, _Quota] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGroqServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"accepted": sum(q.accepted for q in self._quotas.values()),
+                    "rejected": sum(q.rejected for q in self._quotas.values()),
+                    "perKey": {key[-4:]: {"accepted": q.accepted, "rejected": q.rejected}
+                               for key, q in self._quotas.items()}}
+
+    def admit(self, key: str, tokens: int) -> Tuple[bool, dict]:
+        """Consome a cota da chave (True) ou recusa (False); headers x-ratelimit-*"""
+        now = time.monotonic()
+        request_rate = self.requests_per_window / self.window
+        token_rate = self.tokens_per_window / self.window
+        with self._lock:
+            quota = self._quotas.setdefault(key, _Quota(self.requests_per_window, self.tokens_per_window))
+            elapsed = now - quota.updated
+            quota.requests = min(self.requests_per_window, quota.requests + elapsed * request_rate)
+            quota.tokens = min(self.tokens_per_window, quota.tokens + elapsed * token_rate)
+            quota.updated = now
+            allowed = quota.requests >= 1 and quota.tokens >= tokens
+            if allowed:
+                quota.requests -= 1
+                quota.tokens -= tokens
+                quota.accepted += 1
+            else:
+                quota.rejected += 1
+            retry = max((1 - quota.requests) / request_rate, (tokens - quota.tokens) / token_rate)
+            reset_requests = (self.requests_per_window - quota.requests) / request_rate
+            reset_tokens = (self.tokens_per_window - quota.tokens) / token_rate
+            requests_left, tokens_left = int(quota.requests), int(quota.tokens)
+        headers = {
+            "x-ratelimit-limit-requests": str(self.requests_per_window),
+            "x-ratelimit-remaining-requests": str(requests_left),
+            "x-ratelimit-reset-requests": f"{reset_requests:.2f}s",
+            "x-ratelimit-limit-tokens": str(round(self.tokens_per_window * 60 / self.window)),
+            "x-ratelimit-remaining-tokens": str(tokens_left),
+            "x-ratelimit-reset-tokens": f"{reset_tokens:.2f}s",
+        }
+        if not allowed:
+            headers["retry-after"] = f"{max(retry, 0.01):.2f}"
+        return allowed, headers
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                key = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+                prompt = sum(count_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+                content = json.dumps(REVIEW)
+                completion = count_tokens(content)
+                allowed, headers = server.admit(key, prompt + completion)
+                if not allowed:
+                    self._send(429, {"error": {"message": "Rate limit reached", "type": "tokens",
+                                               "code": "rate_limit_exceeded"}}, headers)
+                    return
+                time.sleep(server.latency)
+                self._send(200, {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "llama-3.3-70b-versatile"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt, "completion_tokens": completion,
+                              "total_tokens": prompt + completion}
+                }, headers)
+
+            def _send(self, status: int, payload: dict, headers: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=30)
+    parser.add_argument("--tpm", type=int, default=6000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+    server = FakeGroqServer(args.rpm, args.tpm, latency=args.latency, port=args.port).start()
+    print(f"Groq falso em {server.url} (GROQ_BASE_URL={server.url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
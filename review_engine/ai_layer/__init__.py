@@ -1,4 +1,5 @@
 """AI Layer module"""
 from .groq_adapter import GroqAdapter
+from .async_groq_adapter import AsyncGroqAdapter
 
-__all__ = ['GroqAdapter']
+__all__ = ['GroqAdapter', 'AsyncGroqAdapter']
@@ -0,0 +1,245 @@
+"""
+Async Groq Adapter - AI Layer
+Variante asyncio do GroqAdapter com limite de requisições simultâneas
+e coalescing (single-flight) de prompts idênticos
+"""
+import asyncio
+import logging
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from review_engine.core.dto import ReviewResult
+from review_engine.ai_layer.groq_adapter import GroqAdapter, JSON_MODE
+from review_engine.cache.response_cache import DiskResponseCache, hash_prompt
+from review_engine.chunking.prompt_budget import PreparedCode, request_tokens
+from review_engine.resilience import (Deadline, DeadlineExceeded, RateLimiter, ResilientCaller,
+                                      create_with_headers_async)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """Chamada upstream em andamento e quantos chamadores a aguardam"""
+    
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _LoopState:
+    """Primitivas asyncio ficam presas ao loop em que são usadas"""
+    
+    def __init__(self, api_key: str, max_in_flight: int):
+        from groq import AsyncGroq  # import tardio, ver GroqAdapter.client
+        self.api_key = api_key
+        self.client = AsyncGroq(api_key=api_key, max_retries=0)
+        self.clients: Dict[str, object] = {}  # demais chaves do pool
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight: Dict[str, _Flight] = {}
+    
+    def client_for(self, key: Optional[str]):
+        """Cliente de uma chave do pool (a principal usa self.client)"""
+        if key is None or key == self.api_key:
+            return self.client
+        client = self.clients.get(key)
+        if client is None:
+            from groq import AsyncGroq
+            client = self.clients[key] = AsyncGroq(api_key=key, max_retries=0)
+        return client
+
+
+class AsyncGroqAdapter(GroqAdapter):
+    """
+    Adaptador assíncrono para API Groq (AsyncGroq)
+    
+    - Semáforo limita chamadas upstream simultâneas (max_in_flight)
+    - Prompts idênticos concorrentes compartilham uma única chamada
+    - Reaproveita prompt, parser e cache em disco do GroqAdapter
+    """
+    
+    def __init__(self, api_key: Optional[str] = None,
+                 response_cache: Optional[DiskResponseCache] = None,
+                 max_in_flight: int = 4,
+                 resilience: Optional[ResilientCaller] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, response_cache=response_cache, resilience=resilience,
+                         rate_limiter=rate_limiter)
+        self.max_in_flight = max_in_flight
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = \
+            weakref.WeakKeyDictionary()
+        
+        # Contadores
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+    
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState(self.api_key, self.max_in_flight)
+            self._states[loop] = state
+        return state
+    
+    async def analyze_async(self, code: str, language: str,
+                            raise_errors: bool = False,
+                            context_code: Optional[str] = None,
+                            mode: str = "full",
+                            deadline: Optional[Deadline] = None) -> ReviewResult:
+        """
+        Executa análise semântica via AI sem bloquear o event loop
+        Com deadline, desiste da espera quando o prazo acaba (DeadlineExceeded)
+        """
+        if not self.api_key:
+            return self._empty_result(language, mode)
+        
+        try:
+            messages, max_tokens, prepared = self._prepare_request(code, language, context_code, mode)
+            
+            cache_key = hash_prompt(self.model, messages,
+                                    temperature=self.temperature,
+                                    max_tokens=max_tokens)
+            content, data, path = await self._fetch_content(cache_key, messages, max_tokens,
+                                                            mode, prepared, deadline)
+            
+            return self._to_result(content, data, path, language, prepared, mode)
+            
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Erro na análise Groq (async): {e}")
+            return self._empty_result(language, mode)
+    
+    async def _fetch_content(self, cache_key: str, messages: list, max_tokens: int,
+                             mode: str = "full",
+                             prepared: Optional[PreparedCode] = None,
+                             deadline: Optional[Deadline] = None) -> Tuple[str, Optional[dict], str]:
+        """
+        Single-flight: a chamada upstream roda em uma task compartilhada
+        entre todos os chamadores do mesmo prompt; só é cancelada quando
+        o último chamador desiste (cliente desconectou ou prazo do chamador
+        esgotado: cada um espera no máximo o próprio deadline)
+        
+        Prompts iguais têm o mesmo código compactado: o prepared do primeiro
+        chamador serve para validar o patch de todos
+        """
+        state = self._state()
+        
+        flight = state.in_flight.get(cache_key)
+        if flight is None:
+            task = asyncio.get_running_loop().create_task(
+                self._request(state, cache_key, messages, max_tokens, mode, prepared)
+            )
+            flight = _Flight(task)
+            state.in_flight[cache_key] = flight
+            
+            def _release(_task, key=cache_key, current=flight):
+                if state.in_flight.get(key) is current:
+                    del state.in_flight[key]
+            task.add_done_callback(_release)
+        else:
+            self.coalesced_calls += 1
+        
+        flight.waiters += 1
+        try:
+            # shield: cancelar um chamador não cancela a chamada compartilhada
+            waiting = asyncio.shield(flight.task)
+            timeout = deadline.remaining() if deadline is not None else None
+            if timeout is None:
+                return await waiting
+            try:
+                return await asyncio.wait_for(waiting, timeout)
+            except asyncio.TimeoutError:
+                if flight.task.done():
+                    raise
+                raise DeadlineExceeded(f"prazo esgotado aguardando o Groq ({deadline.cause()})") from None
+        except (asyncio.CancelledError, DeadlineExceeded):
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+    
+    async def _request(self, state: _LoopState, cache_key: str, messages: list,
+                       max_tokens: int, mode: str = "full",
+                       prepared: Optional[PreparedCode] = None) -> Tuple[str, Optional[dict], str]:
+        """
+        Consulta cache em disco e, se necessário, chama a API respeitando o
+        semáforo; leitura e reparo da resposta ficam na task compartilhada
+        """
+        loop = asyncio.get_running_loop()
+        
+        content = None
+        if self.response_cache:
+            content = await loop.run_in_executor(None, self.response_cache.get, cache_key)
+            if content is not None:
+                logger.info("Resposta Groq obtida do cache em disco")
+        cached = content is not None
+        
+        if not cached:
+            async with state.semaphore:
+                response = await self._create_async(
+                    state,
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    response_format=JSON_MODE
+                )
+            content = response.choices[0].message.content
+        
+        data, errors, path = self._read_response(content, mode, prepared)
+        if errors:
+            repaired = await self._repair_async(state, content, errors, mode, prepared)
+            if repaired is not None:
+                content, data, path = repaired
+        
+        if self._should_store(path, cached) and content:
+            await loop.run_in_executor(None, self.response_cache.set, cache_key, content)
+        return content, data, path
+    
+    async def _repair_async(self, state: _LoopState, content: str, errors: List[str],
+                            mode: str = "full",
+                            prepared: Optional[PreparedCode] = None) -> Optional[Tuple[str, dict, str]]:
+        """Versão assíncrona de GroqAdapter._repair (mesmo semáforo)"""
+        self._count("repair_calls")
+        try:
+            async with state.semaphore:
+                response = await self._create_async(
+                    state,
+                    hedge=False,
+                    model=self.model,
+                    messages=self._repair_messages(content, errors, mode, prepared),
+                    temperature=0,
+                    max_tokens=self.max_tokens,
+                    response_format=JSON_MODE
+                )
+            fixed = response.choices[0].message.content
+        except Exception as e:
+            logger.warning(f"Reparo da resposta AI falhou: {e}")
+            return None
+        return self._accept_repair(fixed, errors, mode, prepared)
+    
+    async def _create_async(self, state: _LoopState, hedge: bool = True, **kwargs):
+        """
+        chat.completions.create via ResilientCaller e RateLimiter (retries,
+        hedges e trocas de chave após 429 contam como upstream)
+        """
+        async def send(key: Optional[str], timeout: float):
+            self.upstream_calls += 1
+            return await create_with_headers_async(state.client_for(key).chat.completions,
+                                                   timeout=timeout, **kwargs)
+        tokens = request_tokens(kwargs["messages"], kwargs.get("max_tokens"))
+        return await self.resilience.call_async(
+            self.rate_limiter.schedule_async(send, tokens), hedge=hedge
+        )
+    
+    def stats(self) -> dict:
+        """Contadores do caminho assíncrono"""
+        return {
+            "maxInFlight": self.max_in_flight,
+            "inFlight": sum(len(s.in_flight) for s in list(self._states.values())),
+            "upstreamCalls": self.upstream_calls,
+            "coalescedCalls": self.coalesced_calls,
+            "parse": self.parse_stats()
+        }
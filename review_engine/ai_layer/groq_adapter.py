@@ -3,16 +3,115 @@ Groq AI Adapter - AI Layer
 Adaptador para integração com API Groq mantendo compatibilidade
 """
 import os
+import re
+import math
+import json
 import logging
-from typing import Optional
-import markdown2
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from groq import Groq
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel, ImpactLevel
+from review_engine.cache.response_cache import DiskResponseCache, hash_prompt
+from review_engine.ai_layer.stream_parser import IssueStreamExtractor
+from review_engine.chunking.prompt_budget import PreparedCode, prepare_code, request_tokens, response_budget
+from review_engine.chunking.patch import PatchError, locate_edits, make_patch
+from review_engine.chunking.packing import PACK_OUTPUT_TOKENS, pack_id
+from review_engine.ai_layer.tolerant_json import loads_tolerant
+from review_engine.ai_layer.response_schema import validate_review
+from review_engine.resilience import (Deadline, DeadlineExceeded, RateLimiter, ResilientCaller,
+                                      create_with_headers)
 
 
 logger = logging.getLogger(__name__)
 
+# JSON mode da API: a resposta é sempre um objeto JSON sintaticamente válido
+JSON_MODE = {"type": "json_object"}
+
+# Caminho de leitura de cada resultado entregue (parse_stats):
+# fast = json.loads + schema ok; tolerant = leitor tolerante + schema ok;
+# repaired = schema ok após o re-prompt de reparo; degraded = dados fora do
+# schema usados mesmo assim; fallback = nenhum objeto JSON na resposta
+PARSE_PATHS = ("fast", "tolerant", "repaired", "degraded", "fallback")
+
+# Só respostas conformes ao schema vão para o cache em disco
+VALID_PATHS = ("fast", "tolerant", "repaired")
+
+# Máximo de problemas do validador listados no re-prompt de reparo
+MAX_REPAIR_ERRORS = 10
+
+REPAIR_PROMPT = """O JSON abaixo não segue o formato pedido. Problemas encontrados:
+{errors}
+
+Corrija APENAS esses problemas, mantendo o restante do conteúdo, e retorne somente o JSON corrigido.
+Campos: qualityScore (número 0-100), issues (lista de {{title, description, severity, impact}}, severity em critical/high/medium/low){fields}.
+{source}
+JSON:
+{content}"""
+
+# Campos além de qualityScore/issues em cada modo (REVIEW_MODES)
+REPAIR_FIELDS = {
+    "full": ", optimizedCode, explanation, metrics",
+    "patch": ", patch (unified diff contra o código abaixo), explanation, metrics",
+    "issues": "",
+}
+
+# Instruções 2 e 3 do prompt por modo
+MODE_RULES = {
+    "full": """2. NO CAMPO "explanation": Use APENAS texto descritivo, SEM blocos de código
+3. NO CAMPO "optimizedCode": Coloque o código otimizado (use \\n para quebras de linha)""",
+    "patch": """2. NO CAMPO "patch": unified diff (hunks "@@ -a,b +c,d @@", linhas com " ", "-" ou "+") que transforma o código EXATAMENTE como enviado acima no código otimizado; só os trechos alterados, com 2 linhas de contexto. NÃO reescreva o código inteiro
+3. NO CAMPO "explanation": no máximo 3 frases, SEM blocos de código""",
+    "issues": """2. Retorne APENAS qualityScore e issues: SEM optimizedCode, explanation ou metrics
+3. Em cada issue descreva o problema e a correção em texto, SEM blocos de código""",
+}
+
+OMITTED_RULES = {
+    "full": "copie-as inalteradas no optimizedCode",
+    "patch": "não as altere (podem aparecer como contexto no patch)",
+    "issues": "ignore-as",
+}
+
+_ISSUES_EXAMPLE = """  "qualityScore": 75,
+  "issues": [
+    {
+      "title": "Título curto do problema",
+      "description": "Descrição detalhada do problema",
+      "severity": "high",
+      "impact": "Impacto específico no desempenho ou manutenção"
+    }
+  ]"""
+
+_METRICS_EXAMPLE = """  "metrics": {
+    "complexityReduction": "20%",
+    "memoryImpact": "-15% memória",
+    "estimatedSpeedup": "2x",
+    "energySavings": "-10% CPU"
+  }"""
+
+RESPONSE_FORMATS = {
+    "full": f"""{{
+{_ISSUES_EXAMPLE},
+  "optimizedCode": "codigo otimizado sem formatação de markdown",
+  "explanation": "Análise textual SEM blocos de código. Explique os problemas encontrados e as soluções aplicadas de forma descritiva. Liste os problemas em bullet points. Descreva as vantagens da refatoração.",
+{_METRICS_EXAMPLE}
+}}
+
+**PROIBIDO no campo explanation:** Blocos ```code```, trechos de código, exemplos de código.
+**PERMITIDO no campo explanation:** Texto descritivo, bullets, títulos markdown (# ## ###).""",
+    "patch": f"""{{
+{_ISSUES_EXAMPLE},
+  "patch": "@@ -3,4 +3,2 @@\\n def total(items):\\n-    s = 0\\n-    for i in items: s += i\\n-    return s\\n+    return sum(items)\\n",
+  "explanation": "Resumo curto das mudanças aplicadas.",
+{_METRICS_EXAMPLE}
+}}""",
+    "issues": f"""{{
+{_ISSUES_EXAMPLE}
+}}""",
+}
+
+_CODE_BLOCK = re.compile(r'```[\s\S]*?```')
+_INLINE_CODE = re.compile(r'`[^`\n]{50,}`')
+
 
 class GroqAdapter:
     """
@@ -20,237 +119,599 @@ class GroqAdapter:
     Converte análise AI para formato padronizado ReviewResult
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 response_cache: Optional[DiskResponseCache] = None,
+                 resilience: Optional[ResilientCaller] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
-        self.client = Groq(api_key=self.api_key) if self.api_key else None
+        self._client = None
+        self._clients: Dict[str, object] = {}  # demais chaves do pool
+        self._client_lock = threading.Lock()
         self.model = "llama-3.3-70b-versatile"
+        self.temperature = 0.3
+        # Teto: cada requisição usa response_budget() do código enviado
+        self.max_tokens = 3000
         
-        if not self.client:
+        # Cache persistente (compartilhado entre workers e deploys)
+        self.response_cache = response_cache if response_cache is not None else DiskResponseCache.from_env()
+        
+        # Retry com backoff, circuit breaker e hedging (o SDK não repete sozinho)
+        self.resilience = resilience if resilience is not None else ResilientCaller.from_env()
+        
+        # Cota por chave (requisições/tokens por minuto) e pool de chaves (GROQ_API_KEYS)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_env(self.api_key)
+        
+        # Contadores de leitura da resposta (ver PARSE_PATHS)
+        self.parse_counts = dict.fromkeys(PARSE_PATHS, 0)
+        self.repair_calls = 0
+        # Prompts agrupados (analyze_packed) e arquivos sem resposta válida neles
+        self.packed_calls = 0
+        self.packed_files = 0
+        self.pack_misses = 0
+        self._stats_lock = threading.Lock()
+        
+        if not self.api_key:
             logger.warning("Groq API não configurada. Análise AI desabilitada.")
     
-    def analyze(self, code: str, language: str) -> ReviewResult:
+    @property
+    def client(self):
+        """
+        Cliente Groq criado no primeiro uso: o SDK (groq + pydantic + httpx)
+        leva ~200ms para importar e não deve pesar no cold start
+        """
+        if self._client is None and self.api_key:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import Groq
+                    self._client = Groq(api_key=self.api_key, max_retries=0)
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    def _client_for(self, key: Optional[str]):
+        """Cliente de uma chave do pool (a principal usa self.client)"""
+        if key is None or key == self.api_key:
+            return self.client
+        client = self._clients.get(key)
+        if client is None:
+            with self._client_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    from groq import Groq
+                    client = self._clients[key] = Groq(api_key=key, max_retries=0)
+        return client
+    
+    def _create(self, hedge: bool = True, deadline: Optional[Deadline] = None, **kwargs):
+        """
+        chat.completions.create via ResilientCaller (timeout = prazo restante);
+        cada tentativa espera a cota e sai pela chave escolhida no RateLimiter
+        """
+        def send(key: Optional[str], timeout: float):
+            return create_with_headers(self._client_for(key).chat.completions,
+                                       timeout=timeout, **kwargs)
+        tokens = request_tokens(kwargs["messages"], kwargs.get("max_tokens"))
+        return self.resilience.call(
+            self.rate_limiter.schedule(send, tokens, deadline),
+            hedge=hedge, request_deadline=deadline
+        )
+    
+    def analyze(self, code: str, language: str, raise_errors: bool = False,
+                context_code: Optional[str] = None, mode: str = "full",
+                deadline: Optional[Deadline] = None) -> ReviewResult:
         """
         Executa análise semântica via AI e converte para ReviewResult
+        
+        Args:
+            raise_errors: Se True, propaga falhas da API em vez de
+                          retornar resultado vazio (usado pelo cache do engine)
+            context_code: Linhas anteriores ao trecho (análise em chunks),
+                          enviadas apenas como referência
+            mode: "issues", "patch" (diff aplicado aqui) ou "full"
+            deadline: Prazo/cancelamento da requisição (DeadlineExceeded)
         """
         if not self.client:
-            return self._empty_result(language)
+            return self._empty_result(language, mode)
         
         try:
             # Prompt otimizado para retornar JSON estruturado
-            prompt = self._build_prompt(code, language)
+            messages, max_tokens, prepared = self._prepare_request(code, language, context_code, mode)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=3000
-            )
+            # Resposta já paga anteriormente (qualquer worker)?
+            cache_key = hash_prompt(self.model, messages,
+                                    temperature=self.temperature,
+                                    max_tokens=max_tokens)
+            content = self.response_cache.get(cache_key) if self.response_cache else None
+            cached = content is not None
             
-            content = response.choices[0].message.content
+            if not cached:
+                response = self._create(
+                    deadline=deadline,
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    response_format=JSON_MODE
+                )
+                content = response.choices[0].message.content
+            else:
+                logger.info("Resposta Groq obtida do cache em disco")
             
             # Parser da resposta AI para ReviewResult
-            return self._parse_ai_response(content, language)
+            return self._finish(content, language, cache_key, cached, prepared, mode, deadline)
             
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Erro na análise Groq: {e}")
-            return self._empty_result(language)
+            return self._empty_result(language, mode)
     
-    def _build_prompt(self, code: str, language: str) -> str:
-        """Constrói prompt estruturado para a AI"""
+    def analyze_stream(self, code: str, language: str,
+                       raise_errors: bool = False,
+                       context_code: Optional[str] = None,
+                       mode: str = "full",
+                       deadline: Optional[Deadline] = None) -> Iterator[Tuple[str, object]]:
+        """
+        Versão streaming de analyze() (Groq stream=True)
+        
+        Yields:
+            ("issue", Issue) assim que cada issue chega no texto parcial
+            ("result", ReviewResult) ao final, com a resposta completa
+        """
+        if not self.client:
+            yield "result", self._empty_result(language, mode)
+            return
+        
+        try:
+            messages, max_tokens, prepared = self._prepare_request(code, language, context_code, mode)
+            
+            cache_key = hash_prompt(self.model, messages,
+                                    temperature=self.temperature,
+                                    max_tokens=max_tokens)
+            content = self.response_cache.get(cache_key) if self.response_cache else None
+            cached = content is not None
+            
+            if not cached:
+                # Sem JSON mode: a API não o aceita junto com stream=True;
+                # a resposta final passa pelo mesmo validador
+                extractor = IssueStreamExtractor()
+                parts = []
+                # Só a abertura do stream é repetida; sem hedge (issues já emitidas)
+                stream = self._create(
+                    hedge=False,
+                    deadline=deadline,
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    stream=True
+                )
+                
+                for chunk in stream:
+                    if deadline is not None and deadline.expired():
+                        # Fechar o stream encerra a conexão (libera o upstream)
+                        getattr(stream, "close", lambda: None)()
+                        raise DeadlineExceeded(f"stream Groq interrompido ({deadline.cause()})")
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    for issue_data in extractor.feed(delta):
+                        yield "issue", self._build_issue(issue_data)
+                
+                content = "".join(parts)
+            
+            yield "result", self._finish(content, language, cache_key, cached, prepared, mode, deadline)
+            
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Erro na análise Groq (stream): {e}")
+            yield "result", self._empty_result(language, mode)
+    
+    def analyze_packed(self, snippets: List[Tuple[str, str]], mode: str = "full",
+                       raise_errors: bool = False) -> List[Optional[ReviewResult]]:
+        """
+        Analisa vários arquivos pequenos em uma única chamada
+        
+        Args:
+            snippets: [(código, linguagem)], já agrupados (plan_packs)
+        
+        Returns:
+            Um ReviewResult por arquivo, ou None para o arquivo cuja parte da
+            resposta faltou ou veio fora do schema (o chamador o reenvia sozinho)
+        """
+        if not self.client or not snippets:
+            return [None] * len(snippets)
+        
+        try:
+            prepared = [prepare_code(code, language) for code, language in snippets]
+            ids = [pack_id(code, language) for code, language in snippets]
+            languages = [language for _, language in snippets]
+            prompt = self._build_pack_prompt(prepared, languages, ids, mode)
+            messages = [{"role": "user", "content": prompt}]
+            max_tokens = min(PACK_OUTPUT_TOKENS, sum(
+                response_budget(item.tokens, self.max_tokens, mode) for item in prepared
+            ))
+            
+            cache_key = hash_prompt(self.model, messages,
+                                    temperature=self.temperature,
+                                    max_tokens=max_tokens)
+            content = self.response_cache.get(cache_key) if self.response_cache else None
+            cached = content is not None
+            
+            if not cached:
+                response = self._create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    response_format=JSON_MODE
+                )
+                content = response.choices[0].message.content
+            
+            results = self._split_pack(content, prepared, languages, ids, mode)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Erro na análise Groq (agrupada): {e}")
+            return [None] * len(snippets)
+        
+        misses = results.count(None)
+        self._count("packed_calls")
+        self._count("packed_files", len(snippets))
+        self._count("pack_misses", misses)
+        if misses:
+            logger.warning(f"Resposta agrupada sem {misses}/{len(snippets)} arquivos válidos")
+        elif not cached and self.response_cache and content:
+            self.response_cache.set(cache_key, content)
+        return results
+    
+    def _split_pack(self, content: str, prepared: List[PreparedCode], languages: List[str],
+                    ids: List[str], mode: str) -> List[Optional[ReviewResult]]:
+        """Separa a resposta {"files": [...]} por id e valida cada arquivo"""
+        data, path = _loads_strict(content), "fast"
+        if data is None:
+            data, path = loads_tolerant(content or ""), "tolerant"
+        
+        entries = {}
+        files = data.get("files") if isinstance(data, dict) else None
+        for entry in _as_list(files):
+            if isinstance(entry, dict) and isinstance(entry.get("id"), str):
+                entries.setdefault(entry["id"].strip(), entry)
+        
+        results: List[Optional[ReviewResult]] = []
+        for item, language, file_id in zip(prepared, languages, ids):
+            entry = entries.get(file_id)
+            if entry is None or self._validate(entry, mode, item):
+                results.append(None)
+                continue
+            results.append(self._to_result(content, entry, path, language, item, mode))
+        return results
+    
+    def _prepare_request(self, code: str, language: str,
+                         context_code: Optional[str] = None,
+                         mode: str = "full") -> Tuple[list, int, PreparedCode]:
+        """
+        Mensagens com o código compactado, max_tokens proporcional ao
+        código enviado e ao modo, e o mapeamento para restaurar o
+        optimizedCode (ou aplicar o patch)
+        """
+        prepared = prepare_code(code, language)
+        if context_code:
+            context_code = prepare_code(context_code, language).text
+        prompt = self._build_prompt(prepared.text, language, context_code,
+                                    omitted=bool(prepared.regions), mode=mode)
+        max_tokens = response_budget(prepared.tokens, self.max_tokens, mode)
+        if prepared.compacted:
+            logger.debug(f"Prompt compactado: ~{prepared.original_tokens} → ~{prepared.tokens} tokens "
+                         f"de código, max_tokens={max_tokens}")
+        return [{"role": "user", "content": prompt}], max_tokens, prepared
+    
+    def _build_prompt(self, code: str, language: str,
+                      context_code: Optional[str] = None,
+                      omitted: bool = False, mode: str = "full") -> str:
+        """Constrói prompt estruturado para a AI (instruções e formato do modo)"""
+        context_block = ""
+        if context_code:
+            target = {"full": " e NÃO inclua no optimizedCode", "patch": " e NÃO inclua no patch"}.get(mode, "")
+            context_block = f"""**Contexto (linhas imediatamente anteriores, apenas referência; NÃO analise{target}):**
+```{language}
+{context_code}
+```
+
+"""
+        omitted_rule = ""
+        if omitted:
+            omitted_rule = ("6. Linhas com [omitido #n: ...] substituem licença, comentários longos "
+                            f"ou linhas minificadas: {OMITTED_RULES[mode]}\n")
         return f"""Você é um especialista em code review e eco-code (código sustentável).
 
 Analise o código {language.upper()} abaixo e retorne APENAS um JSON válido.
 
-**Código para análise:**
+{context_block}**Código para análise:**
 ```{language}
 {code}
 ```
 
 **INSTRUÇÕES CRÍTICAS:**
 1. Retorne APENAS o JSON, sem texto antes ou depois
-2. NO CAMPO "explanation": Use APENAS texto descritivo, SEM blocos de código
-3. NO CAMPO "optimizedCode": Coloque o código otimizado (use \\n para quebras de linha)
+{MODE_RULES[mode]}
 4. Escape corretamente aspas e caracteres especiais no JSON
 5. Máximo 5 issues principais
-
+{omitted_rule}
 **Formato EXATO da resposta:**
-{{
-  "qualityScore": 75,
-  "issues": [
-    {{
-      "title": "Título curto do problema",
-      "description": "Descrição detalhada do problema",
-      "severity": "high",
-      "impact": "Impacto específico no desempenho ou manutenção"
-    }}
-  ],
-  "optimizedCode": "codigo otimizado sem formatação de markdown",
-  "explanation": "Análise textual SEM blocos de código. Explique os problemas encontrados e as soluções aplicadas de forma descritiva. Liste os problemas em bullet points. Descreva as vantagens da refatoração.",
-  "metrics": {{
-    "complexityReduction": "20%",
-    "memoryImpact": "-15% memória",
-    "estimatedSpeedup": "2x",
-    "energySavings": "-10% CPU"
-  }}
-}}
+{RESPONSE_FORMATS[mode]}
 
-**PROIBIDO no campo explanation:** Blocos ```code```, trechos de código, exemplos de código.
-**PERMITIDO no campo explanation:** Texto descritivo, bullets, títulos markdown (# ## ###).
+Retorne APENAS o JSON válido, nada mais.
+"""
+    
+    def _build_pack_prompt(self, prepared: List[PreparedCode], languages: List[str],
+                           ids: List[str], mode: str = "full") -> str:
+        """Prompt com vários arquivos delimitados por id (mesmas regras do modo)"""
+        blocks = "\n\n".join(
+            f"<<<ARQUIVO id={file_id} linguagem={language}>>>\n{item.text}\n<<<FIM id={file_id}>>>"
+            for item, language, file_id in zip(prepared, languages, ids)
+        )
+        omitted_rule = ""
+        if any(item.regions for item in prepared):
+            omitted_rule = ("6. Linhas com [omitido #n: ...] substituem licença, comentários longos "
+                            f"ou linhas minificadas: {OMITTED_RULES[mode]}\n")
+        return f"""Você é um especialista em code review e eco-code (código sustentável).
+
+Analise CADA um dos {len(prepared)} arquivos abaixo de forma independente e retorne APENAS um JSON válido.
+Cada arquivo começa em "<<<ARQUIVO id=...>>>" e termina em "<<<FIM id=...>>>"; o código é o que está entre os delimitadores.
+
+{blocks}
+
+**INSTRUÇÕES CRÍTICAS:**
+1. Retorne APENAS o JSON {{"files": [...]}}, com um objeto por arquivo, na mesma ordem, cada um com "id" igual ao do delimitador
+{MODE_RULES[mode]}
+4. Escape corretamente aspas e caracteres especiais no JSON
+5. Máximo 5 issues principais por arquivo
+{omitted_rule}
+**Formato EXATO de cada objeto em "files" (além do campo "id"):**
+{RESPONSE_FORMATS[mode]}
 
 Retorne APENAS o JSON válido, nada mais.
 """
     
-    def _parse_ai_response(self, content: str, language: str) -> ReviewResult:
+    def _finish(self, content: str, language: str, cache_key: str,
+                cached: bool, prepared: Optional[PreparedCode] = None,
+                mode: str = "full", deadline: Optional[Deadline] = None) -> ReviewResult:
         """
-        Converte resposta AI (texto/JSON) para ReviewResult padronizado
+        Lê a resposta, tenta um reparo se estiver fora do schema, grava no
+        cache só o que é válido e converte para ReviewResult
         """
-        import json
-        import re
+        data, errors, path = self._read_response(content, mode, prepared)
+        if errors:
+            repaired = self._repair(content, errors, mode, prepared, deadline)
+            if repaired is not None:
+                content, data, path = repaired
+        if self._should_store(path, cached) and content:
+            self.response_cache.set(cache_key, content)
+        return self._to_result(content, data, path, language, prepared, mode)
+    
+    def _read_response(self, content: str, mode: str = "full",
+                       prepared: Optional[PreparedCode] = None) -> Tuple[Optional[dict], List[str], str]:
+        """
+        (dados, problemas de schema, caminho)
         
-        try:
-            # Extrair JSON da resposta
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if not json_match:
-                logger.warning("JSON não encontrado na resposta AI")
-                return self._fallback_parse(content, language)
-            
-            json_str = json_match.group()
-            
-            # LIMPEZA AGRESSIVA DE CARACTERES PROBLEMÁTICOS
-            # 1. Remover caracteres de controle exceto \n, \t, \r
-            json_str = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', json_str)
-            
-            # 2. Normalizar quebras de linha dentro de strings JSON
-            # Substituir quebras de linha literais por \\n
-            def escape_newlines_in_strings(match):
-                field_name = match.group(1)
-                field_value = match.group(2)
-                # Escapar caracteres especiais
-                field_value = field_value.replace('\\', '\\\\')  # \\ -> \\\\
-                field_value = field_value.replace('\n', '\\n')    # newline -> \\n
-                field_value = field_value.replace('\r', '\\r')    # carriage return -> \\r
-                field_value = field_value.replace('\t', '\\t')    # tab -> \\t
-                field_value = field_value.replace('"', '\\"')    # quote -> \\"
-                return f'"{field_name}": "{field_value}"'
-            
-            # Aplicar escape em campos de texto
-            json_str = re.sub(r'"(explanation|optimizedCode|description|impact|title)":\s*"([^"]*(?:"[^"]*)*?)"(?=\s*[,}])', 
-                             escape_newlines_in_strings, 
-                             json_str, 
-                             flags=re.DOTALL)
-            
-            # Tentar parsear JSON
-            data = None
+        Caminho rápido: json.loads + validador compilado, sem regex. Só a
+        resposta que não é JSON puro passa pelo leitor tolerante. No modo
+        patch, um diff que não se aplica ao código enviado também é problema.
+        """
+        data, path = _loads_strict(content), "fast"
+        if data is None:
+            data, path = loads_tolerant(content or ""), "tolerant"
+            if data is None:
+                return None, ["$: resposta sem objeto JSON"], "invalid"
+        
+        errors = self._validate(data, mode, prepared)
+        return data, errors, "invalid" if errors else path
+    
+    def _validate(self, data: dict, mode: str = "full",
+                  prepared: Optional[PreparedCode] = None) -> List[str]:
+        """Schema do modo; no modo patch, o diff precisa se aplicar ao código enviado"""
+        errors = validate_review(data, mode)
+        if mode == "patch" and not errors and prepared is not None:
             try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError as je:
-                logger.error(f"Erro ao parsear JSON: {je}")
-                # Última tentativa: extração manual de campos
-                logger.info("Tentando extração manual de campos...")
-                data = self._extract_fields_manually(content)
-                if not data:
-                    logger.error("Falha na extração manual. Usando fallback.")
-                    return self._fallback_parse(content, language)
-            
-            # Converter issues para objetos Issue
-            issues = []
-            for issue_data in data.get("issues", []):
-                severity_map = {
-                    "critical": SeverityLevel.CRITICAL,
-                    "high": SeverityLevel.HIGH,
-                    "medium": SeverityLevel.MEDIUM,
-                    "low": SeverityLevel.LOW
-                }
-                issues.append(Issue(
-                    title=issue_data.get("title", "Problema identificado"),
-                    description=issue_data.get("description", ""),
-                    severity=severity_map.get(issue_data.get("severity", "medium"), SeverityLevel.MEDIUM),
-                    impact=issue_data.get("impact", ""),
-                    rule_id="AI_RULE"
-                ))
-            
-            # Converter métricas
-            metrics_data = data.get("metrics", {})
-            metrics = Metrics(
-                readability=80,  # Fixo por enquanto
-                performance=ImpactLevel.MEDIO,
-                eco_impact=ImpactLevel.MEDIO,
-                maintainability=85,
-                complexity_reduction=metrics_data.get("complexityReduction", "N/A"),
-                memory_impact=metrics_data.get("memoryImpact", "N/A"),
-                estimated_speedup=metrics_data.get("estimatedSpeedup", "N/A"),
-                energy_savings=metrics_data.get("energySavings", "N/A")
-            )
-            
-            # Obter explanation e remover blocos de código se houver
-            explanation = data.get("explanation", "")
-            # Remover blocos de código markdown (```...```)
-            explanation = re.sub(r'```[\s\S]*?```', '[Bloco de código removido]', explanation)
-            # Remover código inline (`...`)
-            explanation = re.sub(r'`[^`\n]{50,}`', '[código removido]', explanation)
-            
-            # Converter explanation para HTML
-            explanation_html = markdown2.markdown(
-                explanation,
-                extras=["fenced-code-blocks", "tables"]
-            )
-            
-            # Obter código otimizado
-            optimized_code = data.get("optimizedCode", "")
-            # Decodificar \n para quebras de linha reais
-            optimized_code = optimized_code.replace('\\n', '\n').replace('\\t', '\t')
-            
-            return ReviewResult(
-                language=language,
-                quality_score=data.get("qualityScore", 70),
-                issues=issues,
-                optimized_code=optimized_code if optimized_code else None,
-                explanation=explanation,
-                explanation_html=explanation_html,
-                metrics=metrics,
-                has_issues=len(issues) > 0
+                locate_edits(prepared.text.split("\n"), _patch_text(data))
+            except PatchError as e:
+                errors.append(f"$.patch: {e}")
+        return errors
+    
+    def _repair(self, content: str, errors: List[str], mode: str = "full",
+                prepared: Optional[PreparedCode] = None,
+                deadline: Optional[Deadline] = None) -> Optional[Tuple[str, dict, str]]:
+        """
+        Um único re-prompt curto com o JSON inválido e a lista de problemas
+        (o código só vai junto quando o patch não se aplica); None se o
+        reparo falhar ou continuar inválido
+        """
+        if not self.client or (deadline is not None and deadline.expired()):
+            return None
+        self._count("repair_calls")
+        try:
+            response = self._create(
+                hedge=False,
+                deadline=deadline,
+                model=self.model,
+                messages=self._repair_messages(content, errors, mode, prepared),
+                temperature=0,
+                max_tokens=self.max_tokens,
+                response_format=JSON_MODE
             )
-            
+            fixed = response.choices[0].message.content
         except Exception as e:
-            logger.error(f"Erro ao parsear resposta AI: {e}")
-            return self._fallback_parse(content, language)
+            logger.warning(f"Reparo da resposta AI falhou: {e}")
+            return None
+        return self._accept_repair(fixed, errors, mode, prepared)
     
-    def _extract_fields_manually(self, content: str) -> dict:
-        """Extrai campos manualmente quando JSON está malformado"""
-        import re
+    def _repair_messages(self, content: str, errors: List[str], mode: str = "full",
+                         prepared: Optional[PreparedCode] = None) -> list:
+        listed = "\n".join(f"- {error}" for error in errors[:MAX_REPAIR_ERRORS])
+        source = ""
+        if prepared is not None and any(error.startswith("$.patch") for error in errors):
+            source = f"\nCódigo ao qual o patch deve se aplicar:\n```\n{prepared.text}\n```\n"
+        prompt = REPAIR_PROMPT.format(errors=listed, fields=REPAIR_FIELDS[mode],
+                                      source=source, content=content)
+        return [{"role": "user", "content": prompt}]
+    
+    def _accept_repair(self, fixed: str, errors: List[str], mode: str = "full",
+                       prepared: Optional[PreparedCode] = None) -> Optional[Tuple[str, dict, str]]:
+        data, fixed_errors, _ = self._read_response(fixed, mode, prepared)
+        if fixed_errors:
+            logger.warning(f"Resposta AI continua fora do schema após reparo: {fixed_errors[:3]}")
+            return None
+        logger.info(f"Resposta AI reparada ({len(errors)} problemas de schema)")
+        return fixed, data, "repaired"
+    
+    def _should_store(self, path: str, cached: bool) -> bool:
+        """Resposta nova e válida, ou entrada do cache que acabou de ser reparada"""
+        if not self.response_cache or path not in VALID_PATHS:
+            return False
+        return not cached or path == "repaired"
+    
+    def _to_result(self, content: str, data: Optional[dict], path: str,
+                   language: str, prepared: Optional[PreparedCode] = None,
+                   mode: str = "full") -> ReviewResult:
+        if data is None:
+            self._count_path("fallback")
+            logger.warning("JSON não encontrado na resposta AI")
+            result = self._fallback_parse(content, language)
+            result.mode = mode
+            return result
+        
+        self._count_path("degraded" if path == "invalid" else path)
         try:
-            data = {}
-            
-            # Extrair qualityScore
-            score_match = re.search(r'"qualityScore"\s*:\s*(\d+)', content)
-            if score_match:
-                data['qualityScore'] = int(score_match.group(1))
-            
-            # Extrair explanation (campo mais importante)
-            explanation_match = re.search(r'"explanation"\s*:\s*"([^"]+(?:\\.[^"]*)*?)"', content, re.DOTALL)
-            if explanation_match:
-                explanation = explanation_match.group(1)
-                # Decodificar escapes
-                explanation = explanation.replace('\\n', '\n').replace('\\t', '\t').replace('\\"', '"')
-                data['explanation'] = explanation
-            
-            # Extrair issues (simplificado)
-            issues = []
-            issue_pattern = r'\{\s*"title"\s*:\s*"([^"]+)"\s*,\s*"description"\s*:\s*"([^"]+)"\s*,\s*"severity"\s*:\s*"([^"]+)"\s*,\s*"impact"\s*:\s*"([^"]+)"\s*\}'
-            for match in re.finditer(issue_pattern, content):
-                issues.append({
-                    'title': match.group(1),
-                    'description': match.group(2),
-                    'severity': match.group(3),
-                    'impact': match.group(4)
-                })
-            if issues:
-                data['issues'] = issues
-            
-            return data if data else None
+            result = self._build_result(data, language, mode)
         except Exception as e:
-            logger.error(f"Erro na extração manual: {e}")
-            return None
+            logger.error(f"Erro ao parsear resposta AI: {e}")
+            result = self._fallback_parse(content, language)
+            result.mode = mode
+            return result
+        
+        if mode == "patch":
+            self._apply_patch(result, _patch_text(data), prepared)
+        elif prepared is not None:
+            # Trechos omitidos do prompt voltam ao código otimizado
+            result.optimized_code = prepared.restore(result.optimized_code)
+        return result
+    
+    def _apply_patch(self, result: ReviewResult, patch: str,
+                     prepared: Optional[PreparedCode]):
+        """
+        Modo patch: aplica o diff (localizado no código enviado) ao código
+        original; optimized_code fica igual ao do modo full e patch vira o
+        diff canônico contra o código do chamador
+        """
+        if prepared is None or not patch.strip():
+            return
+        try:
+            edits = locate_edits(prepared.text.split("\n"), patch)
+        except PatchError as e:
+            logger.warning(f"Patch da AI não se aplica ao código: {e}")
+            return
+        if not edits:
+            return
+        original = "\n".join(prepared.original_lines)
+        result.optimized_code = prepared.apply_edits(edits)
+        result.patch = make_patch(original, result.optimized_code)
+    
+    def _build_result(self, data: dict, language: str, mode: str = "full") -> ReviewResult:
+        """
+        Converte o dict da resposta AI para ReviewResult padronizado
+        (tolera dados fora do schema no caminho degraded)
+        """
+        # Converter issues para objetos Issue
+        issues = [
+            self._build_issue(issue_data)
+            for issue_data in _as_list(data.get("issues"))
+            if isinstance(issue_data, dict)
+        ]
+        
+        # Converter métricas
+        metrics_data = data.get("metrics")
+        if not isinstance(metrics_data, dict):
+            metrics_data = {}
+        metrics = Metrics(
+            readability=80,  # Fixo por enquanto
+            performance=ImpactLevel.MEDIO,
+            eco_impact=ImpactLevel.MEDIO,
+            maintainability=85,
+            complexity_reduction=metrics_data.get("complexityReduction", "N/A"),
+            memory_impact=metrics_data.get("memoryImpact", "N/A"),
+            estimated_speedup=metrics_data.get("estimatedSpeedup", "N/A"),
+            energy_savings=metrics_data.get("energySavings", "N/A")
+        )
+        
+        # Obter explanation e remover blocos de código se houver
+        explanation = _as_text(data.get("explanation"))
+        if "`" in explanation:
+            # Remover blocos de código markdown (```...```)
+            explanation = _CODE_BLOCK.sub('[Bloco de código removido]', explanation)
+            # Remover código inline (`...`)
+            explanation = _INLINE_CODE.sub('[código removido]', explanation)
+        
+        # Converter explanation para HTML (modo issues: sem explicação)
+        explanation_html = _markdown(
+            explanation,
+            extras=["fenced-code-blocks", "tables"]
+        ) if explanation else None
+        
+        # Obter código otimizado (modo patch: vem do diff, em _apply_patch)
+        optimized_code = _as_text(data.get("optimizedCode")) if mode == "full" else ""
+        # Decodificar \n para quebras de linha reais
+        optimized_code = optimized_code.replace('\\n', '\n').replace('\\t', '\t')
+        
+        return ReviewResult(
+            language=language,
+            quality_score=_as_score(data.get("qualityScore")),
+            issues=issues,
+            optimized_code=optimized_code if optimized_code else None,
+            explanation=explanation,
+            explanation_html=explanation_html,
+            metrics=metrics,
+            has_issues=len(issues) > 0,
+            mode=mode
+        )
+    
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+    
+    def _count_path(self, path: str):
+        with self._stats_lock:
+            self.parse_counts[path] += 1
+    
+    def parse_stats(self) -> dict:
+        """Quantas respostas seguiram cada caminho de leitura (e uso de prompts agrupados)"""
+        with self._stats_lock:
+            counts = dict(self.parse_counts)
+            repair_calls = self.repair_calls
+            packed = (self.packed_calls, self.packed_files, self.pack_misses)
+        return {**counts, "repairCalls": repair_calls,
+                "packedCalls": packed[0], "packedFiles": packed[1], "packMisses": packed[2]}
+    
+    def _build_issue(self, issue_data: dict) -> Issue:
+        """Converte um item de "issues" da resposta AI para Issue"""
+        severity_map = {
+            "critical": SeverityLevel.CRITICAL,
+            "high": SeverityLevel.HIGH,
+            "medium": SeverityLevel.MEDIUM,
+            "low": SeverityLevel.LOW
+        }
+        return Issue(
+            title=issue_data.get("title", "Problema identificado"),
+            description=issue_data.get("description", ""),
+            severity=severity_map.get(issue_data.get("severity", "medium"), SeverityLevel.MEDIUM),
+            impact=issue_data.get("impact", ""),
+            rule_id="AI_RULE"
+        )
     
     def _fallback_parse(self, content: str, language: str) -> ReviewResult:
         """Parser fallback quando JSON não está disponível"""
@@ -286,7 +747,7 @@ Para análise detalhada, verifique os issues específicos listados."""
             language=language,
             quality_score=70,
             explanation=explanation_text,
-            explanation_html=markdown2.markdown(explanation_text),
+            explanation_html=_markdown(explanation_text),
             issues=[Issue(
                 title="Análise via IA",
                 description="A análise detectou pontos de melhoria. Verifique o código manualmente.",
@@ -297,10 +758,56 @@ Para análise detalhada, verifique os issues específicos listados."""
             has_issues=True
         )
     
-    def _empty_result(self, language: str) -> ReviewResult:
+    def _empty_result(self, language: str, mode: str = "full") -> ReviewResult:
         """Resultado vazio quando AI não está disponível"""
         return ReviewResult(
             language=language,
             quality_score=100,
-            has_issues=False
+            has_issues=False,
+            mode=mode
         )
+
+
+def _loads_strict(content: Optional[str]) -> Optional[dict]:
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError, RecursionError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _patch_text(data: dict) -> str:
+    """Campo patch da resposta (\\n literais quando o modelo escapa duas vezes)"""
+    patch = _as_text(data.get("patch"))
+    if "\n" not in patch:
+        patch = patch.replace('\\n', '\n')
+    return patch
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _as_text(value) -> str:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _as_score(value, default: int = 70) -> int:
+    """qualityScore como int em 0-100 (caminhos tolerante/degradado: "85", 85.5, 120)"""
+    if isinstance(value, bool):
+        return default
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(score):
+        return default
+    return max(0, min(100, round(score)))
+
+
+def _markdown(text: str, extras: Optional[list] = None) -> str:
+    """markdown2 importado só quando há explicação para converter"""
+    import markdown2
+    return markdown2.markdown(text, extras=extras)
@@ -0,0 +1,136 @@
+"""
+Response Schema - AI Layer
+Formato da resposta JSON da AI (ReviewResult) e validador compilado
+
+O schema (subconjunto de JSON Schema: type, required, properties, items,
+enum, minimum, maximum) é compilado uma vez em funções aninhadas; validar
+uma resposta é só percorrer o dict, sem interpretar o schema a cada chamada.
+"""
+from typing import Any, Callable, List
+
+SEVERITIES = ["critical", "high", "medium", "low"]
+
+REVIEW_SCHEMA = {
+    "type": "object",
+    "required": ["qualityScore", "issues", "explanation"],
+    "properties": {
+        "qualityScore": {"type": "number", "minimum": 0, "maximum": 100},
+        "issues": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["title", "severity"],
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "severity": {"type": "string", "enum": SEVERITIES},
+                    "impact": {"type": "string"},
+                },
+            },
+        },
+        "optimizedCode": {"type": "string"},
+        "patch": {"type": "string"},
+        "explanation": {"type": "string"},
+        "metrics": {
+            "type": "object",
+            "properties": {
+                "complexityReduction": {"type": "string"},
+                "memoryImpact": {"type": "string"},
+                "estimatedSpeedup": {"type": "string"},
+                "energySavings": {"type": "string"},
+            },
+        },
+    },
+}
+
+# Campos obrigatórios por modo de saída (ver REVIEW_MODES): patch traz um
+# unified diff no lugar do optimizedCode; issues dispensa explicação
+REVIEW_SCHEMAS = {
+    "full": REVIEW_SCHEMA,
+    "patch": {**REVIEW_SCHEMA, "required": ["qualityScore", "issues", "patch"]},
+    "issues": {**REVIEW_SCHEMA, "required": ["qualityScore", "issues"]},
+}
+
+# (valor, caminho, erros) -> None; acrescenta "caminho: problema" em erros
+Validator = Callable[[Any, str, List[str]], None]
+
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    # bool é subclasse de int: True não é nota
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def compile_schema(schema: dict) -> Validator:
+    """Compila o schema em um validador (funções aninhadas)"""
+    checks: List[Validator] = []
+
+    type_name = schema.get("type")
+    type_check = _TYPES[type_name] if type_name else None
+
+    if "enum" in schema:
+        allowed = frozenset(schema["enum"])
+        listed = ", ".join(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} não é um de [{listed}]")
+        checks.append(check_enum)
+
+    if "minimum" in schema or "maximum" in schema:
+        low = schema.get("minimum", float("-inf"))
+        high = schema.get("maximum", float("inf"))
+
+        def check_range(value, path, errors):
+            if not low <= value <= high:
+                errors.append(f"{path}: {value} fora do intervalo [{low}, {high}]")
+        checks.append(check_range)
+
+    required = schema.get("required", [])
+    if required:
+        def check_required(value, path, errors):
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}.{key}: campo obrigatório ausente")
+        checks.append(check_required)
+
+    properties = {
+        key: compile_schema(sub) for key, sub in schema.get("properties", {}).items()
+    }
+    if properties:
+        def check_properties(value, path, errors):
+            for key, validate in properties.items():
+                if key in value:
+                    validate(value[key], f"{path}.{key}", errors)
+        checks.append(check_properties)
+
+    if "items" in schema:
+        validate_item = compile_schema(schema["items"])
+
+        def check_items(value, path, errors):
+            for index, item in enumerate(value):
+                validate_item(item, f"{path}[{index}]", errors)
+        checks.append(check_items)
+
+    def validate(value, path, errors):
+        if type_check is not None and not type_check(value):
+            errors.append(f"{path}: esperado {type_name}, recebido {type(value).__name__}")
+            return
+        for check in checks:
+            check(value, path, errors)
+
+    return validate
+
+
+_validators = {mode: compile_schema(schema) for mode, schema in REVIEW_SCHEMAS.items()}
+
+
+def validate_review(data: Any, mode: str = "full") -> List[str]:
+    """Problemas da resposta frente ao schema do modo (lista vazia = válida)"""
+    errors: List[str] = []
+    _validators[mode](data, "$", errors)
+    return errors
@@ -0,0 +1,99 @@
+"""
+Stream Parser - AI Layer
+Extrai issues do JSON da AI à medida que os tokens chegam (stream=True)
+"""
+import json
+import logging
+from typing import List
+
+from review_engine.ai_layer.tolerant_json import loads_tolerant
+
+
+logger = logging.getLogger(__name__)
+
+
+class IssueStreamExtractor:
+    """
+    Máquina de estados incremental sobre o texto parcial da resposta
+
+    Localiza o array "issues" e emite cada objeto assim que sua chave
+    de fechamento chega. Cada caractere é processado uma única vez.
+    """
+
+    ISSUES_KEY = '"issues"'
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._state = "seek_key"  # seek_key → seek_array → in_array → done
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = -1
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Adiciona um trecho da resposta e retorna issues completas encontradas"""
+        if not chunk or self._state == "done":
+            return []
+
+        self._buffer += chunk
+        issues = []
+
+        if self._state == "seek_key":
+            index = self._buffer.find(self.ISSUES_KEY, max(0, self._pos - len(self.ISSUES_KEY)))
+            if index < 0:
+                self._pos = len(self._buffer)
+                return issues
+            self._pos = index + len(self.ISSUES_KEY)
+            self._state = "seek_array"
+
+        if self._state == "seek_array":
+            index = self._buffer.find("[", self._pos)
+            if index < 0:
+                self._pos = len(self._buffer)
+                return issues
+            self._pos = index + 1
+            self._state = "in_array"
+
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = pos
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._object_start >= 0:
+                    issue = self._load(buffer[self._object_start:pos + 1])
+                    if issue is not None:
+                        issues.append(issue)
+                    self._object_start = -1
+            elif char == "]" and self._depth == 0:
+                self._state = "done"
+                break
+
+        self._pos = len(buffer)
+        return issues
+
+    def _load(self, raw: str):
+        try:
+            data = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            # Mesma leitura tolerante da resposta final (_read_response)
+            data = loads_tolerant(raw)
+            if data is None:
+                logger.debug("Issue parcial ignorada no streaming (JSON inválido)")
+        return data if isinstance(data, dict) else None
@@ -0,0 +1,251 @@
+"""
+Tolerant JSON - AI Layer
+Leitura tolerante do objeto JSON devolvido pela AI, em uma única passada
+
+Aceita o que os modelos costumam errar: texto antes/depois do objeto
+(inclusive ```json), quebras de linha e tabs crus dentro de strings,
+aspas não escapadas, escapes inválidos ("\\d" em regex), vírgulas
+sobrando, chaves sem aspas e resposta truncada (o que foi lido até o
+corte é mantido). Sem recursão e sem regex com retrocesso: tempo linear
+no tamanho da resposta.
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+# Trecho comum de string: tudo menos aspas, barra e caracteres de controle
+_PLAIN = re.compile(r'[^"\\\x00-\x1f]*')
+_SPACE = re.compile(r'\s*')
+_NUMBER = re.compile(r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+_WORD = re.compile(r'[A-Za-z_$][\w$-]*')
+# Valor sem aspas ("score": 85%) lido até o próximo separador
+_BARE = re.compile(r'[^,}\]\n]+')
+# Próxima chave de objeto (ou chave cortada pelo fim da resposta); o
+# tamanho limitado mantém a verificação O(1)
+_NEXT_KEY = re.compile(r'"[^"\\\n]{0,64}(?:"\s*:|\Z)')
+
+_LITERALS = {
+    "true": True, "false": False, "null": None,
+    "True": True, "False": False, "None": None,
+}
+_ESCAPES = {
+    '"': '"', "\\": "\\", "/": "/",
+    "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t",
+}
+_VALUE_START = frozenset('"{[-0123456789.tfnTFN')
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def loads_tolerant(text: str) -> Optional[dict]:
+    """
+    Primeiro objeto JSON do texto como dict, ou None se não houver "{"
+
+    Resposta válida vai direto para json.loads (C); só a inválida passa
+    pelo leitor tolerante
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    end = text.rfind("}")
+    if end > start:
+        try:
+            data = json.loads(text[start:end + 1], strict=False)
+        except (ValueError, RecursionError):  # aninhamento profundo estoura o decoder em C
+            pass
+        else:
+            if isinstance(data, dict):
+                return data
+
+    return _TolerantReader(text).read(start)
+
+
+class _TolerantReader:
+    """
+    Analisador iterativo (pilha explícita de containers)
+
+    Aspas dentro de string só fecham a string quando o que vem depois é
+    estrutura válida no contexto (":" após chave; "," + próxima chave
+    completa, "}" ou "]" após valor). Cada caractere é examinado um
+    número constante de vezes.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+
+    def read(self, start: int) -> dict:
+        text, length = self.text, self.length
+        root: dict = {}
+        stack: List[Any] = [root]
+        keys: List[Optional[str]] = [None]
+        pos = start + 1
+
+        while stack:
+            pos = _SPACE.match(text, pos).end()
+            if pos >= length:
+                break  # truncado: mantém o que já foi lido
+
+            char = text[pos]
+            container = stack[-1]
+            in_object = isinstance(container, dict)
+
+            if char in "}]":
+                stack.pop()
+                keys.pop()
+                pos += 1
+                continue
+            if char == ",":
+                pos += 1
+                continue
+
+            if in_object and keys[-1] is None:
+                pos = self._read_key(pos, keys)
+                continue
+
+            if char == "{" or char == "[":
+                child: Any = {} if char == "{" else []
+                self._attach(container, keys, child)
+                stack.append(child)
+                keys.append(None)
+                pos += 1
+                continue
+
+            value, pos = self._read_value(pos, in_object)
+            self._attach(container, keys, value)
+
+        return root
+
+    def _read_key(self, pos: int, keys: List[Optional[str]]) -> int:
+        text = self.text
+        char = text[pos]
+        if char == '"':
+            key, pos = self._read_string(pos, "key")
+        else:
+            match = _WORD.match(text, pos)
+            if match is None:
+                return pos + 1  # lixo entre membros: ignora
+            key, pos = match.group(), match.end()
+
+        pos = _SPACE.match(text, pos).end()
+        if pos < self.length and text[pos] == ":":
+            pos += 1
+        keys[-1] = key
+        return pos
+
+    def _read_value(self, pos: int, in_object: bool) -> Tuple[Any, int]:
+        text = self.text
+        char = text[pos]
+        if char == '"':
+            return self._read_string(pos, "object" if in_object else "array")
+
+        number = _NUMBER.match(text, pos)
+        if number is not None:
+            raw = number.group()
+            try:
+                return (float(raw) if any(c in raw for c in ".eE") else int(raw)), number.end()
+            except ValueError:
+                pass
+
+        word = _WORD.match(text, pos)
+        if word is not None and word.group() in _LITERALS:
+            return _LITERALS[word.group()], word.end()
+
+        bare = _BARE.match(text, pos)
+        if bare is not None:
+            value = bare.group().strip()
+            if len(value) > 1 and value[0] == value[-1] == "'":
+                value = value[1:-1]
+            return value, bare.end()
+        return None, pos + 1
+
+    def _read_string(self, pos: int, context: str) -> Tuple[str, int]:
+        """String a partir da aspa de abertura em pos; retorna (valor, fim)"""
+        text, length = self.text, self.length
+        parts = []
+        pos += 1
+        while True:
+            match = _PLAIN.match(text, pos)
+            if match.end() > pos:
+                parts.append(match.group())
+                pos = match.end()
+            if pos >= length:
+                return "".join(parts), pos  # truncado dentro da string
+
+            char = text[pos]
+            if char == '"':
+                if self._closes(pos + 1, context):
+                    return "".join(parts), pos + 1
+                parts.append('"')
+                pos += 1
+            elif char == "\\":
+                # \" seguido de estrutura: barra literal no fim do valor ("C:\dir\")
+                if text.startswith('"', pos + 1) and self._closes(pos + 2, context):
+                    parts.append("\\")
+                    return "".join(parts), pos + 2
+                decoded, pos = self._read_escape(pos)
+                parts.append(decoded)
+            else:
+                # Controle cru: quebras de linha/tab viram conteúdo, o resto é descartado
+                if char in "\n\r\t":
+                    parts.append(char)
+                pos += 1
+
+    def _read_escape(self, pos: int) -> Tuple[str, int]:
+        text = self.text
+        if pos + 1 >= self.length:
+            return "", self.length
+        char = text[pos + 1]
+        if char in _ESCAPES:
+            return _ESCAPES[char], pos + 2
+        if char == "u":
+            code = _hex4(text, pos + 2)
+            if code is not None:
+                pos += 6
+                # Par substituto (😀) vira um único caractere
+                if 0xD800 <= code < 0xDC00 and text.startswith("\\u", pos):
+                    low = _hex4(text, pos + 2)
+                    if low is not None and 0xDC00 <= low < 0xE000:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                        pos += 6
+                return chr(code), pos
+        # Escape inválido (ex.: "\d" de regex): mantém o texto como veio
+        return "\\" + char, pos + 2
+
+    def _closes(self, pos: int, context: str) -> bool:
+        """A aspa antes de pos fecha a string no contexto dado?"""
+        text, length = self.text, self.length
+        pos = _SPACE.match(text, pos).end()
+        if pos >= length:
+            return True
+        char = text[pos]
+
+        if context == "key":
+            return char == ":"
+        if char in "}]":
+            return True
+        if char != ",":
+            return False
+
+        pos = _SPACE.match(text, pos + 1).end()
+        if pos >= length:
+            return True
+        following = text[pos]
+        if context == "object":
+            return following == "}" or _NEXT_KEY.match(text, pos) is not None
+        return following in _VALUE_START or following == "]"
+
+    @staticmethod
+    def _attach(container: Any, keys: List[Optional[str]], value: Any) -> None:
+        if isinstance(container, dict):
+            container[keys[-1]] = value
+            keys[-1] = None
+        else:
+            container.append(value)
+
+
+def _hex4(text: str, pos: int) -> Optional[int]:
+    digits = text[pos:pos + 4]
+    if len(digits) != 4 or not all(c in _HEX_DIGITS for c in digits):
+        return None
+    return int(digits, 16)
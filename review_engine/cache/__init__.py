@@ -0,0 +1,8 @@
+"""Cache module initialization"""
+from .result_cache import ResultCache, InMemoryResultCache, build_cache_key
+from .response_cache import DiskResponseCache, hash_prompt
+from .similar_index import SimilarReviewIndex, SimilarMatch, Fingerprint
+
+__all__ = ['ResultCache', 'InMemoryResultCache', 'build_cache_key',
+           'DiskResponseCache', 'hash_prompt',
+           'SimilarReviewIndex', 'SimilarMatch', 'Fingerprint']
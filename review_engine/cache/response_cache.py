@@ -0,0 +1,225 @@
+"""
+Response Cache - Cache persistente de respostas Groq
+SQLite em disco compartilhado entre workers do gunicorn e entre deploys
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_FILENAME = "ecocode_groq_cache.sqlite3"
+
+
+def hash_prompt(model: str, messages: list, **params) -> str:
+    """
+    Gera chave SHA-256 da requisição ao LLM
+    Inclui modelo, mensagens e parâmetros de geração (temperature, max_tokens...)
+    """
+    payload = json.dumps({
+        "model": model,
+        "messages": messages,
+        "params": params
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskResponseCache:
+    """
+    Cache chave/valor em SQLite (modo WAL) com limite de tamanho
+
+    - Seguro para múltiplos processos: SQLite serializa escritas via lock de arquivo
+    - Eviction LRU por último acesso quando o total excede max_bytes
+    - Falhas de disco nunca interrompem a análise (apenas log + miss)
+    """
+
+    # Atualizar accessed_at no máximo a cada N segundos (evita escrita em toda leitura)
+    TOUCH_INTERVAL = 60
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024,
+                 timeout: float = 5.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+        self._init_schema()
+
+    @classmethod
+    def from_env(cls) -> Optional["DiskResponseCache"]:
+        """
+        Cria cache a partir de variáveis de ambiente
+        GROQ_CACHE_ENABLED (default true), GROQ_CACHE_PATH, GROQ_CACHE_MAX_MB
+        """
+        if os.getenv("GROQ_CACHE_ENABLED", "true").lower() != "true":
+            return None
+
+        path = os.getenv("GROQ_CACHE_PATH") or os.path.join(
+            tempfile.gettempdir(), DEFAULT_CACHE_FILENAME
+        )
+        max_mb = float(os.getenv("GROQ_CACHE_MAX_MB", "64"))
+
+        try:
+            return cls(path, max_bytes=int(max_mb * 1024 * 1024))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Cache de respostas Groq desabilitado: {e}")
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Uma conexão por thread (sqlite3 não compartilha conexões entre threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna valor bruto armazenado ou None"""
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._count("misses")
+                return None
+
+            value, accessed_at = row
+            now = time.time()
+            if now - accessed_at > self.TOUCH_INTERVAL:
+                conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+
+            self._count("hits")
+            return value
+
+        except sqlite3.Error as e:
+            self._count("errors")
+            self._count("misses")
+            logger.warning(f"Erro ao ler cache de respostas: {e}")
+            return None
+
+    def set(self, key: str, value: str):
+        """Armazena valor e aplica eviction se o limite de tamanho for excedido"""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now)
+                )
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._count("writes")
+            if evicted:
+                self._count("evictions", evicted)
+
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning(f"Erro ao gravar cache de respostas: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Remove entradas menos recentemente usadas até caber em max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        while total > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        return evicted
+
+    def clear(self):
+        try:
+            self._connect().execute("DELETE FROM responses")
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao limpar cache de respostas: {e}")
+
+    def stats(self) -> dict:
+        entries, total = 0, 0
+        try:
+            entries, total = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        except sqlite3.Error:
+            pass
+
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "entries": entries,
+                "bytes": total,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors
+            }
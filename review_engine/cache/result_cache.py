@@ -0,0 +1,174 @@
+"""
+Result Cache - Cache de resultados do ReviewEngine
+Evita reprocessar (e pagar novamente a AI por) trechos já analisados
+"""
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+
+if TYPE_CHECKING:  # evita import circular com review_engine.core
+    from review_engine.core.dto import ReviewResult
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_cache_key(code: str,
+                    language: str,
+                    filename: Optional[str],
+                    use_ai: bool,
+                    plugin_versions: Dict[str, str],
+                    model: Optional[str],
+                    context_code: Optional[str] = None,
+                    mode: str = "full") -> str:
+    """
+    Gera chave content-addressed (SHA-256) para uma análise
+    Qualquer mudança no código, linguagem, arquivo, modo AI,
+    versão de plugin, modelo Groq, contexto do chunk ou modo de saída
+    produz uma chave diferente
+    """
+    payload = json.dumps({
+        "language": language,
+        "filename": filename,
+        "use_ai": use_ai,
+        "plugins": plugin_versions,
+        "model": model
+    }, sort_keys=True)
+
+    digest = hashlib.sha256()
+    digest.update(payload.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(code.encode("utf-8", errors="surrogatepass"))
+    if context_code:
+        digest.update(b"\0context\0")
+        digest.update(context_code.encode("utf-8", errors="surrogatepass"))
+    # "full" fica fora da chave: entradas anteriores aos modos continuam válidas
+    if mode != "full":
+        digest.update(f"\0mode\0{mode}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache(ABC):
+    """Interface para caches de ReviewResult plugáveis no ReviewEngine"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional["ReviewResult"]:
+        """Retorna resultado em cache ou None"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, result: "ReviewResult", tags: Iterable[str] = ()):
+        """Armazena resultado; tags permitem invalidação em grupo"""
+        pass
+
+    @abstractmethod
+    def invalidate(self, tag: str) -> int:
+        """Remove entradas associadas à tag. Retorna quantidade removida"""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Remove todas as entradas"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Contadores de uso do cache"""
+        pass
+
+
+class InMemoryResultCache(ResultCache):
+    """
+    Cache em memória com eviction LRU + TTL
+    Thread-safe (gunicorn com threads / analyze_many)
+    """
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl_seconds: Optional[float] = 3600,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional["ReviewResult"]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            result, tags, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # Cópia: o engine muta o resultado (merge, confidence_level)
+        return copy.deepcopy(result)
+
+    def set(self, key: str, result: "ReviewResult", tags: Iterable[str] = ()):
+        if self.max_entries <= 0:
+            return
+
+        expires_at = None
+        if self.ttl_seconds is not None:
+            expires_at = self._clock() + self.ttl_seconds
+
+        entry = (copy.deepcopy(result), frozenset(tags), expires_at)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tag: str) -> int:
+        with self._lock:
+            stale = [key for key, (_, tags, _) in self._entries.items() if tag in tags]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+        if stale:
+            logger.info(f"Cache: {len(stale)} entradas invalidadas ({tag})")
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
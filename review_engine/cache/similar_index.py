@@ -0,0 +1,484 @@
+"""
+Similar Index - Reuso de reviews AI de código quase idêntico
+O cache exato (build_cache_key) erra o caso comum de reenviar a mesma
+função depois de renomear uma variável ou reformatar. Aqui cada entrada
+analisada pela AI vira uma assinatura MinHash sobre shingles de tokens
+normalizados (sem espaços nem comentários, nomes locais trocados por
+um marcador), indexada em buckets LSH, junto com o ReviewResult da AI.
+
+Reuso (motivo no gate_reason):
+    equivalent     - mesma sequência normalizada e renomeação consistente:
+                     review inteiro, nomes locais renomeados no texto e no
+                     código otimizado
+    near_duplicate - opt-in (near_duplicates=True): similaridade estimada
+                     >= threshold: issues cujo original_code ainda existe,
+                     nota e explicação (renomeadas); código otimizado descartado
+Em ambos, a linha de cada issue é remapeada pelo alinhamento dos tokens.
+Por padrão só equivalent: "corrigi a linha apontada e reenviei" é quase
+idêntico e não pode receber o mesmo achado de volta.
+"""
+import copy
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from review_engine.chunking.prompt_budget import POLICIES
+
+if TYPE_CHECKING:  # evita import circular com review_engine.core
+    from review_engine.core.dto import ReviewResult
+
+
+logger = logging.getLogger(__name__)
+
+# Assinatura: NUM_PERM mínimos, BANDS faixas de ROWS valores (limiar LSH ~0.5)
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_TOKENS = 4
+# Trechos com menos tokens coincidem por acaso: não são indexados
+MIN_TOKENS = 30
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Palavras após as quais vem um nome declarado (variável, parâmetro, função)
+_DECLARATIONS = frozenset((
+    "def", "class", "function", "func", "fn", "var", "let", "const", "val",
+    "for", "foreach", "as", "lambda", "catch", "except", "auto", "my", "local",
+))
+_FUNCTIONS = frozenset(("def", "function", "func", "fn"))
+# Identificadores seguidos de nome que NÃO são tipos ("return x;" não declara x)
+_NOT_TYPES = frozenset((
+    "return", "in", "not", "and", "or", "is", "new", "throw", "yield", "await",
+    "else", "case", "print", "echo", "delete", "typeof", "instanceof", "import",
+    "from", "if", "while", "elif", "assert", "raise", "del", "goto", "sizeof",
+))
+# Palavras seguidas de ":" que abrem bloco (o ":" não é anotação de tipo)
+_BLOCKS = frozenset(("else", "try", "finally", "except", "default", "do"))
+_AFTER_TYPED = frozenset(("=", ";", ",", ")", ":"))
+_IDENTIFIER = re.compile(r'\$?[^\W\d][\w$]*')
+_STRINGS = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`'
+_lexers: Dict[str, "re.Pattern"] = {}
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """Forma normalizada de um trecho e sua assinatura MinHash"""
+    language: str
+    canonical: Tuple[str, ...]  # tokens com nomes locais trocados por "§"
+    names: Tuple[str, ...]  # nome original de cada "§", em ordem
+    lines: Tuple[int, ...]  # linha (1-based) de cada token
+    bound: FrozenSet[str]
+    signature: Tuple[int, ...]
+    digest: str
+
+
+@dataclass
+class SimilarMatch:
+    """Review reaproveitado (já adaptado ao trecho novo)"""
+    result: "ReviewResult"
+    reason: str  # equivalent | near_duplicate
+    similarity: float
+    renamed: Dict[str, str]
+
+
+@dataclass
+class _Entry:
+    fingerprint: Fingerprint
+    mode: str
+    result: "ReviewResult"
+    buckets: Tuple[tuple, ...]
+
+
+class SimilarReviewIndex:
+    """
+    Índice MinHash/LSH em memória de reviews AI anteriores
+    LRU com max_entries (memória limitada); thread-safe
+    """
+
+    def __init__(self, enabled: bool = True, threshold: float = 0.9, max_entries: int = 256,
+                 near_duplicates: bool = False):
+        self.enabled = enabled and max_entries > 0
+        self.threshold = threshold
+        self.near_duplicates = near_duplicates
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[tuple]] = {}
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.equivalent_hits = 0
+        self.near_hits = 0
+        self.near_skipped = 0
+        self.dropped_issues = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "SimilarReviewIndex":
+        """
+        SIMILAR_REUSE_ENABLED (default true), SIMILAR_REUSE_THRESHOLD,
+        SIMILAR_REUSE_MAX_ENTRIES, SIMILAR_REUSE_NEAR_DUPLICATES (default false)
+        """
+        return cls(
+            enabled=os.getenv("SIMILAR_REUSE_ENABLED", "true").lower() == "true",
+            threshold=float(os.getenv("SIMILAR_REUSE_THRESHOLD", "0.9")),
+            max_entries=int(os.getenv("SIMILAR_REUSE_MAX_ENTRIES", "256")),
+            near_duplicates=os.getenv("SIMILAR_REUSE_NEAR_DUPLICATES", "false").lower() == "true"
+        )
+
+    def fingerprint(self, code: str, language: str) -> Optional[Fingerprint]:
+        """Assinatura do trecho (None se desabilitado ou curto demais)"""
+        if not self.enabled:
+            return None
+        tokens, lines = _tokenize(code, language)
+        if len(tokens) < MIN_TOKENS:
+            return None
+
+        bound = _bound_names(tokens)
+        # Atributos ("obj.total") não são o nome local "total"
+        slots = [index for index, token in enumerate(tokens)
+                 if token in bound and (not index or tokens[index - 1] != ".")]
+        canonical = list(tokens)
+        for index in slots:
+            canonical[index] = "§"
+        names = tuple(tokens[index] for index in slots)
+
+        shingles = {
+            _hash("\x1f".join(canonical[i:i + SHINGLE_TOKENS]))
+            for i in range(len(canonical) - SHINGLE_TOKENS + 1)
+        }
+        signature = tuple(
+            min((a * value + b) % _PRIME for value in shingles)
+            for a, b in _PERMUTATIONS
+        )
+        digest = hashlib.sha1("\x1f".join(canonical).encode("utf-8", errors="surrogatepass")).hexdigest()
+        return Fingerprint(language=language, canonical=tuple(canonical), names=names,
+                           lines=tuple(lines), bound=frozenset(bound), signature=signature,
+                           digest=digest)
+
+    def lookup(self, fingerprint: Optional[Fingerprint], mode: str = "full",
+               code: Optional[str] = None) -> Optional[SimilarMatch]:
+        """
+        Review anterior mais parecido acima do threshold, adaptado ao trecho novo
+        code: texto do trecho novo (near_duplicate só reaproveita issues cujo
+        original_code ainda aparece nele)
+        """
+        if fingerprint is None:
+            return None
+
+        best, similarity = None, 0.0
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for bucket in _bucket_keys(fingerprint, mode):
+                candidates |= self._buckets.get(bucket, set())
+            for key in candidates:
+                entry = self._entries[key]
+                estimate = sum(
+                    1 for mine, theirs in zip(fingerprint.signature, entry.fingerprint.signature)
+                    if mine == theirs
+                ) / NUM_PERM
+                if estimate > similarity:
+                    best, similarity = entry, estimate
+            if best is None or similarity < self.threshold:
+                return None
+            # Snapshot: add() concorrente pode despejar a entrada fora do lock
+            old, cached = best.fingerprint, best.result
+
+        alignment = _alignment(old, fingerprint)
+        renamed, consistent = _rename_map(old, fingerprint, alignment)
+        equivalent = consistent and old.digest == fingerprint.digest
+        if not equivalent and (not self.near_duplicates or code is None):
+            with self._lock:
+                self.near_skipped += 1
+            return None
+
+        key = (old.digest, old.language, mode)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            if equivalent:
+                self.equivalent_hits += 1
+            else:
+                self.near_hits += 1
+
+        # Entradas guardam cópias nunca alteradas: copiar fora do lock é seguro
+        result = copy.deepcopy(cached)
+        _rename_result(result, renamed)
+        dropped = _relocate_issues(result, old, fingerprint, alignment,
+                                   None if equivalent else code)
+        # Patch do trecho antigo não vale para o novo (o engine o recalcula)
+        result.patch = None
+        if not equivalent:
+            # O código otimizado desfaria as outras diferenças do trecho novo
+            result.optimized_code = None
+        if dropped:
+            with self._lock:
+                self.dropped_issues += dropped
+        reason = "equivalent" if equivalent else "near_duplicate"
+        logger.info(f"Review reaproveitado ({reason}, similaridade ~{similarity:.2f}, "
+                    f"{len(renamed)} nomes renomeados, {dropped} issues descartadas)")
+        return SimilarMatch(result=result, reason=reason, similarity=similarity, renamed=renamed)
+
+    def add(self, fingerprint: Optional[Fingerprint], mode: str, result: "ReviewResult"):
+        """Indexa o ReviewResult da AI para o trecho (cópia)"""
+        if fingerprint is None or result is None:
+            return
+        key = (fingerprint.digest, fingerprint.language, mode)
+        entry = _Entry(fingerprint=fingerprint, mode=mode, result=copy.deepcopy(result),
+                       buckets=tuple(_bucket_keys(fingerprint, mode)))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for bucket in entry.buckets:
+                self._buckets.setdefault(bucket, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        for bucket in entry.buckets:
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[bucket]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.equivalent_hits + self.near_hits
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "nearDuplicates": self.near_duplicates,
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "lookups": self.lookups,
+                "equivalentHits": self.equivalent_hits,
+                "nearHits": self.near_hits,
+                "nearSkipped": self.near_skipped,
+                "droppedIssues": self.dropped_issues,
+                "hitRate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+
+def _lexer(language: str) -> "re.Pattern":
+    """Regex de tokens da linguagem: strings, comentários (descartados) e código"""
+    lexer = _lexers.get(language)
+    if lexer is None:
+        policy = POLICIES.get(language)
+        comments = []
+        if policy is not None:
+            comments.extend(re.escape(fence) + r'[\s\S]*?' + re.escape(fence) for fence in policy.fences)
+            for prefix in policy.line:
+                guards = "".join(f"(?!{re.escape(code[len(prefix):])})"
+                                 for code in policy.not_comment if code.startswith(prefix))
+                comments.append(re.escape(prefix) + guards + r'[^\n]*')
+            if policy.block:
+                opener, closer = policy.block
+                comments.append(re.escape(opener) + r'[\s\S]*?(?:' + re.escape(closer) + r'|$)')
+        skip = f"(?P<skip>{'|'.join(comments)})|" if comments else ""
+        lexer = re.compile(skip + r'(?P<token>' + _STRINGS + r'|\$?[^\W\d][\w$]*|\d[\w.]*|\S)')
+        _lexers[language] = lexer
+    return lexer
+
+
+def _tokenize(code: str, language: str) -> Tuple[List[str], List[int]]:
+    """Tokens do trecho e a linha (1-based) de cada um"""
+    tokens, lines = [], []
+    line, position = 1, 0
+    for match in _lexer(language).finditer(code):
+        if match.lastgroup != "token":
+            continue
+        line += code.count("\n", position, match.start())
+        position = match.start()
+        tokens.append(match.group("token"))
+        lines.append(line)
+    return tokens, lines
+
+
+def _bound_names(tokens: List[str]) -> Set[str]:
+    """
+    Nomes declarados no próprio trecho (heurística independente da
+    linguagem): após palavra de declaração, alvo de atribuição, declaração
+    tipada ("int total =") e parâmetros de def/function/func/fn
+    """
+    bound = set()
+    size = len(tokens)
+    for index, token in enumerate(tokens):
+        if not _IDENTIFIER.fullmatch(token):
+            continue
+        previous = tokens[index - 1] if index else ""
+        following = tokens[index + 1] if index + 1 < size else ""
+        if previous == ".":
+            continue
+        if previous in _DECLARATIONS:
+            bound.add(token)
+        elif (following == "=" and not _is_annotation(tokens, index)
+              and (tokens[index + 2] if index + 2 < size else "") != "="):
+            bound.add(token)
+        elif (following in _AFTER_TYPED and _IDENTIFIER.fullmatch(previous or "-")
+              and previous not in _NOT_TYPES and previous not in _DECLARATIONS):
+            bound.add(token)
+
+        # Parâmetros: def nome ( a , b = 1 )
+        if previous in _FUNCTIONS and following == "(":
+            depth = 0
+            for position in range(index + 1, size):
+                current = tokens[position]
+                if current in "([{":
+                    depth += 1
+                elif current in ")]}":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                elif (depth == 1 and _IDENTIFIER.fullmatch(current) and position + 1 < size
+                      and tokens[position + 1] in (",", ")", "=", ":")):
+                    bound.add(current)
+    # Palavras de declaração nunca são renomeadas
+    return bound - _DECLARATIONS - _NOT_TYPES
+
+
+def _is_annotation(tokens: List[str], index: int) -> bool:
+    """Tipo em "x: int = 0" (não em "if ok: total = 0" nem "else: total = 0")"""
+    if index < 2 or tokens[index - 1] != ":":
+        return False
+    owner = tokens[index - 2]
+    return bool(_IDENTIFIER.fullmatch(owner)) and owner not in _BLOCKS
+
+
+def _hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"),
+                                          digest_size=8).digest(), "big")
+
+
+def _bucket_keys(fingerprint: Fingerprint, mode: str):
+    for band in range(BANDS):
+        yield (fingerprint.language, mode, band,
+               fingerprint.signature[band * ROWS:(band + 1) * ROWS])
+
+
+def _alignment(old: Fingerprint, new: Fingerprint) -> Dict[int, int]:
+    """Posição de token no trecho antigo -> posição no novo (blocos iguais do SequenceMatcher)"""
+    if old.canonical == new.canonical:
+        return {position: position for position in range(len(old.canonical))}
+    alignment = {}
+    matcher = SequenceMatcher(None, old.canonical, new.canonical, autojunk=False)
+    for start_old, start_new, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            alignment[start_old + offset] = start_new + offset
+    return alignment
+
+
+def _rename_map(old: Fingerprint, new: Fingerprint,
+                alignment: Dict[int, int]) -> Tuple[Dict[str, str], bool]:
+    """
+    (nome antigo -> novo, renomeação consistente) dos nomes locais
+
+    Pares vêm das ocorrências de "§" alinhadas entre as duas sequências;
+    nomes com pares conflitantes (ou dois nomes indo para o mesmo) ficam
+    de fora e tornam a renomeação inconsistente
+    """
+    old_slots = _slot_index(old.canonical)
+    new_slots = _slot_index(new.canonical)
+    pairs = [(old.names[old_slots[before]], new.names[new_slots[after]])
+             for before, after in sorted(alignment.items()) if old.canonical[before] == "§"]
+    mapping: Dict[str, str] = {}
+    conflicts = set()
+    for before, after in pairs:
+        if mapping.setdefault(before, after) != after:
+            conflicts.add(before)
+    targets = [after for before, after in mapping.items() if before not in conflicts]
+    renamed = {
+        before: after for before, after in mapping.items()
+        if before not in conflicts and targets.count(after) == 1
+    }
+    consistent = len(renamed) == len(mapping)
+    return {before: after for before, after in renamed.items() if before != after}, consistent
+
+
+def _slot_index(canonical: Tuple[str, ...]) -> Dict[int, int]:
+    """Posição de cada "§" -> índice em Fingerprint.names"""
+    slots = {}
+    for position, token in enumerate(canonical):
+        if token == "§":
+            slots[position] = len(slots)
+    return slots
+
+
+def _remap_line(line: int, old: Fingerprint, new: Fingerprint,
+                alignment: Dict[int, int]) -> Optional[int]:
+    """
+    Linha equivalente no trecho novo (None se a linha mudou)
+    Linha sem tokens (comentário, em branco): desloca junto com o próximo token alinhado
+    """
+    on_line = [position for position, number in enumerate(old.lines) if number == line]
+    if on_line:
+        kept = [position for position in on_line if position in alignment]
+        return new.lines[alignment[kept[0]]] if kept else None
+    following = next((position for position, number in enumerate(old.lines)
+                      if number > line and position in alignment), None)
+    if following is None:
+        return None
+    return max(1, new.lines[alignment[following]] - (old.lines[following] - line))
+
+
+def _relocate_issues(result: "ReviewResult", old: Fingerprint, new: Fingerprint,
+                     alignment: Dict[int, int], code: Optional[str]) -> int:
+    """
+    Remapeia line_number das issues para o trecho novo; com code (near_duplicate),
+    descarta as issues cujo original_code não aparece mais nele. Retorna as descartadas
+    """
+    flat = " ".join(code.split()) if code is not None else None
+    kept = []
+    for issue in result.issues:
+        if flat is not None and issue.original_code and " ".join(issue.original_code.split()) not in flat:
+            continue
+        if issue.line_number is not None:
+            line = _remap_line(issue.line_number, old, new, alignment)
+            if line is None and flat is not None:
+                continue
+            issue.line_number = line
+        kept.append(issue)
+    dropped = len(result.issues) - len(kept)
+    result.issues = kept
+    return dropped
+
+
+def _rename_result(result: "ReviewResult", renamed: Dict[str, str]):
+    """Aplica a renomeação (palavra inteira) aos textos e ao código do review"""
+    if not renamed:
+        return
+    pattern = re.compile(r'(?<![\w$])(' + "|".join(
+        re.escape(name) for name in sorted(renamed, key=len, reverse=True)
+    ) + r')(?![\w$])')
+
+    def rename(text):
+        return pattern.sub(lambda match: renamed[match.group(1)], text) if text else text
+
+    result.optimized_code = rename(result.optimized_code)
+    result.explanation = rename(result.explanation)
+    result.explanation_html = rename(result.explanation_html)
+    result.recommendations = [rename(text) for text in result.recommendations]
+    for issue in result.issues:
+        issue.title = rename(issue.title)
+        issue.description = rename(issue.description)
+        issue.impact = rename(issue.impact)
+        issue.original_code = rename(issue.original_code)
+        issue.recommendation = rename(issue.recommendation)
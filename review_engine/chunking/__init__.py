@@ -0,0 +1,12 @@
+"""Chunking module initialization"""
+from .chunker import CodeChunk, split_code, DEFAULT_CHUNK_CHARS, DEFAULT_OVERLAP_LINES
+from .prompt_budget import (PreparedCode, prepare_code, estimate_tokens, response_budget,
+                            request_tokens, REVIEW_MODES)
+from .patch import PatchError, apply_unified_diff, locate_edits, make_patch
+from .packing import PACK_MAX_FILES, pack_id, plan_packs
+
+__all__ = ['CodeChunk', 'split_code', 'DEFAULT_CHUNK_CHARS', 'DEFAULT_OVERLAP_LINES',
+           'PreparedCode', 'prepare_code', 'estimate_tokens', 'response_budget',
+           'request_tokens', 'REVIEW_MODES',
+           'PatchError', 'apply_unified_diff', 'locate_edits', 'make_patch',
+           'PACK_MAX_FILES', 'pack_id', 'plan_packs']
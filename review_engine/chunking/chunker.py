@@ -0,0 +1,145 @@
+"""
+Chunker - Divisão de arquivos grandes para análise em paralelo
+Corta em fronteiras de função/classe; cada trecho leva algumas linhas
+anteriores como contexto somente-leitura (sobreposição)
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+
+# ~2k tokens por trecho: cabe no prompt e o optimizedCode cabe em max_tokens
+DEFAULT_CHUNK_CHARS = 6000
+DEFAULT_OVERLAP_LINES = 5
+
+# Início de definição (qualquer indentação): def/class/func/fn/function...,
+# modificadores de acesso (Java/C#/Kotlin/Rust) e decorators/annotations
+_BOUNDARY = re.compile(
+    r'^([ \t]*)(?:'
+    r'@\w'
+    r'|(?:export\s+)?(?:default\s+)?(?:async\s+)?'
+    r'(?:def|class|func|fn|function|fun|sub|impl|trait|struct|enum|interface|module|'
+    r'object|resource|data|variable|output|procedure|type|protocol|extension)\b'
+    r'|(?:public|private|protected|internal|static|abstract|override|pub(?:\([\w:]+\))?)\s'
+    r')'
+)
+
+# Comentários logo acima de uma definição pertencem a ela
+_COMMENT = re.compile(r'^[ \t]*(?:#|//|/\*|\*|--)')
+
+
+@dataclass
+class CodeChunk:
+    """Trecho do arquivo original (linhas 1-based) + contexto anterior"""
+    start_line: int
+    lines: List[str] = field(default_factory=list)
+    context_lines: List[str] = field(default_factory=list)
+
+    @property
+    def end_line(self) -> int:
+        return self.start_line + len(self.lines) - 1
+
+    @property
+    def code(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def context(self) -> str:
+        return "\n".join(self.context_lines)
+
+
+def split_code(code: str,
+               max_chars: int = DEFAULT_CHUNK_CHARS,
+               overlap_lines: int = DEFAULT_OVERLAP_LINES) -> List[CodeChunk]:
+    """
+    Divide o código em trechos de até ~max_chars sem sobreposição entre si
+
+    Prefere cortar nas definições de menor indentação (nível de módulo);
+    um bloco maior que max_chars é dividido nas definições internas e,
+    sem elas, em linhas em branco ou por tamanho.
+    """
+    lines = code.split("\n")
+    if len(code) <= max_chars:
+        return [CodeChunk(start_line=1, lines=lines)]
+
+    # offsets[i] = tamanho das linhas [0, i)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+
+    boundaries = _find_boundaries(lines)
+    spans = _split_span(0, len(lines), offsets, boundaries, lines, max_chars)
+
+    chunks = []
+    for start, end in spans:
+        context_start = max(0, start - overlap_lines)
+        chunks.append(CodeChunk(
+            start_line=start + 1,
+            lines=lines[start:end],
+            context_lines=lines[context_start:start]
+        ))
+    return chunks
+
+
+def _find_boundaries(lines: List[str]) -> List[Tuple[int, int]]:
+    """(índice da linha, indentação) de cada início de definição"""
+    boundaries = []
+    for index, line in enumerate(lines):
+        match = _BOUNDARY.match(line)
+        if not match:
+            continue
+        indent = len(match.group(1).expandtabs(4))
+
+        # def logo após decorator: a fronteira fica no primeiro decorator
+        if index > 0 and lines[index - 1].lstrip().startswith("@") \
+                and boundaries and boundaries[-1][1] == indent:
+            continue
+
+        start = index
+        floor = boundaries[-1][0] + 1 if boundaries else 0
+        while start > floor and _COMMENT.match(lines[start - 1]):
+            start -= 1
+        boundaries.append((start, indent))
+    return boundaries
+
+
+def _split_span(start: int, end: int, offsets: List[int],
+                boundaries: List[Tuple[int, int]], lines: List[str],
+                max_chars: int) -> List[Tuple[int, int]]:
+    if offsets[end] - offsets[start] <= max_chars:
+        return [(start, end)]
+
+    inner = [(index, indent) for index, indent in boundaries if start < index < end]
+    if inner:
+        level = min(indent for _, indent in inner)
+        cuts = [index for index, indent in inner if indent == level]
+    else:
+        # Sem definições: cortar em linhas em branco
+        cuts = [index for index in range(start + 1, end) if not lines[index].strip()]
+
+    if not cuts:
+        return _split_by_size(start, end, offsets, max_chars)
+
+    spans = []
+    for piece_start, piece_end in zip([start] + cuts, cuts + [end]):
+        for span_start, span_end in _split_span(piece_start, piece_end, offsets,
+                                                boundaries, lines, max_chars):
+            # Agrupar definições pequenas vizinhas no mesmo trecho
+            if spans and offsets[span_end] - offsets[spans[-1][0]] <= max_chars:
+                spans[-1] = (spans[-1][0], span_end)
+            else:
+                spans.append((span_start, span_end))
+    return spans
+
+
+def _split_by_size(start: int, end: int, offsets: List[int],
+                   max_chars: int) -> List[Tuple[int, int]]:
+    """Último recurso: corte por tamanho em fronteira de linha"""
+    spans = []
+    piece_start = start
+    for index in range(start + 1, end + 1):
+        if offsets[index] - offsets[piece_start] > max_chars and index - 1 > piece_start:
+            spans.append((piece_start, index - 1))
+            piece_start = index - 1
+    spans.append((piece_start, end))
+    return spans
@@ -0,0 +1,55 @@
+"""
+Packing - Vários arquivos pequenos em um único prompt
+Em lote/CI a maioria dos arquivos é pequena e cada um pagaria uma ida e
+volta ao Groq; aqui eles são agrupados sob um orçamento de tokens
+(entrada e saída), com delimitadores estáveis por arquivo
+"""
+import hashlib
+from typing import List
+
+from review_engine.chunking.prompt_budget import response_budget
+
+
+# Arquivos por prompt e orçamentos do prompt agrupado
+PACK_MAX_FILES = 8
+PACK_INPUT_TOKENS = 6000
+PACK_OUTPUT_TOKENS = 8000
+# Arquivos maiores que isso (tokens estimados) seguem sozinhos
+PACK_FILE_TOKENS = 1500
+
+
+def pack_id(code: str, language: str) -> str:
+    """Id do arquivo no delimitador: depende só do conteúdo (estável entre lotes)"""
+    digest = hashlib.sha1(f"{language}\0{code}".encode("utf-8", errors="surrogatepass"))
+    return digest.hexdigest()[:8]
+
+
+def plan_packs(token_counts: List[int], mode: str = "full",
+               file_ceiling: int = PACK_OUTPUT_TOKENS,
+               max_files: int = PACK_MAX_FILES) -> List[List[int]]:
+    """
+    Grupos de índices (na ordem de entrada) que cabem em um prompt
+
+    Next-fit: mantém a ordem do lote, então o mesmo lote gera os mesmos
+    prompts (cache em disco). A saída de cada arquivo é o response_budget
+    do modo, limitado a file_ceiling (max_tokens de uma chamada individual).
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    input_tokens = output_tokens = 0
+    for index, tokens in enumerate(token_counts):
+        output = response_budget(tokens, file_ceiling, mode)
+        if max_files <= 1 or tokens > PACK_FILE_TOKENS:
+            groups.append([index])
+            continue
+        if current and (len(current) >= max_files
+                        or input_tokens + tokens > PACK_INPUT_TOKENS
+                        or output_tokens + output > PACK_OUTPUT_TOKENS):
+            groups.append(current)
+            current, input_tokens, output_tokens = [], 0, 0
+        current.append(index)
+        input_tokens += tokens
+        output_tokens += output
+    if current:
+        groups.append(current)
+    return groups
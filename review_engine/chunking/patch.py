@@ -0,0 +1,144 @@
+"""
+Patch - Aplicação do diff devolvido pela AI (modo "patch")
+Aplica um unified diff ao código enviado no prompt localizando cada hunk
+pelo conteúdo (contexto + linhas removidas); números de linha do cabeçalho
+servem só de dica, já que modelos costumam errá-los
+"""
+import difflib
+import re
+from typing import List, Optional, Tuple
+
+
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@')
+
+# (início, fim exclusivo, linhas novas) nas linhas do código de origem
+Edit = Tuple[int, int, List[str]]
+
+
+class PatchError(ValueError):
+    """Diff que não se aplica ao código de origem"""
+
+
+def parse_hunks(patch: str) -> List[Tuple[Optional[int], List[str], List[str]]]:
+    """
+    Hunks do diff como (linha inicial 0-based ou None, linhas antigas, linhas novas)
+
+    Contagens do cabeçalho são ignoradas: o hunk vai até o próximo "@@" ou
+    cabeçalho de arquivo. Sem nenhum "@@", o diff inteiro é um único hunk.
+    """
+    hunks = []
+    hint: Optional[int] = None
+    old: List[str] = []
+    new: List[str] = []
+    started = False
+
+    def close():
+        if old or new:
+            hunks.append((hint, old, new))
+
+    lines = patch.strip("\n").split("\n")
+    for index, raw in enumerate(lines):
+        header = _HUNK_HEADER.match(raw)
+        if header or raw.startswith("@@"):
+            close()
+            hint = max(int(header.group(1)) - 1, 0) if header else None
+            old, new = [], []
+            started = True
+            continue
+        # Cabeçalho de arquivo: "--- a" seguido de "+++ b" (não uma remoção "-- sql")
+        if raw.startswith("--- ") and index + 1 < len(lines) and lines[index + 1].startswith("+++ "):
+            continue
+        if raw.startswith("+++ ") and index > 0 and lines[index - 1].startswith("--- "):
+            continue
+        if raw.startswith(("diff ", "index ", "\\")):
+            continue
+
+        if raw.startswith("+"):
+            new.append(raw[1:])
+        elif raw.startswith("-"):
+            old.append(raw[1:])
+        elif raw.startswith(" ") or raw == "":
+            # Contexto (alguns editores removem o espaço de linhas vazias)
+            old.append(raw[1:])
+            new.append(raw[1:])
+        elif started:
+            raise PatchError(f"linha fora do formato unified diff: {raw[:60]!r}")
+    close()
+    return hunks
+
+
+def locate_edits(lines: List[str], patch: str) -> List[Edit]:
+    """
+    Posição de cada hunk nas linhas de origem, em ordem e sem sobreposição
+
+    Procura o bloco antigo a partir do fim do hunk anterior, preferindo a
+    ocorrência mais próxima da dica do cabeçalho; se não houver casamento
+    exato, compara ignorando espaços nas pontas. Contexto igual nos dois
+    lados é removido das bordas de cada edição.
+    """
+    edits: List[Edit] = []
+    floor = 0
+    for number, (hint, old, new) in enumerate(parse_hunks(patch), start=1):
+        if not old:
+            position = min(max(hint if hint is not None else len(lines), floor), len(lines))
+        else:
+            position = _find_block(lines, old, floor, hint)
+            if position is None:
+                raise PatchError(f"hunk {number}: trecho original não encontrado no código")
+
+        start, end = position, position + len(old)
+        head = 0
+        while head < len(old) and head < len(new) and old[head] == new[head]:
+            head += 1
+        tail = 0
+        while (tail < len(old) - head and tail < len(new) - head
+               and old[-1 - tail] == new[-1 - tail]):
+            tail += 1
+        if head < len(old) or head < len(new):
+            edits.append((start + head, end - tail, new[head:len(new) - tail]))
+        floor = end
+    return edits
+
+
+def apply_edits(lines: List[str], edits: List[Edit]) -> List[str]:
+    """Aplica edições ordenadas e sem sobreposição"""
+    result: List[str] = []
+    position = 0
+    for start, end, replacement in edits:
+        result.extend(lines[position:start])
+        result.extend(replacement)
+        position = end
+    result.extend(lines[position:])
+    return result
+
+
+def apply_unified_diff(source: str, patch: str) -> str:
+    """Código de origem com o diff aplicado (PatchError se não se aplicar)"""
+    lines = source.split("\n")
+    return "\n".join(apply_edits(lines, locate_edits(lines, patch)))
+
+
+def make_patch(before: str, after: str, name: str = "code") -> str:
+    """Unified diff canônico (números de linha corretos) entre dois textos"""
+    return "\n".join(difflib.unified_diff(
+        before.split("\n"), after.split("\n"),
+        fromfile=f"a/{name}", tofile=f"b/{name}", lineterm=""
+    ))
+
+
+def _find_block(lines: List[str], block: List[str], floor: int,
+                hint: Optional[int]) -> Optional[int]:
+    size = len(block)
+    for normalize in (None, str.strip):
+        source = lines if normalize is None else [normalize(line) for line in lines]
+        target = block if normalize is None else [normalize(line) for line in block]
+        first = target[0]
+        candidates = [
+            position for position in range(floor, len(source) - size + 1)
+            if source[position] == first and source[position:position + size] == target
+        ]
+        if candidates:
+            if hint is None:
+                return candidates[0]
+            return min(candidates, key=lambda position: abs(position - hint))
+    return None
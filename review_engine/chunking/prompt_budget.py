@@ -0,0 +1,325 @@
+"""
+Prompt Budget - Preparação do código para o prompt da AI
+Estimativa local de tokens, compactação de trechos irrelevantes para a
+revisão e max_tokens proporcional à entrada
+
+Trechos omitidos (cabeçalho de licença, blocos longos de comentário,
+linhas minificadas) viram marcadores "[omitido #n: ...]" com as linhas
+originais; restore() devolve o texto original no optimizedCode.
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from review_engine.chunking.patch import Edit, apply_edits
+
+
+# Blocos de comentário com mais linhas que isso mantêm só a primeira
+# linha com texto (e o fechamento "*/", se houver)
+LONG_COMMENT_LINES = 6
+# Linhas maiores que isso (minificado, base64, dados) são truncadas
+MAX_LINE_CHARS = 400
+BLOB_KEEP_CHARS = 160
+
+# Modos de saída da revisão: só issues, diff contra o código enviado ou
+# reescrita completa (optimizedCode)
+REVIEW_MODES = ("issues", "patch", "full")
+
+# Resposta por modo = parte ~fixa (issues, explanation, métricas) + fração
+# do código: full repete o código com escapes JSON (\n, \"); patch só as
+# linhas alteradas e o contexto dos hunks
+RESPONSE_SHAPE: Dict[str, Tuple[int, float]] = {
+    "full": (1024, 1.2),
+    "patch": (768, 0.5),
+    "issues": (600, 0.1),
+}
+
+# Tokens de formatação de cada mensagem do chat (papel e delimitadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_LICENSE_WORDS = ("copyright", "license", "licence", "spdx-", "all rights reserved", "licenciado")
+_MARKER = re.compile(r'\[omitido #(\d+)[:\]]')
+
+# Palavras ASCII (~6 caracteres por token em código), palavras com acento,
+# grupos de até 3 dígitos, símbolos (1-2 por token) e quebras de linha com
+# indentação; espaço simples entre palavras vai junto com a palavra
+_TOKEN_PIECE = re.compile(r"[A-Za-z]+|[^\W\d_]+|\d{1,3}|[^\w\s]{1,2}|\n[ \t]*|[ \t]{2,}")
+
+
+@dataclass(frozen=True)
+class CommentPolicy:
+    """Sintaxe de comentário de uma linguagem"""
+    line: Tuple[str, ...] = ()
+    block: Optional[Tuple[str, str]] = None
+    marker: str = "{}"
+    # Delimitadores de string multilinha (comentários dentro delas não contam)
+    fences: Tuple[str, ...] = ()
+    # Prefixos que parecem comentário mas são código (#[Attr] em PHP)
+    not_comment: Tuple[str, ...] = ()
+    collapse_blank: bool = True
+
+
+_C_STYLE = CommentPolicy(line=("//",), block=("/*", "*/"), marker="// {}")
+_HASH = CommentPolicy(line=("#",), marker="# {}")
+
+POLICIES: Dict[str, CommentPolicy] = {
+    "python": CommentPolicy(line=("#",), marker="# {}", fences=('"""', "'''")),
+    "javascript": _C_STYLE,
+    "typescript": _C_STYLE,
+    "react": _C_STYLE,
+    "java": _C_STYLE,
+    "csharp": _C_STYLE,
+    "go": _C_STYLE,
+    "rust": _C_STYLE,
+    "kotlin": _C_STYLE,
+    "swift": _C_STYLE,
+    "php": CommentPolicy(line=("//", "#"), block=("/*", "*/"), marker="// {}", not_comment=("#[",)),
+    "css": CommentPolicy(block=("/*", "*/"), marker="/* {} */"),
+    "sql": CommentPolicy(line=("--",), block=("/*", "*/"), marker="-- {}"),
+    "ruby": CommentPolicy(line=("#",), block=("=begin", "=end"), marker="# {}"),
+    "bash": _HASH,
+    "dockerfile": _HASH,
+    # Linhas em branco podem ser conteúdo de blocos literais (|)
+    "yaml": CommentPolicy(line=("#",), marker="# {}", collapse_blank=False),
+    "terraform": CommentPolicy(line=("#", "//"), block=("/*", "*/"), marker="# {}"),
+    "html": CommentPolicy(block=("<!--", "-->"), marker="<!-- {} -->"),
+}
+
+# Linguagem desconhecida: só espaços, linhas em branco e linhas longas
+_DEFAULT_POLICY = CommentPolicy()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa local de tokens (tokenizadores BPE do tipo Llama 3), sem
+    chamar a API; serve para orçamento, não para cobrança exata
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECE.findall(text):
+        first = piece[0]
+        if first.isalpha():
+            tokens += (len(piece) + 5) // 6 if first.isascii() else (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def response_budget(code_tokens: int, ceiling: int, mode: str = "full") -> int:
+    """max_tokens da resposta proporcional ao código enviado e ao modo, até ceiling"""
+    overhead, factor = RESPONSE_SHAPE[mode]
+    return min(ceiling, overhead + math.ceil(code_tokens * factor))
+
+
+def request_tokens(messages: List[dict], max_tokens: Optional[int] = None) -> int:
+    """
+    Tokens que uma chamada pode consumir da cota por minuto: prompt
+    estimado + max_tokens (o excedente é devolvido com o usage da resposta)
+    """
+    prompt = sum(estimate_tokens(str(message.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS
+                 for message in messages)
+    return prompt + (max_tokens or 0)
+
+
+@dataclass
+class PreparedCode:
+    """Código compactado + mapeamento para as linhas originais (1-based)"""
+    text: str
+    original_lines: List[str]
+    # line_map[i] = linha original da linha i+1 do texto compactado
+    line_map: List[int] = field(default_factory=list)
+    # regions[n] = (início, fim) 0-based, fim exclusivo, do trecho do marcador #n
+    regions: List[Tuple[int, int]] = field(default_factory=list)
+    original_tokens: int = 0
+    tokens: int = 0
+
+    @property
+    def compacted(self) -> bool:
+        return bool(self.regions) or len(self.line_map) != len(self.original_lines)
+
+    def original_line(self, line: int) -> int:
+        """Linha do arquivo original para uma linha (1-based) do texto compactado"""
+        return self.line_map[min(max(line, 1), len(self.line_map)) - 1] if self.line_map else line
+
+    def restore(self, code: Optional[str]) -> Optional[str]:
+        """
+        Substitui cada linha com marcador "[omitido #n" pelas linhas
+        originais do trecho n (cada trecho no máximo uma vez)
+        """
+        if not code or not self.regions or "[omitido #" not in code:
+            return code
+        restored, used = [], set()
+        for line in code.split("\n"):
+            match = _MARKER.search(line)
+            index = int(match.group(1)) if match else -1
+            if 0 <= index < len(self.regions) and index not in used:
+                used.add(index)
+                start, end = self.regions[index]
+                restored.extend(self.original_lines[start:end])
+            else:
+                restored.append(line)
+        return "\n".join(restored)
+
+    def apply_edits(self, edits: List[Edit]) -> str:
+        """
+        Aplica ao código original edições localizadas no texto compactado
+        (modo patch): linhas não tocadas, com seus espaços e trechos
+        omitidos, ficam idênticas ao original
+        """
+        total = len(self.line_map)
+        size = len(self.original_lines)
+
+        def original_index(line: int) -> int:
+            return self.line_map[line] - 1 if line < total else size
+
+        mapped = []
+        for start, end, replacement in edits:
+            if any("[omitido #" in line for line in replacement):
+                replacement = self.restore("\n".join(replacement)).split("\n")
+            mapped.append((original_index(start), original_index(end), replacement))
+        return "\n".join(apply_edits(self.original_lines, mapped))
+
+
+def prepare_code(code: str, language: str) -> PreparedCode:
+    """
+    Compacta o código para o prompt segundo a política da linguagem
+
+    - remove espaços no fim das linhas e junta linhas em branco seguidas
+    - cabeçalho de licença no topo vira um marcador
+    - blocos de comentário longos mantêm a primeira linha + marcador
+    - linhas muito longas (minificadas) mantêm o início + marcador
+    """
+    policy = POLICIES.get(language.lower(), _DEFAULT_POLICY)
+    original = code.split("\n")
+    lines = [line.rstrip() for line in original]
+    comments = _comment_lines(lines, policy)
+
+    out: List[str] = []
+    line_map: List[int] = []
+    regions: List[Tuple[int, int]] = []
+
+    def emit(text: str, index: int):
+        out.append(text)
+        line_map.append(index + 1)
+
+    def omit(start: int, end: int, reason: str):
+        marker = f"[omitido #{len(regions)}: linhas {start + 1}-{end}, {reason}]"
+        regions.append((start, end))
+        indent = lines[start][:len(lines[start]) - len(lines[start].lstrip())]
+        emit(indent + policy.marker.format(marker), start)
+
+    index = _license_header(lines, comments, emit, omit)
+    total = len(lines)
+    while index < total:
+        line = lines[index]
+        if comments[index]:
+            end = index
+            while end < total and comments[end]:
+                end += 1
+            if end - index > LONG_COMMENT_LINES:
+                # Primeira linha com texto (a de "/**" sozinha não diz nada)
+                keep = index + 1 if _has_text(line) else index + 2
+                close = end - 1 if policy.block and policy.block[1] in lines[end - 1] else end
+                for position in range(index, keep):
+                    emit(lines[position], position)
+                omit(keep, close, "comentário")
+                for position in range(close, end):
+                    emit(lines[position], position)
+            else:
+                for position in range(index, end):
+                    emit(lines[position], position)
+            index = end
+            continue
+
+        if not line:
+            if policy.collapse_blank and (not out or not out[-1]):
+                index += 1
+                continue
+        elif len(line) > MAX_LINE_CHARS:
+            marker = f"[omitido #{len(regions)}: +{len(line) - BLOB_KEEP_CHARS} caracteres]"
+            regions.append((index, index + 1))
+            line = f"{line[:BLOB_KEEP_CHARS]} … {marker}"
+        emit(line, index)
+        index += 1
+
+    text = "\n".join(out)
+    return PreparedCode(
+        text=text,
+        original_lines=original,
+        line_map=line_map,
+        regions=regions,
+        original_tokens=estimate_tokens(code),
+        tokens=estimate_tokens(text)
+    )
+
+
+def _comment_lines(lines: List[str], policy: CommentPolicy) -> List[bool]:
+    """Linhas que são inteiramente comentário (de linha ou de bloco)"""
+    flags = [False] * len(lines)
+    if not policy.line and not policy.block:
+        return flags
+
+    in_block = False
+    in_fence = None
+    for index, line in enumerate(lines):
+        stripped = line.lstrip()
+
+        if in_fence is not None:
+            if stripped.count(in_fence) % 2:
+                in_fence = None
+            continue
+
+        if in_block:
+            end = stripped.find(policy.block[1])
+            if end < 0:
+                flags[index] = True
+            else:
+                in_block = False
+                # Código depois do fim do bloco: a linha não é só comentário
+                flags[index] = not stripped[end + len(policy.block[1]):].strip()
+            continue
+
+        if stripped.startswith(policy.line) and not stripped.startswith(policy.not_comment):
+            flags[index] = True
+        elif policy.block and stripped.startswith(policy.block[0]):
+            start, finish = policy.block
+            end = stripped.find(finish, len(start))
+            if end < 0:
+                flags[index] = True
+                in_block = True
+            else:
+                flags[index] = not stripped[end + len(finish):].strip()
+        else:
+            for fence in policy.fences:
+                if stripped.count(fence) % 2:
+                    in_fence = fence
+                    break
+    return flags
+
+
+def _has_text(line: str) -> bool:
+    return any(char.isalnum() for char in line)
+
+
+def _license_header(lines: List[str], comments: List[bool], emit, omit) -> int:
+    """
+    Emite shebang/encoding e, se o primeiro bloco de comentário do arquivo
+    for uma licença, um marcador no lugar dele; retorna a próxima linha
+    """
+    index = 0
+    while index < len(lines) and lines[index].startswith(("#!", "# -*-", "# vim:")):
+        emit(lines[index], index)
+        index += 1
+
+    start = index
+    while start < len(lines) and not lines[start]:
+        start += 1
+    end = start
+    while end < len(lines) and comments[end]:
+        end += 1
+
+    header = " ".join(lines[start:end]).lower()
+    if end - start >= 2 and any(word in header for word in _LICENSE_WORDS):
+        omit(start, end, "licença")
+        return end
+    return index
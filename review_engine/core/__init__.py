@@ -1,6 +1,9 @@
 """Core module initialization"""
-from .dto import ReviewResult, Issue, Metrics, DetectionResult, SeverityLevel, ImpactLevel
+from .dto import (ReviewResult, Issue, Metrics, DetectionResult, SeverityLevel, ImpactLevel,
+                  FileReviewResult, BatchReviewResult)
+from .line_index import LineIndex
 from .engine import ReviewEngine
 
 __all__ = ['ReviewResult', 'Issue', 'Metrics', 'DetectionResult', 
-           'SeverityLevel', 'ImpactLevel', 'ReviewEngine']
+           'SeverityLevel', 'ImpactLevel', 'FileReviewResult', 'BatchReviewResult',
+           'LineIndex', 'ReviewEngine']
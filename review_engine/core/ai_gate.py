@@ -0,0 +1,137 @@
+"""
+AI Gate - Política static-first
+Decide, por requisição, se a chamada ao LLM vale a pena depois que o
+plugin já rodou (submilissegundo): trechos triviais (e, se configurado,
+pequenos e limpos para um plugin real) ficam só com a análise estática
+"""
+import os
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from review_engine.core.dto import ReviewResult
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GateDecision:
+    """Resultado da política: usar a AI ou não, e o motivo"""
+    use_ai: bool
+    reason: str
+
+
+class AIGatePolicy:
+    """
+    Política configurável de uso da AI
+
+    Sem AI (motivo):
+        latency_budget - orçamento do chamador menor que a latência esperada da AI
+        trivial        - menos de min_chars caracteres e min_lines linhas não vazias
+        clean          - opt-in (clean_max_chars > 0): menos de clean_max_chars
+                         caracteres, plugin específico, sem issues e nota >= clean_score
+    Com AI (motivo):
+        no_plugin      - só o UniversalPlugin cobre a linguagem
+        plugin_issues  - o plugin encontrou problemas
+        below_clean_score
+        plugin_clean   - limpo para o plugin (poucas regex não dispensam a AI)
+    """
+
+    # Peso da última medição na média móvel da latência da AI
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, enabled: bool = True,
+                 min_chars: int = 160,
+                 min_lines: int = 5,
+                 clean_score: int = 95,
+                 clean_max_chars: int = 0,
+                 ai_latency_seconds: float = 4.0):
+        self.enabled = enabled
+        self.min_chars = min_chars
+        self.min_lines = min_lines
+        self.clean_score = clean_score
+        # Poucas regras regex não garantem o código: 0 = nunca pula por "limpo"
+        self.clean_max_chars = clean_max_chars
+        # Latência esperada do caminho AI (atualizada com observe())
+        self.expected_ai_latency = ai_latency_seconds
+
+        self._decisions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AIGatePolicy":
+        """
+        AI_GATE_ENABLED (default true), AI_GATE_MIN_CHARS, AI_GATE_MIN_LINES,
+        AI_GATE_CLEAN_SCORE, AI_GATE_CLEAN_MAX_CHARS, AI_GATE_LATENCY_SECONDS
+        """
+        return cls(
+            enabled=os.getenv("AI_GATE_ENABLED", "true").lower() == "true",
+            min_chars=int(os.getenv("AI_GATE_MIN_CHARS", "160")),
+            min_lines=int(os.getenv("AI_GATE_MIN_LINES", "5")),
+            clean_score=int(os.getenv("AI_GATE_CLEAN_SCORE", "95")),
+            clean_max_chars=int(os.getenv("AI_GATE_CLEAN_MAX_CHARS", "0")),
+            ai_latency_seconds=float(os.getenv("AI_GATE_LATENCY_SECONDS", "4.0"))
+        )
+
+    def decide(self, code: str, plugin_result: Optional[ReviewResult],
+               covered: bool, latency_budget: Optional[float] = None) -> GateDecision:
+        """
+        Args:
+            plugin_result: Resultado do plugin para o trecho
+            covered: Linguagem tem plugin próprio (não só o UniversalPlugin)
+            latency_budget: Segundos que o chamador aceita esperar (None = sem limite)
+        """
+        decision = self._decide(code, plugin_result, covered, latency_budget)
+        with self._lock:
+            self._decisions[decision.reason] = self._decisions.get(decision.reason, 0) + 1
+        return decision
+
+    def _decide(self, code: str, plugin_result: Optional[ReviewResult],
+                covered: bool, latency_budget: Optional[float]) -> GateDecision:
+        if not self.enabled:
+            return GateDecision(True, "gate_disabled")
+
+        if latency_budget is not None and latency_budget < self.expected_ai_latency:
+            return GateDecision(False, "latency_budget")
+
+        if self._is_trivial(code):
+            return GateDecision(False, "trivial")
+
+        if not covered or plugin_result is None:
+            return GateDecision(True, "no_plugin")
+        if plugin_result.issues:
+            return GateDecision(True, "plugin_issues")
+        if plugin_result.quality_score < self.clean_score:
+            return GateDecision(True, "below_clean_score")
+        if len(code.strip()) < self.clean_max_chars:
+            return GateDecision(False, "clean")
+        return GateDecision(True, "plugin_clean")
+
+    def _is_trivial(self, code: str) -> bool:
+        stripped = code.strip()
+        if len(stripped) >= self.min_chars:
+            return False
+        lines = sum(1 for line in stripped.split("\n") if line.strip())
+        return lines < self.min_lines
+
+    def observe(self, seconds: float):
+        """Registra a duração de uma chamada AI concluída (média móvel)"""
+        with self._lock:
+            self.expected_ai_latency += self.LATENCY_SMOOTHING * (seconds - self.expected_ai_latency)
+
+    def stats(self) -> dict:
+        """Configuração, latência esperada e contagem de decisões por motivo"""
+        with self._lock:
+            decisions = dict(self._decisions)
+            latency = self.expected_ai_latency
+        return {
+            "enabled": self.enabled,
+            "minChars": self.min_chars,
+            "minLines": self.min_lines,
+            "cleanScore": self.clean_score,
+            "cleanMaxChars": self.clean_max_chars,
+            "expectedAiLatencySeconds": round(latency, 3),
+            "decisions": decisions
+        }
@@ -0,0 +1,44 @@
+"""
+Background Event Loop - ponte síncrono → asyncio
+Mantém um único loop em thread dedicada para que views síncronas
+compartilhem o mesmo AsyncGroqAdapter (limite de in-flight e coalescing)
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundLoop:
+    """Loop asyncio executando em uma thread daemon"""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="review-engine-loop", daemon=True
+        )
+        self._thread.start()
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """
+        Agenda a corrotina no loop e bloqueia até o resultado
+        Em timeout a task é cancelada (libera a chamada upstream)
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+    
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
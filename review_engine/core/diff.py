@@ -0,0 +1,147 @@
+"""
+Diff - Regiões alteradas para review incremental
+Converte um unified diff (ou par antigo/novo) em trechos do arquivo novo:
+linhas alteradas + contexto, com numeração do arquivo novo
+"""
+import difflib
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+_HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+DEFAULT_CONTEXT_LINES = 3
+
+
+@dataclass
+class DiffRegion:
+    """Trecho contíguo do arquivo novo que será analisado"""
+    start_line: int  # 1-based, no arquivo novo
+    lines: List[str] = field(default_factory=list)
+    changed_lines: List[int] = field(default_factory=list)  # numeração do arquivo novo
+
+    @property
+    def end_line(self) -> int:
+        return self.start_line + len(self.lines) - 1
+
+    @property
+    def code(self) -> str:
+        return "\n".join(self.lines)
+
+    def contains(self, line_number: int) -> bool:
+        return self.start_line <= line_number <= self.end_line
+
+
+@dataclass
+class DiffFile:
+    """Arquivo do diff com suas regiões alteradas"""
+    filename: Optional[str]
+    regions: List[DiffRegion] = field(default_factory=list)
+    new_code: Optional[str] = None  # disponível apenas no modo antigo/novo
+
+    @property
+    def changed_line_count(self) -> int:
+        return sum(len(region.changed_lines) for region in self.regions)
+
+
+def parse_unified_diff(diff: str) -> List[DiffFile]:
+    """
+    Lê um unified diff (git diff / diff -u), com um ou vários arquivos
+
+    Cada hunk vira uma região com as linhas do lado novo (contexto + adicionadas).
+    Hunks só com remoções e arquivos removidos são ignorados: não há código novo
+    para revisar.
+    """
+    files: List[DiffFile] = []
+    current: Optional[DiffFile] = None
+    region: Optional[DiffRegion] = None
+    new_line = 0
+    old_remaining = new_remaining = 0
+
+    def close_region():
+        if current is not None and region is not None and region.changed_lines:
+            current.regions.append(region)
+
+    for raw in diff.splitlines():
+        # Dentro do hunk, as contagens do cabeçalho decidem o que é conteúdo
+        # (uma linha removida "-- comentário" vira "--- comentário")
+        if region is not None and (old_remaining > 0 or new_remaining > 0):
+            if raw.startswith("+"):
+                region.lines.append(raw[1:])
+                region.changed_lines.append(new_line)
+                new_line += 1
+                new_remaining -= 1
+            elif raw.startswith("-"):
+                old_remaining -= 1
+            elif raw.startswith(" ") or raw == "":
+                # Linha de contexto (alguns editores removem o espaço de linhas vazias)
+                region.lines.append(raw[1:])
+                new_line += 1
+                old_remaining -= 1
+                new_remaining -= 1
+            # "\ No newline at end of file" não é conteúdo
+            continue
+
+        if raw.startswith("+++ "):
+            close_region()
+            region = None
+            path = raw[4:].split("\t")[0].strip()
+            if path == "/dev/null":
+                current = None
+                continue
+            if path.startswith("b/"):
+                path = path[2:]
+            current = DiffFile(filename=path)
+            files.append(current)
+            continue
+
+        if raw.startswith("--- ") or raw.startswith("diff ") or raw.startswith("index "):
+            continue
+
+        header = _HUNK_HEADER.match(raw)
+        if header:
+            close_region()
+            region = None
+            if current is None and not files:
+                # Diff sem cabeçalho de arquivo (apenas hunks)
+                current = DiffFile(filename=None)
+                files.append(current)
+            old_remaining = int(header.group(1) or 1)
+            new_line = int(header.group(2))
+            new_remaining = int(header.group(3) or 1)
+            if current is not None:
+                region = DiffRegion(start_line=new_line)
+            continue
+
+    close_region()
+    return [diff_file for diff_file in files if diff_file.regions]
+
+
+def diff_regions(old_code: str, new_code: str,
+                 context_lines: int = DEFAULT_CONTEXT_LINES) -> List[DiffRegion]:
+    """
+    Calcula regiões alteradas a partir do par antigo/novo
+    Mesmo agrupamento do unified diff: alterações próximas (até 2x contexto)
+    formam uma única região
+    """
+    old_lines = old_code.split("\n")
+    new_lines = new_code.split("\n")
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    regions = []
+    for group in matcher.get_grouped_opcodes(context_lines):
+        start, end = group[0][3], group[-1][4]
+        changed = [
+            line + 1
+            for tag, _, _, j1, j2 in group if tag in ("replace", "insert")
+            for line in range(j1, j2)
+        ]
+        if not changed:
+            continue
+        regions.append(DiffRegion(
+            start_line=start + 1,
+            lines=new_lines[start:end],
+            changed_lines=changed
+        ))
+    return regions
@@ -22,6 +22,24 @@ class ImpactLevel(Enum):
     ALTO = "Alto"
 
 
+_IMPACT_ALIASES = {
+    "low": ImpactLevel.BAIXO,
+    "baixo": ImpactLevel.BAIXO,
+    "medium": ImpactLevel.MEDIO,
+    "médio": ImpactLevel.MEDIO,
+    "medio": ImpactLevel.MEDIO,
+    "high": ImpactLevel.ALTO,
+    "alto": ImpactLevel.ALTO
+}
+
+
+def _coerce_impact(value) -> ImpactLevel:
+    """Aceita ImpactLevel ou string equivalente"""
+    if isinstance(value, ImpactLevel):
+        return value
+    return _IMPACT_ALIASES.get(str(value).lower(), ImpactLevel.MEDIO)
+
+
 @dataclass
 class Issue:
     """Representa um problema identificado no código"""
@@ -32,6 +50,14 @@ class Issue:
     original_code: Optional[str] = None
     line_number: Optional[int] = None
     rule_id: Optional[str] = None
+    column_number: Optional[int] = None
+    category: Optional[str] = None
+    recommendation: Optional[str] = None
+    
+    def __post_init__(self):
+        # Plugins podem informar severidade como string ("high")
+        if isinstance(self.severity, str):
+            self.severity = SeverityLevel(self.severity.lower())
     
     def to_dict(self) -> dict:
         return {
@@ -41,7 +67,10 @@ class Issue:
             "impact": self.impact,
             "originalCode": self.original_code,
             "lineNumber": self.line_number,
-            "ruleId": self.rule_id
+            "columnNumber": self.column_number,
+            "ruleId": self.rule_id,
+            "category": self.category,
+            "recommendation": self.recommendation
         }
 
 
@@ -57,6 +86,11 @@ class Metrics:
     estimated_speedup: str = "N/A"
     energy_savings: str = "N/A"
     
+    def __post_init__(self):
+        # Plugins podem informar impacto como string ("low", "medium", "high")
+        self.performance = _coerce_impact(self.performance)
+        self.eco_impact = _coerce_impact(self.eco_impact)
+    
     def to_dict(self) -> dict:
         return {
             "readability": self.readability,
@@ -82,6 +116,16 @@ class ReviewResult:
     metrics: Optional[Metrics] = None
     has_issues: bool = False
     confidence_level: Optional[int] = None  # Para auto-detecção
+    recommendations: List[str] = field(default_factory=list)
+    analysis_path: Optional[str] = None  # "static", "ai", "ai_failed", "similar", "cache"
+    gate_reason: Optional[str] = None  # motivo do AIGatePolicy, "ai_disabled", "ai_unavailable", do reuso similar ou do prazo ("deadline", "client_disconnected")
+    mode: str = "full"  # "issues", "patch" ou "full" (REVIEW_MODES)
+    patch: Optional[str] = None  # modo patch: unified diff do código enviado para o optimized_code
+    partial: bool = False  # prazo esgotado/cliente desconectou: etapas (AI, plugin) ficaram de fora
+    
+    def __post_init__(self):
+        if self.issues and not self.has_issues:
+            self.has_issues = True
     
     def to_dict(self) -> dict:
         return {
@@ -93,7 +137,13 @@ class ReviewResult:
             "explanationHtml": self.explanation_html,
             "metrics": self.metrics.to_dict() if self.metrics else None,
             "hasIssues": self.has_issues,
-            "confidenceLevel": self.confidence_level
+            "confidenceLevel": self.confidence_level,
+            "recommendations": self.recommendations,
+            "analysisPath": self.analysis_path,
+            "gateReason": self.gate_reason,
+            "mode": self.mode,
+            "patch": self.patch,
+            "partial": self.partial
         }
 
 
@@ -102,13 +152,57 @@ class DetectionResult:
     """Resultado da detecção automática de linguagem"""
     language: str
     confidence: int  # 0-100
-    detected_by: str  # "extension", "keywords", "syntax", "ai"
+    detected_by: str  # "extension", "model", "keywords", "syntax", "ai"
     fallback_required: bool = False
+    bytes_inspected: Optional[int] = None  # bytes (UTF-8) do código efetivamente lidos
     
     def to_dict(self) -> dict:
         return {
             "language": self.language,
             "confidence": self.confidence,
             "detectedBy": self.detected_by,
-            "fallbackRequired": self.fallback_required
+            "fallbackRequired": self.fallback_required,
+            "bytesInspected": self.bytes_inspected
+        }
+
+
+@dataclass
+class FileReviewResult:
+    """Resultado de um arquivo dentro de uma análise em lote"""
+    filename: Optional[str]
+    result: Optional[ReviewResult] = None
+    error: Optional[str] = None
+    reviewed_ranges: Optional[List[List[int]]] = None  # review de diff: [[inicio, fim], ...]
+    
+    def to_dict(self) -> dict:
+        return {
+            "filename": self.filename,
+            "success": self.error is None,
+            "data": self.result.to_dict() if self.result else None,
+            "error": self.error,
+            "reviewedRanges": self.reviewed_ranges
+        }
+
+
+@dataclass
+class BatchReviewResult:
+    """Contrato de saída da análise em lote (vários arquivos)"""
+    files: List[FileReviewResult] = field(default_factory=list)
+    average_score: int = 0
+    total_issues: int = 0
+    issues_by_severity: Dict[str, int] = field(default_factory=dict)
+    failed_files: int = 0
+    duration_seconds: float = 0.0
+    
+    def to_dict(self) -> dict:
+        return {
+            "files": [item.to_dict() for item in self.files],
+            "aggregate": {
+                "totalFiles": len(self.files),
+                "failedFiles": self.failed_files,
+                "averageScore": self.average_score,
+                "totalIssues": self.total_issues,
+                "issuesBySeverity": self.issues_by_severity,
+                "durationSeconds": self.duration_seconds
+            }
         }
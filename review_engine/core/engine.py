@@ -2,19 +2,71 @@
 Core Review Engine - FASE 2
 Orquestrador central do sistema de análise
 """
+import asyncio
 import logging
-from typing import Dict, List, Optional, Type
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Type
 from datetime import datetime
 import json
 
-from review_engine.core.dto import ReviewResult, DetectionResult
+from review_engine.core.dto import ReviewResult, DetectionResult, FileReviewResult, BatchReviewResult
+from review_engine.core.diff import (DiffFile, DiffRegion, DEFAULT_CONTEXT_LINES,
+                                     parse_unified_diff, diff_regions)
 from review_engine.detectors.language_detector import LanguageDetector
 from review_engine.plugins.base_plugin import BasePlugin, UniversalPlugin
+from review_engine.plugins.registry import PluginRegistry
 from review_engine.ai_layer.groq_adapter import GroqAdapter
+from review_engine.ai_layer.async_groq_adapter import AsyncGroqAdapter
+from review_engine.core.async_runner import BackgroundLoop
+from review_engine.core.ai_gate import AIGatePolicy, GateDecision
+from review_engine.cache.result_cache import ResultCache, InMemoryResultCache, build_cache_key
+from review_engine.cache.similar_index import Fingerprint, SimilarReviewIndex
+from review_engine.resilience import CircuitOpenError, Deadline, DeadlineExceeded, RateLimitExhausted
+from review_engine.chunking.chunker import CodeChunk, DEFAULT_CHUNK_CHARS, split_code
+from review_engine.chunking.prompt_budget import REVIEW_MODES, estimate_tokens
+from review_engine.chunking.packing import PACK_MAX_FILES, plan_packs
+from review_engine.chunking.patch import make_patch
 
 
 logger = logging.getLogger(__name__)
 
+# Intervalo em que a espera por vaga da AI confere o cancelamento do prazo
+SLOT_POLL_SECONDS = 0.05
+
+
+@dataclass
+class _AnalysisContext:
+    """Estado de uma análise entre as etapas síncronas e a chamada AI"""
+    code: str
+    language: str
+    filename: Optional[str]
+    use_ai: bool
+    context_code: Optional[str] = None
+    latency_budget: Optional[float] = None
+    mode: str = "full"
+    start_time: datetime = field(default_factory=datetime.now)
+    detection_result: Optional[DetectionResult] = None
+    plugin: Optional[BasePlugin] = None
+    cache_key: Optional[str] = None
+    cache_hit: bool = False
+    cacheable: bool = True
+    done: bool = False
+    result: Optional[ReviewResult] = None
+    gate: Optional[GateDecision] = None
+    fingerprint: Optional[Fingerprint] = None
+    path: str = "static"  # static | ai | ai_failed | similar (cache: cache_hit)
+    deadline: Optional[Deadline] = None
+    partial: bool = False  # etapa pulada/cancelada por prazo ou desconexão
+    
+    @property
+    def needs_ai(self) -> bool:
+        return (not self.done and not self.cache_hit and self.use_ai
+                and (self.gate is None or self.gate.use_ai))
+
 
 class ReviewEngine:
     """
@@ -22,11 +74,50 @@ class ReviewEngine:
     Segue padrão Strategy Pattern para seleção de analisadores
     """
     
-    def __init__(self, groq_api_key: Optional[str] = None):
+    # Paralelismo padrão da análise em lote
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_MAX_AI_CONCURRENCY = 4
+    
+    def __init__(self, groq_api_key: Optional[str] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 max_ai_concurrency: int = DEFAULT_MAX_AI_CONCURRENCY,
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                 ai_gate: Optional[AIGatePolicy] = None,
+                 pack_max_files: int = PACK_MAX_FILES,
+                 similar_index: Optional[SimilarReviewIndex] = None):
         self.detector = LanguageDetector()
-        self.plugins: Dict[str, BasePlugin] = {}
+        self.plugins = PluginRegistry()
         self.universal_plugin = UniversalPlugin()
         self.ai_adapter = GroqAdapter(groq_api_key) if groq_api_key else None
+        self.async_ai_adapter = AsyncGroqAdapter(
+            groq_api_key,
+            response_cache=self.ai_adapter.response_cache,
+            max_in_flight=max_ai_concurrency,
+            resilience=self.ai_adapter.resilience,
+            rate_limiter=self.ai_adapter.rate_limiter
+        ) if self.ai_adapter else None
+        
+        # Cache de resultados (evita repetir plugin + chamada Groq)
+        self.result_cache = result_cache if result_cache is not None else InMemoryResultCache()
+        
+        # Limite de chamadas Groq simultâneas (lote, threads do servidor)
+        self._ai_slots = threading.BoundedSemaphore(max_ai_concurrency)
+        
+        # Arquivos maiores que isso são analisados em chunks paralelos
+        self.chunk_chars = chunk_chars
+        
+        # Política static-first: quando a chamada AI vale a pena
+        self.ai_gate = ai_gate if ai_gate is not None else AIGatePolicy.from_env()
+        
+        # Arquivos pequenos do lote por prompt agrupado (1 = uma chamada por arquivo)
+        self.pack_max_files = pack_max_files
+        
+        # Reuso do review AI de trechos quase idênticos (renomeação, formatação)
+        self.similar_index = similar_index if similar_index is not None else SimilarReviewIndex.from_env()
+        
+        # Loop asyncio compartilhado para run_coroutine (criado sob demanda)
+        self._loop_runner: Optional[BackgroundLoop] = None
+        self._loop_lock = threading.Lock()
         
         # Sistema de auditabilidade (FASE 6)
         self.audit_log = []
@@ -34,189 +125,917 @@ class ReviewEngine:
         # Registrar plugins automaticamente
         self._register_plugins()
         
-        logger.info(f"ReviewEngine inicializado com {len(self.plugins)} plugins")
+        logger.info(f"ReviewEngine inicializado com {len(self.plugins)} linguagens registradas "
+                   f"(plugins carregados sob demanda)")
     
     def _register_plugins(self):
         """
-        Carrega e registra todos os plugins disponíveis
-        Auto-discovery via importação dinâmica
+        Registra o plugin universal; os plugins de linguagem ficam no
+        PluginRegistry e só são importados na primeira análise da linguagem
+        (embutidos + entry points "review_engine.plugins")
         """
-        # Importação manual dos plugins implementados
-        try:
-            from ..plugins.python.python_plugin import PythonPlugin
-            self.register_plugin(PythonPlugin())
-        except ImportError:
-            logger.warning("PythonPlugin não encontrado")
+        self.register_plugin(self.universal_plugin)
+    
+    def register_plugin(self, plugin: BasePlugin):
+        """Registra um plugin no engine (instância já criada)"""
+        for language, previous in self.plugins.register(plugin):
+            if previous and previous.version != plugin.version:
+                self.invalidate_plugin_cache(previous.name)
+            logger.info(f"Plugin {plugin.name} registrado para {language}")
+    
+    def invalidate_plugin_cache(self, plugin_name: str) -> int:
+        """
+        Remove do cache os resultados produzidos por um plugin
+        Usado quando a versão (regras) do plugin muda
+        """
+        if self.result_cache is None:
+            return 0
+        return self.result_cache.invalidate(f"plugin:{plugin_name}")
+    
+    def get_cache_stats(self) -> dict:
+        """Retorna contadores do cache de resultados"""
+        if self.result_cache is None:
+            return {"backend": "disabled"}
+        return self.result_cache.stats()
+    
+    def analyze(self, 
+                code: str, 
+                language: str = "auto",
+                filename: Optional[str] = None,
+                use_ai: bool = True,
+                latency_budget: Optional[float] = None,
+                mode: str = "full",
+                deadline: Optional[Deadline] = None) -> ReviewResult:
+        """
+        Executa análise completa do código
         
-        try:
-            from ..plugins.javascript.javascript_plugin import JavaScriptPlugin
-            self.register_plugin(JavaScriptPlugin())
-        except ImportError:
-            logger.warning("JavaScriptPlugin não encontrado")
+        Args:
+            code: Código-fonte a ser analisado
+            language: Linguagem (ou 'auto' para detecção)
+            filename: Nome do arquivo (ajuda na detecção)
+            use_ai: Se True, usa AI para análise semântica (sujeito ao ai_gate)
+            latency_budget: Segundos que o chamador aceita esperar; abaixo da
+                            latência esperada da AI, fica só o plugin
+            mode: Saída da revisão - "issues" (só problemas), "patch" (unified
+                  diff contra o código, aplicado no servidor) ou "full"
+            deadline: Prazo/cancelamento da requisição; etapas que não cabem
+                      são puladas e o resultado sai com partial=True
         
-        # Novos plugins - FASE 3 expansão
-        try:
-            from ..plugins.go.go_plugin import GoPlugin
-            self.register_plugin(GoPlugin())
-        except ImportError:
-            logger.warning("GoPlugin não encontrado")
+        Returns:
+            ReviewResult padronizado (analysis_path indica o caminho seguido)
+        """
+        _check_mode(mode)
+        if len(code) > self.chunk_chars:
+            return self.analyze_chunked(code, language, filename, use_ai,
+                                        latency_budget=latency_budget, mode=mode,
+                                        deadline=deadline)
+        return self._analyze_single(code, language, filename, use_ai,
+                                    latency_budget=latency_budget, mode=mode,
+                                    deadline=deadline)
+    
+    def _analyze_single(self, code: str, language: str, filename: Optional[str],
+                        use_ai: bool, context_code: Optional[str] = None,
+                        latency_budget: Optional[float] = None,
+                        mode: str = "full",
+                        deadline: Optional[Deadline] = None) -> ReviewResult:
+        """Análise de um único trecho (arquivo pequeno ou chunk)"""
+        context = self._begin_analysis(code, language, filename, use_ai, context_code,
+                                       latency_budget, mode, deadline)
         
-        try:
-            from ..plugins.rust.rust_plugin import RustPlugin
-            self.register_plugin(RustPlugin())
-        except ImportError:
-            logger.warning("RustPlugin não encontrado")
+        # Análise com AI (se habilitada, disponível e liberada pelo ai_gate)
+        if context.needs_ai and self.ai_adapter:
+            self._run_ai(context)
         
+        return self._finish_analysis(context)
+    
+    def _acquire_ai_slot(self, deadline: Optional[Deadline]):
+        """
+        Vaga em _ai_slots; a espera consome o prazo da requisição e termina
+        no cancelamento (cliente desconectou) com DeadlineExceeded
+        """
+        while True:
+            wait = deadline.bound(SLOT_POLL_SECONDS) if deadline else None
+            if self._ai_slots.acquire(timeout=wait):
+                return
+            if deadline.expired():
+                raise DeadlineExceeded(f"prazo esgotado aguardando vaga para a chamada AI "
+                                       f"({deadline.cause()})")
+    
+    def _run_ai(self, context: "_AnalysisContext"):
+        """Chamada AI individual do trecho, mesclada ao resultado do plugin"""
         try:
-            from ..plugins.php.php_plugin import PHPPlugin
-            self.register_plugin(PHPPlugin())
-        except ImportError:
-            logger.warning("PHPPlugin não encontrado")
+            self._acquire_ai_slot(context.deadline)
+            try:
+                started = time.perf_counter()
+                ai_result = self.ai_adapter.analyze(context.code, context.language, raise_errors=True,
+                                                    context_code=context.context_code,
+                                                    mode=context.mode, deadline=context.deadline)
+                self.ai_gate.observe(time.perf_counter() - started)
+            finally:
+                self._ai_slots.release()
+            self._apply_ai(context, ai_result)
+        except Exception as e:
+            self._ai_failed(context, e)
+            logger.error(f"Erro na análise AI: {e}")
+    
+    async def analyze_async(self,
+                            code: str,
+                            language: str = "auto",
+                            filename: Optional[str] = None,
+                            use_ai: bool = True,
+                            latency_budget: Optional[float] = None,
+                            mode: str = "full",
+                            deadline: Optional[Deadline] = None) -> ReviewResult:
+        """
+        Versão assíncrona de analyze()
         
-        try:
-            from ..plugins.ruby.ruby_plugin import RubyPlugin
-            self.register_plugin(RubyPlugin())
-        except ImportError:
-            logger.warning("RubyPlugin não encontrado")
+        Detecção e plugins rodam no executor padrão do loop; a chamada
+        Groq usa AsyncGroqAdapter (limite de in-flight + coalescing de
+        prompts idênticos), sem prender uma thread durante a latência do LLM
+        """
+        _check_mode(mode)
+        if len(code) > self.chunk_chars:
+            return await self.analyze_chunked_async(code, language, filename, use_ai,
+                                                    latency_budget=latency_budget, mode=mode,
+                                                    deadline=deadline)
+        return await self._analyze_single_async(code, language, filename, use_ai,
+                                                latency_budget=latency_budget, mode=mode,
+                                                deadline=deadline)
+    
+    async def _analyze_single_async(self, code: str, language: str, filename: Optional[str],
+                                    use_ai: bool, context_code: Optional[str] = None,
+                                    latency_budget: Optional[float] = None,
+                                    mode: str = "full",
+                                    deadline: Optional[Deadline] = None) -> ReviewResult:
+        loop = asyncio.get_running_loop()
+        context = await loop.run_in_executor(
+            None, self._begin_analysis, code, language, filename, use_ai, context_code,
+            latency_budget, mode, deadline
+        )
         
-        try:
-            from ..plugins.frontend.vue_plugin import VuePlugin
-            self.register_plugin(VuePlugin())
-        except ImportError:
-            logger.warning("VuePlugin não encontrado")
+        if context.needs_ai and self.async_ai_adapter:
+            ai_call = asyncio.ensure_future(self.async_ai_adapter.analyze_async(
+                code, context.language, raise_errors=True, context_code=context_code,
+                mode=mode, deadline=deadline
+            ))
+            # Cancelamento (cliente desconectou) interrompe a espera pelo Groq
+            unregister = deadline.on_cancel(
+                lambda: loop.call_soon_threadsafe(ai_call.cancel)
+            ) if deadline else None
+            try:
+                started = time.perf_counter()
+                ai_result = await ai_call
+                self.ai_gate.observe(time.perf_counter() - started)
+                self._apply_ai(context, ai_result)
+            except asyncio.CancelledError:
+                if deadline is None or not deadline.cancelled:
+                    raise
+                self._ai_failed(context, DeadlineExceeded(deadline.cause()))
+            except Exception as e:
+                self._ai_failed(context, e)
+                logger.error(f"Erro na análise AI (async): {e}")
+            finally:
+                if unregister:
+                    unregister()
         
-        try:
-            from ..plugins.frontend.angular_plugin import AngularPlugin
-            self.register_plugin(AngularPlugin())
-        except ImportError:
-            logger.warning("AngularPlugin não encontrado")
+        return self._finish_analysis(context)
+    
+    def analyze_stream(self,
+                       code: str,
+                       language: str = "auto",
+                       filename: Optional[str] = None,
+                       use_ai: bool = True,
+                       latency_budget: Optional[float] = None,
+                       mode: str = "full",
+                       deadline: Optional[Deadline] = None) -> Iterator[dict]:
+        """
+        Versão streaming de analyze(): emite eventos conforme ficam prontos
         
-        try:
-            from ..plugins.frontend.svelte_plugin import SveltePlugin
-            self.register_plugin(SveltePlugin())
-        except ImportError:
-            logger.warning("SveltePlugin não encontrado")
+        Eventos (dict com "event" e "data"):
+            detection - resultado da auto-detecção (se language='auto')
+            plugin    - ReviewResult do plugin (milissegundos)
+            ai_issue  - cada issue da AI assim que chega no stream
+            result    - ReviewResult final mesclado
         
-        # Plugins mobile - FASE 3 expansão
-        try:
-            from ..plugins.kotlin.kotlin_plugin import KotlinPlugin
-            self.register_plugin(KotlinPlugin())
-        except ImportError:
-            logger.warning("KotlinPlugin não encontrado")
+        Arquivos grandes (chunks) emitem apenas o evento result
+        """
+        _check_mode(mode)
+        if len(code) > self.chunk_chars:
+            result = self.analyze_chunked(code, language, filename, use_ai,
+                                          latency_budget=latency_budget, mode=mode,
+                                          deadline=deadline)
+            yield {"event": "result", "data": result.to_dict()}
+            return
         
-        try:
-            from ..plugins.swift.swift_plugin import SwiftPlugin
-            self.register_plugin(SwiftPlugin())
-        except ImportError:
-            logger.warning("SwiftPlugin não encontrado")
+        context = self._begin_analysis(code, language, filename, use_ai,
+                                       latency_budget=latency_budget, mode=mode,
+                                       deadline=deadline)
         
-        # Plugins infraestrutura - FASE 3 expansão
-        try:
-            from ..plugins.infra.bash_plugin import BashPlugin
-            self.register_plugin(BashPlugin())
-        except ImportError:
-            logger.warning("BashPlugin não encontrado")
+        if context.detection_result:
+            yield {"event": "detection", "data": context.detection_result.to_dict()}
         
-        try:
-            from ..plugins.infra.yaml_plugin import YAMLPlugin
-            self.register_plugin(YAMLPlugin())
-        except ImportError:
-            logger.warning("YAMLPlugin não encontrado")
+        if context.needs_ai and self.ai_adapter:
+            if context.result is not None:
+                yield {"event": "plugin", "data": context.result.to_dict()}
+            
+            try:
+                ai_result = None
+                self._acquire_ai_slot(deadline)
+                for kind, payload in self._pump_ai_stream(context):
+                    if kind == "issue":
+                        yield {"event": "ai_issue", "data": payload.to_dict()}
+                    else:
+                        ai_result = payload
+                self._apply_ai(context, ai_result)
+            except Exception as e:
+                self._ai_failed(context, e)
+                logger.error(f"Erro na análise AI (stream): {e}")
         
-        try:
-            from ..plugins.infra.dockerfile_plugin import DockerfilePlugin
-            self.register_plugin(DockerfilePlugin())
-        except ImportError:
-            logger.warning("DockerfilePlugin não encontrado")
+        result = self._finish_analysis(context)
+        yield {"event": "result", "data": result.to_dict()}
+    
+    def _pump_ai_stream(self, context: "_AnalysisContext") -> Iterator[tuple]:
+        """
+        Lê o stream da AI numa thread própria (vaga de _ai_slots já adquirida)
+        e devolve os eventos por uma fila: a vaga é liberada quando o upstream
+        termina, não quando um cliente lento acaba de receber os eventos
+        """
+        events: "queue.Queue[tuple]" = queue.Queue()
         
-        try:
-            from ..plugins.infra.terraform_plugin import TerraformPlugin
-            self.register_plugin(TerraformPlugin())
-        except ImportError:
-            logger.warning("TerraformPlugin não encontrado")
+        def pump():
+            try:
+                started = time.perf_counter()
+                for item in self.ai_adapter.analyze_stream(
+                        context.code, context.language, raise_errors=True,
+                        mode=context.mode, deadline=context.deadline):
+                    events.put(item)
+                self.ai_gate.observe(time.perf_counter() - started)
+                events.put(("done", None))
+            except Exception as e:
+                events.put(("error", e))
+            finally:
+                self._ai_slots.release()
         
-        # Registrar plugin universal
-        self.register_plugin(self.universal_plugin)
+        threading.Thread(target=pump, name="ai-stream", daemon=True).start()
+        while True:
+            kind, payload = events.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise payload
+            yield kind, payload
     
-    def register_plugin(self, plugin: BasePlugin):
-        """Registra um plugin no engine"""
-        for language in plugin.get_supported_languages():
-            self.plugins[language] = plugin
-            logger.info(f"Plugin {plugin.name} registrado para {language}")
+    def run_coroutine(self, coroutine, timeout: Optional[float] = None):
+        """
+        Executa uma corrotina no loop compartilhado do engine e aguarda o resultado
+        Permite que views síncronas (Flask/gunicorn) usem analyze_async
+        """
+        if self._loop_runner is None:
+            with self._loop_lock:
+                if self._loop_runner is None:
+                    self._loop_runner = BackgroundLoop()
+        return self._loop_runner.run(coroutine, timeout=timeout)
     
-    def analyze(self, 
-                code: str, 
-                language: str = "auto",
-                filename: Optional[str] = None,
-                use_ai: bool = True) -> ReviewResult:
+    def _begin_analysis(self, code: str, language: str,
+                        filename: Optional[str], use_ai: bool,
+                        context_code: Optional[str] = None,
+                        latency_budget: Optional[float] = None,
+                        mode: str = "full",
+                        deadline: Optional[Deadline] = None) -> "_AnalysisContext":
         """
-        Executa análise completa do código
+        Etapas síncronas antes da AI: detecção, seleção de plugin, cache,
+        plugin e decisão do ai_gate
         
-        Args:
-            code: Código-fonte a ser analisado
-            language: Linguagem (ou 'auto' para detecção)
-            filename: Nome do arquivo (ajuda na detecção)
-            use_ai: Se True, usa AI para análise semântica
-        
-        Returns:
-            ReviewResult padronizado
+        Com deadline, cada etapa só começa se ainda há tempo; sem orçamento
+        explícito, o tempo restante vira o latency_budget do ai_gate
         """
-        start_time = datetime.now()
+        context = _AnalysisContext(code=code, language=language,
+                                   filename=filename, use_ai=use_ai,
+                                   context_code=context_code,
+                                   latency_budget=latency_budget, mode=mode,
+                                   deadline=deadline)
         
         # Auto-detecção se necessário
-        detection_result = None
         if language == "auto":
+            if self._expire(context, "detecção"):
+                return context
             detection_result = self.detector.detect(code, filename)
-            language = detection_result.language
+            context.detection_result = detection_result
+            context.language = detection_result.language
             
-            logger.info(f"Linguagem detectada: {language} "
+            logger.info(f"Linguagem detectada: {context.language} "
                        f"(confiança: {detection_result.confidence}%)")
             
             # Fallback manual se confiança baixa
             if detection_result.fallback_required:
                 logger.warning("Confiança baixa na detecção. Requer seleção manual.")
-                return ReviewResult(
-                    language="unknown",
-                    quality_score=0,
-                    confidence_level=detection_result.confidence,
-                    explanation="Não foi possível detectar a linguagem com confiança. "
-                               "Por favor, selecione manualmente."
-                )
+                context.done = True
+                context.result = self._unknown_language_result(detection_result.confidence)
+                return context
         
         # Selecionar plugin apropriado
-        plugin = self.plugins.get(language)
-        if not plugin and language != "*":
+        plugin = self.plugins.get(context.language)
+        if not plugin and context.language != "*":
             # Fallback para plugin universal
             plugin = self.universal_plugin
-            logger.info(f"Plugin específico não encontrado para {language}. "
+            logger.info(f"Plugin específico não encontrado para {context.language}. "
                        f"Usando UniversalPlugin.")
+        context.plugin = plugin
         
-        # Executar análise do plugin
-        result = plugin.analyze(code, language) if plugin else None
+        # Consultar cache antes de executar plugin e AI
+        if self.result_cache is not None:
+            context.cache_key = self._build_cache_key(code, context.language,
+                                                      filename, use_ai, plugin,
+                                                      context_code, mode)
+            context.result = self.result_cache.get(context.cache_key)
+            context.cache_hit = context.result is not None
         
-        # Análise com AI (se habilitada e disponível)
-        if use_ai and self.ai_adapter:
-            try:
-                ai_result = self.ai_adapter.analyze(code, language)
-                # Mesclar resultados AI com análise do plugin
-                result = self._merge_results(result, ai_result)
-            except Exception as e:
-                logger.error(f"Erro na análise AI: {e}")
+        if context.cache_hit:
+            logger.info(f"Resultado obtido do cache ({context.language})")
+        else:
+            # Executar análise do plugin
+            if self._expire(context, "plugin"):
+                return context
+            context.result = plugin.analyze(code, context.language) if plugin else None
+            
+            if use_ai and self.ai_adapter:
+                budget_from_deadline = latency_budget is None and deadline is not None
+                if budget_from_deadline:
+                    latency_budget = deadline.remaining()
+                context.gate = self.ai_gate.decide(
+                    code, context.result,
+                    covered=plugin is not None and plugin is not self.universal_plugin,
+                    latency_budget=latency_budget
+                )
+                # Orçamento é do chamador: outro pedido do mesmo código pode querer AI
+                if context.gate.reason == "latency_budget":
+                    context.cacheable = False
+                    if budget_from_deadline:
+                        # AI não cabe no prazo restante: fica só o plugin
+                        context.partial = True
+                        context.gate = GateDecision(False, deadline.cause())
+                if context.gate.use_ai and self.ai_adapter.resilience.breaker.is_open():
+                    # Groq degradado: só plugin até o circuito fechar
+                    context.gate = GateDecision(False, "circuit_open")
+                    context.cacheable = False
+                if context.gate.use_ai:
+                    self._reuse_similar(context)
+            else:
+                context.gate = GateDecision(False, "ai_unavailable" if use_ai else "ai_disabled")
+        
+        return context
+    
+    def _expire(self, context: "_AnalysisContext", stage: str) -> bool:
+        """
+        Prazo esgotado antes da etapa: encerra a análise com o que já existe
+        (ou um resultado vazio) marcado como parcial
+        """
+        deadline = context.deadline
+        if deadline is None or not deadline.expired():
+            return False
+        logger.warning(f"Prazo esgotado antes da etapa {stage} ({deadline.cause()})")
+        context.done = True
+        context.partial = True
+        if context.result is None:
+            context.result = ReviewResult(
+                language=context.language if context.language != "auto" else "unknown",
+                quality_score=0,
+                explanation=f"Prazo da requisição esgotado antes da etapa {stage}; "
+                            f"análise não concluída.",
+                analysis_path="static",
+                gate_reason=deadline.cause()
+            )
+            if context.detection_result:
+                context.result.confidence_level = context.detection_result.confidence
+        return True
+    
+    def _reuse_similar(self, context: "_AnalysisContext"):
+        """Review AI de um trecho quase idêntico já analisado, no lugar da chamada"""
+        context.fingerprint = self.similar_index.fingerprint(context.code, context.language)
+        match = self.similar_index.lookup(context.fingerprint, context.mode, context.code)
+        if match is None:
+            return
+        context.result = self._merge_results(context.result, match.result)
+        context.path = "similar"
+        context.gate = GateDecision(False, match.reason)
+        # near_duplicate é parcial (sem código otimizado): não ocupa a chave exata
+        if match.reason != "equivalent":
+            context.cacheable = False
+    
+    def _apply_ai(self, context: "_AnalysisContext", ai_result: ReviewResult):
+        """Indexa o review AI para reuso e o mescla com a análise do plugin"""
+        # Texto livre fora do JSON (issue AI_FALLBACK) não é review reaproveitável
+        if ai_result is not None and not any(issue.rule_id == "AI_FALLBACK"
+                                             for issue in ai_result.issues):
+            self.similar_index.add(context.fingerprint, context.mode, ai_result)
+        context.result = self._merge_results(context.result, ai_result)
+        context.path = "ai"
+    
+    def _ai_failed(self, context: "_AnalysisContext", error: Exception):
+        """
+        Falha transitória: fica o resultado do plugin, sem ir para o cache
+        Prazo da requisição esgotado/cancelado: resultado do plugin como parcial
+        """
+        context.cacheable = False
+        if isinstance(error, CircuitOpenError):
+            context.path = "static"
+            context.gate = GateDecision(False, "circuit_open")
+        elif isinstance(error, RateLimitExhausted):
+            # Cota das chaves Groq esgotada dentro do prazo: só plugin
+            context.path = "static"
+            context.gate = GateDecision(False, "rate_limited")
+        elif (isinstance(error, DeadlineExceeded) and context.deadline is not None
+              and context.deadline.expired()):
+            context.path = "static"
+            context.partial = True
+            context.gate = GateDecision(False, context.deadline.cause())
+        else:
+            context.path = "ai_failed"
+    
+    def _finish_analysis(self, context: "_AnalysisContext") -> ReviewResult:
+        """Etapas finais: gravação no cache, dados de detecção e auditoria"""
+        if context.done:
+            context.result.mode = context.mode
+            context.result.partial = context.partial
+            return context.result
+        
+        result = context.result
+        if result is not None and not context.cache_hit:
+            result.analysis_path = context.path
+            result.gate_reason = context.gate.reason if context.gate else None
+            result.partial = context.partial
+            _shape_result(result, context.code, context.mode)
+        
+        if (not context.cache_hit and context.cache_key and context.cacheable
+                and result is not None):
+            tags = [f"plugin:{context.plugin.name}"] if context.plugin else []
+            self.result_cache.set(context.cache_key, result, tags=tags)
+        
+        if context.cache_hit and result is not None:
+            result.analysis_path = "cache"
         
         # Adicionar informações de detecção
-        if detection_result:
-            result.confidence_level = detection_result.confidence
+        if context.detection_result:
+            result.confidence_level = context.detection_result.confidence
         
         # Auditoria (FASE 6)
         self._log_analysis(
+            code=context.code,
+            language=context.language,
+            result=result,
+            duration=(datetime.now() - context.start_time).total_seconds(),
+            cache_hit=context.cache_hit
+        )
+        
+        return result
+    
+    def _build_cache_key(self, code: str, language: str,
+                         filename: Optional[str], use_ai: bool,
+                         plugin: Optional[BasePlugin],
+                         context_code: Optional[str] = None,
+                         mode: str = "full") -> str:
+        """Chave do cache: código + contexto que altera o resultado"""
+        plugin_versions = {}
+        if plugin:
+            plugin_versions[plugin.name] = plugin.version
+        
+        return build_cache_key(
             code=code,
             language=language,
-            result=result,
-            duration=(datetime.now() - start_time).total_seconds()
+            filename=filename,
+            use_ai=bool(use_ai and self.ai_adapter),
+            plugin_versions=plugin_versions,
+            model=self.ai_adapter.model if self.ai_adapter else None,
+            context_code=context_code,
+            mode=mode
+        )
+    
+    def analyze_many(self,
+                     files: List[dict],
+                     use_ai: bool = True,
+                     max_workers: Optional[int] = None,
+                     mode: str = "full") -> BatchReviewResult:
+        """
+        Analisa vários arquivos em paralelo (ex: todos os arquivos de um PR)
+        
+        Detecção e plugins rodam em um pool de threads; chamadas Groq
+        respeitam o limite de concorrência do engine (max_ai_concurrency).
+        Arquivos pequenos que precisam de AI vão juntos em prompts agrupados
+        (até pack_max_files por chamada); o arquivo sem resposta válida no
+        grupo é reenviado sozinho.
+        
+        Args:
+            files: Lista de {"filename", "code", "language"} (language opcional, padrão 'auto')
+            use_ai: Se True, usa AI para análise semântica
+            max_workers: Tamanho do pool (padrão DEFAULT_MAX_WORKERS)
+            mode: Modo de saída aplicado a todos os arquivos (ver analyze)
+        
+        Returns:
+            BatchReviewResult com resultado por arquivo e agregado
+        """
+        _check_mode(mode)
+        start_time = datetime.now()
+        batch = BatchReviewResult()
+        if not files:
+            return batch
+        
+        workers = max(1, min(len(files), max_workers or self.DEFAULT_MAX_WORKERS))
+        
+        def analyze_file(entry: dict) -> FileReviewResult:
+            filename = entry.get("filename")
+            try:
+                result = self.analyze(
+                    code=entry.get("code", ""),
+                    language=(entry.get("language") or "auto").lower(),
+                    filename=filename,
+                    use_ai=use_ai,
+                    mode=mode
+                )
+                return FileReviewResult(filename=filename, result=result)
+            except Exception as e:
+                logger.error(f"Erro na análise em lote ({filename}): {e}")
+                return FileReviewResult(filename=filename, error=str(e))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            if use_ai and self.ai_adapter and self.pack_max_files > 1:
+                batch.files = self._analyze_packed(files, use_ai, mode, executor, analyze_file)
+            else:
+                # map preserva a ordem de entrada
+                batch.files = list(executor.map(analyze_file, files))
+        
+        self._aggregate_batch(batch)
+        batch.duration_seconds = (datetime.now() - start_time).total_seconds()
+        
+        logger.info(f"Lote analisado: {len(files)} arquivos, {workers} workers, "
+                   f"{batch.duration_seconds:.2f}s")
+        return batch
+    
+    def _analyze_packed(self, files: List[dict], use_ai: bool, mode: str,
+                        executor: ThreadPoolExecutor, analyze_file) -> List[FileReviewResult]:
+        """
+        Lote com prompts agrupados: detecção, cache, plugin e ai_gate por
+        arquivo; as chamadas AI restantes são agrupadas por plan_packs.
+        Arquivos grandes (chunks) seguem por analyze_file.
+        """
+        outcomes: List[Optional[FileReviewResult]] = [None] * len(files)
+        large = {
+            index: executor.submit(analyze_file, entry)
+            for index, entry in enumerate(files)
+            if len(entry.get("code", "")) > self.chunk_chars
+        }
+        small = [index for index in range(len(files)) if index not in large]
+        
+        def begin(index: int) -> "_AnalysisContext":
+            entry = files[index]
+            return self._begin_analysis(entry.get("code", ""),
+                                        (entry.get("language") or "auto").lower(),
+                                        entry.get("filename"), use_ai, mode=mode)
+        
+        contexts = dict(zip(small, executor.map(self._safe_call(begin), small)))
+        pending = []
+        for index, context in contexts.items():
+            if isinstance(context, Exception):
+                logger.error(f"Erro na análise em lote ({files[index].get('filename')}): {context}")
+                outcomes[index] = FileReviewResult(filename=files[index].get("filename"),
+                                                   error=str(context))
+            elif context.needs_ai:
+                pending.append(context)
+        
+        groups = plan_packs([estimate_tokens(context.code) for context in pending], mode,
+                            file_ceiling=self.ai_adapter.max_tokens,
+                            max_files=self.pack_max_files)
+        list(executor.map(lambda group: self._run_ai_packed([pending[i] for i in group]), groups))
+        
+        for index, context in contexts.items():
+            if outcomes[index] is None:
+                outcomes[index] = FileReviewResult(filename=files[index].get("filename"),
+                                                   result=self._finish_analysis(context))
+        for index, future in large.items():
+            outcomes[index] = future.result()
+        return outcomes
+    
+    def _run_ai_packed(self, contexts: List["_AnalysisContext"]):
+        """Uma chamada AI para o grupo; quem ficou sem resultado vai sozinho"""
+        if len(contexts) == 1:
+            self._run_ai(contexts[0])
+            return
+        try:
+            with self._ai_slots:
+                results = self.ai_adapter.analyze_packed(
+                    [(context.code, context.language) for context in contexts],
+                    mode=contexts[0].mode, raise_errors=True
+                )
+        except Exception as e:
+            logger.warning(f"Prompt agrupado falhou ({len(contexts)} arquivos): {e}")
+            results = [None] * len(contexts)
+        
+        for context, ai_result in zip(contexts, results):
+            if ai_result is None:
+                self._run_ai(context)
+            else:
+                self._apply_ai(context, ai_result)
+    
+    def _aggregate_batch(self, batch: BatchReviewResult):
+        """Calcula métricas agregadas do lote"""
+        scores = []
+        severities: Dict[str, int] = {}
+        
+        for item in batch.files:
+            if item.error or not item.result:
+                batch.failed_files += 1
+                continue
+            
+            scores.append(item.result.quality_score)
+            batch.total_issues += len(item.result.issues)
+            for issue in item.result.issues:
+                severity = getattr(issue.severity, "value", issue.severity)
+                severities[severity] = severities.get(severity, 0) + 1
+        
+        batch.average_score = sum(scores) // len(scores) if scores else 0
+        batch.issues_by_severity = severities
+    
+    def analyze_diff(self,
+                     diff: Optional[str] = None,
+                     old_code: Optional[str] = None,
+                     new_code: Optional[str] = None,
+                     language: str = "auto",
+                     filename: Optional[str] = None,
+                     use_ai: bool = True,
+                     context_lines: int = DEFAULT_CONTEXT_LINES,
+                     max_workers: Optional[int] = None,
+                     mode: str = "full") -> BatchReviewResult:
+        """
+        Review incremental: analisa apenas as regiões alteradas (+ contexto)
+        
+        Cada região passa por analyze() isoladamente, então plugins e Groq
+        recebem só o trecho alterado, e regiões que não mudaram entre dois
+        pushes do PR (mesmo conteúdo) vêm do cache de resultados.
+        Linhas das issues são convertidas para a numeração do arquivo novo.
+        
+        Args:
+            diff: Unified diff (um ou vários arquivos)
+            old_code / new_code: Alternativa ao diff para um único arquivo
+            language: Linguagem (ou 'auto'), aplicada a todos os arquivos
+            filename: Nome do arquivo (modo antigo/novo ou diff sem cabeçalho)
+            context_lines: Linhas de contexto no modo antigo/novo
+            mode: Modo de saída das regiões (ver analyze)
+        
+        Returns:
+            BatchReviewResult com um item por arquivo alterado
+        """
+        _check_mode(mode)
+        start_time = datetime.now()
+        
+        if diff is not None:
+            diff_files = parse_unified_diff(diff)
+            for diff_file in diff_files:
+                diff_file.filename = diff_file.filename or filename
+        elif new_code is not None:
+            diff_files = [DiffFile(
+                filename=filename,
+                regions=diff_regions(old_code or "", new_code, context_lines),
+                new_code=new_code
+            )]
+        else:
+            raise ValueError("Informe diff ou new_code")
+        
+        batch = BatchReviewResult()
+        jobs = []
+        languages = {}
+        for index, diff_file in enumerate(diff_files):
+            file_language = self._diff_file_language(diff_file, language)
+            if file_language is None:
+                batch.files.append(FileReviewResult(
+                    filename=diff_file.filename,
+                    result=self._unknown_language_result()
+                ))
+                continue
+            languages[index] = file_language
+            jobs.extend((index, region) for region in diff_file.regions)
+        
+        def analyze_region(job) -> ReviewResult:
+            index, region = job
+            return self.analyze(region.code, languages[index],
+                                diff_files[index].filename, use_ai, mode=mode)
+        
+        region_results: Dict[int, list] = {index: [] for index in languages}
+        if jobs:
+            workers = max(1, min(len(jobs), max_workers or self.DEFAULT_MAX_WORKERS))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for job, outcome in zip(jobs, executor.map(self._safe_call(analyze_region), jobs)):
+                    region_results[job[0]].append((job[1], outcome))
+        
+        for index, results in region_results.items():
+            diff_file = diff_files[index]
+            errors = [str(outcome) for _, outcome in results if isinstance(outcome, Exception)]
+            if errors:
+                logger.error(f"Erro no review de diff ({diff_file.filename}): {errors[0]}")
+                batch.files.append(FileReviewResult(filename=diff_file.filename, error=errors[0]))
+                continue
+            batch.files.append(FileReviewResult(
+                filename=diff_file.filename,
+                result=self._stitch_regions(languages[index], results, mode=mode),
+                reviewed_ranges=[[region.start_line, region.end_line]
+                                 for region in diff_file.regions]
+            ))
+        
+        self._aggregate_batch(batch)
+        batch.duration_seconds = (datetime.now() - start_time).total_seconds()
+        
+        reviewed = sum(len(region.lines) for _, region in jobs)
+        logger.info(f"Diff analisado: {len(diff_files)} arquivos, {len(jobs)} regiões, "
+                   f"{reviewed} linhas enviadas, {batch.duration_seconds:.2f}s")
+        return batch
+    
+    @staticmethod
+    def _safe_call(func):
+        """Captura exceções para que uma região com erro não derrube as demais"""
+        def wrapper(arg):
+            try:
+                return func(arg)
+            except Exception as e:
+                return e
+        return wrapper
+    
+    def _diff_file_language(self, diff_file: DiffFile, language: str) -> Optional[str]:
+        """Linguagem do arquivo: explícita ou detectada uma vez (arquivo novo ou regiões)"""
+        if language != "auto":
+            return language
+        sample = diff_file.new_code
+        if sample is None:
+            sample = "\n".join(region.code for region in diff_file.regions)
+        detection = self.detector.detect(sample, diff_file.filename)
+        if detection.fallback_required:
+            logger.warning(f"Confiança baixa na detecção ({diff_file.filename}) no review de diff")
+            return None
+        return detection.language
+    
+    def _stitch_regions(self, language: str, results: list,
+                        file_issues: Optional[list] = None,
+                        mode: str = "full") -> ReviewResult:
+        """
+        Junta os resultados das regiões (diff) ou chunks de um arquivo
+        Issues passam para a numeração do arquivo; regras de escopo de arquivo
+        dos trechos são descartadas e substituídas por file_issues (quando o
+        arquivo inteiro está disponível). Issues repetidas em trechos vizinhos
+        (ex.: AI comentando o contexto) aparecem uma única vez.
+        """
+        plugin = self.plugins.get(language) or self.universal_plugin
+        file_scope = set(plugin.FILE_SCOPE_RULES)
+        
+        issues = list(file_issues or [])
+        seen = set()
+        explanations = []
+        recommendations = []
+        metrics = None
+        for region, result in results:
+            for issue in result.issues:
+                if issue.rule_id in file_scope:
+                    continue
+                if issue.line_number is not None:
+                    issue.line_number += region.start_line - 1
+                    key = (issue.rule_id, issue.line_number)
+                else:
+                    key = (issue.rule_id, issue.title.strip().lower(),
+                           (issue.original_code or "").strip())
+                if key in seen:
+                    continue
+                seen.add(key)
+                issues.append(issue)
+            if result.explanation:
+                explanations.append(f"Linhas {region.start_line}-{region.end_line}: "
+                                    f"{result.explanation}")
+            for recommendation in result.recommendations:
+                if recommendation not in recommendations:
+                    recommendations.append(recommendation)
+            metrics = metrics or result.metrics
+        
+        issues.sort(key=lambda issue: (issue.line_number is None, issue.line_number or 0))
+        
+        return ReviewResult(
+            language=language,
+            quality_score=plugin.calculate_quality_score(issues),
+            issues=issues,
+            explanation="\n\n".join(explanations) or None,
+            metrics=metrics,
+            has_issues=len(issues) > 0,
+            recommendations=recommendations,
+            analysis_path=_combined_path(result.analysis_path for _, result in results),
+            mode=mode,
+            partial=any(result.partial for _, result in results)
         )
+    
+    def analyze_chunked(self,
+                        code: str,
+                        language: str = "auto",
+                        filename: Optional[str] = None,
+                        use_ai: bool = True,
+                        max_workers: Optional[int] = None,
+                        latency_budget: Optional[float] = None,
+                        mode: str = "full",
+                        deadline: Optional[Deadline] = None) -> ReviewResult:
+        """
+        Análise de arquivo grande: divide em chunks (fronteiras de função/classe),
+        analisa plugins + AI de cada chunk em paralelo e reconstrói um único
+        ReviewResult com linhas do arquivo original
         
+        Cada chunk envia à AI algumas linhas anteriores apenas como contexto,
+        então os optimizedCode dos chunks não se sobrepõem e são concatenados
+        (modo patch: o diff final é recalculado sobre o arquivo inteiro).
+        """
+        start_time = datetime.now()
+        language, detection, chunks = self._plan_chunks(code, language, filename)
+        if language is None:
+            return self._unknown_language_result(detection.confidence)
+        
+        def analyze_chunk(chunk: CodeChunk) -> ReviewResult:
+            return self._analyze_single(chunk.code, language, filename, use_ai,
+                                        context_code=chunk.context or None,
+                                        latency_budget=latency_budget, mode=mode,
+                                        deadline=deadline)
+        
+        workers = max(1, min(len(chunks), max_workers or self.DEFAULT_MAX_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(analyze_chunk, chunks))
+        
+        result = self._stitch_chunks(code, language, detection, chunks, results, mode)
+        logger.info(f"Arquivo grande analisado: {len(code)} chars, {len(chunks)} chunks, "
+                   f"{(datetime.now() - start_time).total_seconds():.2f}s")
         return result
     
+    async def analyze_chunked_async(self,
+                                    code: str,
+                                    language: str = "auto",
+                                    filename: Optional[str] = None,
+                                    use_ai: bool = True,
+                                    latency_budget: Optional[float] = None,
+                                    mode: str = "full",
+                                    deadline: Optional[Deadline] = None) -> ReviewResult:
+        """Versão assíncrona de analyze_chunked (chunks via asyncio.gather)"""
+        loop = asyncio.get_running_loop()
+        language, detection, chunks = await loop.run_in_executor(
+            None, self._plan_chunks, code, language, filename
+        )
+        if language is None:
+            return self._unknown_language_result(detection.confidence)
+        
+        results = await asyncio.gather(*(
+            self._analyze_single_async(chunk.code, language, filename, use_ai,
+                                       context_code=chunk.context or None,
+                                       latency_budget=latency_budget, mode=mode,
+                                       deadline=deadline)
+            for chunk in chunks
+        ))
+        return await loop.run_in_executor(
+            None, self._stitch_chunks, code, language, detection, chunks, list(results), mode
+        )
+    
+    def _plan_chunks(self, code: str, language: str, filename: Optional[str]):
+        """Detecta a linguagem uma vez (arquivo inteiro) e divide em chunks"""
+        detection = None
+        if language == "auto":
+            detection = self.detector.detect(code, filename)
+            if detection.fallback_required:
+                logger.warning("Confiança baixa na detecção. Requer seleção manual.")
+                return None, detection, []
+            language = detection.language
+        return language, detection, split_code(code, max_chars=self.chunk_chars)
+    
+    def _stitch_chunks(self, code: str, language: str,
+                       detection: Optional[DetectionResult],
+                       chunks: List[CodeChunk], results: List[ReviewResult],
+                       mode: str = "full") -> ReviewResult:
+        """Reconstrói o resultado do arquivo a partir dos chunks"""
+        # Regras de escopo de arquivo precisam do arquivo inteiro (só regex, barato)
+        plugin = self.plugins.get(language) or self.universal_plugin
+        file_issues = []
+        if plugin.FILE_SCOPE_RULES:
+            scope = set(plugin.FILE_SCOPE_RULES)
+            file_issues = [issue for issue in plugin.analyze(code, language).issues
+                           if issue.rule_id in scope]
+        
+        result = self._stitch_regions(language, list(zip(chunks, results)), file_issues, mode)
+        
+        if any(chunk_result.optimized_code for chunk_result in results):
+            result.optimized_code = "\n".join(
+                chunk_result.optimized_code or chunk.code
+                for chunk, chunk_result in zip(chunks, results)
+            )
+        _shape_result(result, code, mode)
+        if detection:
+            result.confidence_level = detection.confidence
+        return result
+    
+    def _unknown_language_result(self, confidence: Optional[int] = None) -> ReviewResult:
+        """Resultado quando a linguagem não pode ser detectada com confiança"""
+        return ReviewResult(
+            language="unknown",
+            quality_score=0,
+            confidence_level=confidence,
+            explanation="Não foi possível detectar a linguagem com confiança. "
+                       "Por favor, selecione manualmente."
+        )
+    
     def _merge_results(self, plugin_result: ReviewResult, 
                        ai_result: ReviewResult) -> ReviewResult:
         """
@@ -231,6 +1050,7 @@ class ReviewEngine:
         
         # Priorizar código otimizado da AI
         plugin_result.optimized_code = ai_result.optimized_code or plugin_result.optimized_code
+        plugin_result.patch = ai_result.patch or plugin_result.patch
         plugin_result.explanation = ai_result.explanation or plugin_result.explanation
         plugin_result.explanation_html = ai_result.explanation_html
         
@@ -251,7 +1071,8 @@ class ReviewEngine:
         return plugin_result
     
     def _log_analysis(self, code: str, language: str, 
-                      result: ReviewResult, duration: float):
+                      result: ReviewResult, duration: float,
+                      cache_hit: bool = False):
         """
         Sistema de auditabilidade (FASE 6)
         Registra decisões e resultados para rastreabilidade
@@ -265,6 +1086,9 @@ class ReviewEngine:
             "confidence_level": result.confidence_level,
             "duration_seconds": duration,
             "plugin_used": result.language,
+            "cache_hit": cache_hit,
+            "analysis_path": result.analysis_path,
+            "gate_reason": result.gate_reason,
             "version": "2.0.0"
         }
         
@@ -292,3 +1116,37 @@ class ReviewEngine:
                 json.dump(self.audit_log, f, indent=2, ensure_ascii=False)
         
         return self.audit_log
+
+
+def _check_mode(mode: str):
+    if mode not in REVIEW_MODES:
+        raise ValueError(f"Modo de revisão inválido: {mode!r} (use {', '.join(REVIEW_MODES)})")
+
+
+def _shape_result(result: ReviewResult, code: str, mode: str):
+    """
+    Ajusta a saída ao modo: issues descarta o código otimizado; patch
+    garante o diff do código analisado para o optimized_code (ex.: código
+    otimizado vindo do plugin ou de chunks concatenados)
+    """
+    result.mode = mode
+    if mode == "issues":
+        result.optimized_code = None
+        result.patch = None
+    elif mode == "patch":
+        if result.optimized_code and result.optimized_code != code:
+            if result.patch is None:
+                result.patch = make_patch(code, result.optimized_code)
+        else:
+            result.patch = None
+    else:
+        result.patch = None
+
+
+def _combined_path(paths) -> Optional[str]:
+    """Caminho de um resultado montado de vários trechos (chunks/regiões)"""
+    paths = set(paths)
+    for path in ("ai", "ai_failed", "similar", "static", "cache"):
+        if path in paths:
+            return path
+    return None
@@ -0,0 +1,55 @@
+"""
+Line Index - Mapeamento offset → linha/coluna
+Construído uma vez por análise; cada consulta é um bisect O(log n)
+"""
+import re
+from bisect import bisect_right
+from typing import List, Tuple
+
+
+_NEWLINE = re.compile("\n")
+
+
+class LineIndex:
+    """
+    Índice dos offsets de início de cada linha do código
+
+    Linhas e colunas são 1-based (como em editores e comentários de PR).
+    Apenas '\\n' separa linhas; '\\r' de arquivos CRLF fica no fim da linha
+    e é removido nos trechos retornados.
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self._starts: List[int] = [0]
+        self._starts.extend(match.end() for match in _NEWLINE.finditer(code))
+
+    @property
+    def line_count(self) -> int:
+        return len(self._starts)
+
+    def line_of(self, offset: int) -> int:
+        """Linha (1-based) que contém o offset"""
+        return bisect_right(self._starts, offset)
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """(linha, coluna) 1-based do offset"""
+        line = bisect_right(self._starts, offset)
+        return line, offset - self._starts[line - 1] + 1
+
+    def line_start(self, line: int) -> int:
+        """Offset do primeiro caractere da linha"""
+        return self._starts[line - 1]
+
+    def line_text(self, line: int) -> str:
+        """Conteúdo da linha sem o terminador"""
+        start = self._starts[line - 1]
+        end = self._starts[line] - 1 if line < len(self._starts) else len(self.code)
+        return self.code[start:end].rstrip("\r")
+
+    def excerpt(self, start: int, end: int = None, max_lines: int = 5) -> str:
+        """Linhas completas que cobrem o intervalo [start, end), limitado a max_lines"""
+        first = self.line_of(start)
+        last = self.line_of(max(start, (end if end is not None else start + 1) - 1))
+        last = min(last, first + max_lines - 1)
+        return "\n".join(self.line_text(line) for line in range(first, last + 1))
@@ -3,8 +3,11 @@ Detector Refinado v2 - FASE 1
 Sistema aprimorado de detecção automática de linguagens
 """
 import re
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, List, Tuple
 from review_engine.core.dto import DetectionResult
+from review_engine.detectors.multi_pattern import MultiPatternMatcher
+from review_engine.detectors.token_model import TokenModel
+from review_engine.plugins.rule_engine import RuleEngine, RulePattern
 
 
 class LanguageDetector:
@@ -38,6 +41,13 @@ class LanguageDetector:
         "terraform": [".tf", ".tfvars"]
     }
     
+    # Sufixo listado em mais de uma linguagem: vencedora explícita
+    # (sem entrada aqui, vale a primeira linguagem em EXTENSIONS)
+    EXTENSION_PRECEDENCE = {
+        ".ts": "typescript",   # ".component.ts" (mais longo) continua Angular
+        ".tsx": "react",       # TSX é JSX: componentes React
+    }
+    
     # Palavras-chave reservadas por linguagem
     KEYWORDS = {
         "python": ["def ", "class ", "import ", "from ", "elif ", "with ", "__init__"],
@@ -124,15 +134,118 @@ class LanguageDetector:
         ]
     }
     
-    def __init__(self):
+    # Literal obrigatório (minúsculo) de cada padrão sintático: com IGNORECASE
+    # o re não acelera a busca pelo prefixo, então o pré-filtro evita varrer
+    # o código inteiro com regex que não tem como casar
+    SYNTAX_HINTS = {
+        r'^\s*def\s+\w+\s*\(': ("def",),
+        r'^\s*class\s+\w+.*:': ("class",),
+        r'^\s*@\w+': ("@",),
+        r'^\s*function\s+\w+\s*\(': ("function",),
+        r'=>\s*{': ("=>",),
+        r'console\.(log|error|warn)': ("console.",),
+        r'export\s+(default|const)': ("export",),
+        r'public\s+class\s+\w+': ("public",),
+        r'public\s+static\s+void\s+main': ("void",),
+        r'System\.out\.println': ("system.out.println",),
+        r'^\s*SELECT\s+': ("select",),
+        r'^\s*INSERT\s+INTO': ("insert",),
+        r'\bJOIN\b': ("join",),
+        r'\bWHERE\b': ("where",),
+        r'func\s+\w+\(': ("func",),
+        r'package\s+\w+': ("package",),
+        r':=\s*': (":=",),
+        r'fn\s+\w+\(': ("fn",),
+        r'let\s+mut\s+': ("mut",),
+        r'impl\s+\w+': ("impl",),
+        r'fun\s+\w+\(': ("fun",),
+        r'data\s+class\s+': ("data",),
+        r'val\s+\w+\s*=': ("val",),
+        r'import\s+Foundation': ("foundation",),
+        r'var\s+\w+:\s*\w+': ("var",),
+        r'#!/bin/(ba)?sh': ("#!/bin/",),
+        r'if\s+\[\s+': ("[",),
+        r'\$\w+': ("$",),
+        r'^---': ("---",),
+        r'^FROM\s+': ("from",),
+        r'^RUN\s+': ("run",),
+        r'^COPY\s+': ("copy",),
+        r'resource\s+"[^"]+"\s+"[^"]+"': ("resource",),
+        r'variable\s+"[^"]+"': ("variable",),
+        r'provider\s+"[^"]+"': ("provider",),
+    }
+    
+    # Confiança máxima (90) com 4 palavras-chave / 2 padrões sintáticos
+    KEYWORD_CAP_MATCHES = 4
+    SYNTAX_CAP_MATCHES = 2
+    
+    # Detecção limitada (detect_bounded): janela inicial, orçamento total e
+    # vantagem mínima (em palavras-chave) para encerrar a leitura antes
+    DEFAULT_PREFIX_BYTES = 4096
+    DEFAULT_MAX_BYTES = 65536
+    DECISIVE_MARGIN = 2
+    
+    # Classificador de tokens (token_model.py): trecho inicial avaliado,
+    # tokens conhecidos mínimos e vantagem mínima (nats) sobre a segunda
+    # linguagem para decidir antes das heurísticas
+    MODEL_MAX_CHARS = 16384
+    MODEL_MIN_TOKENS = 8
+    MODEL_MIN_MARGIN = 3.0
+    
+    def __init__(self, use_model: bool = True):
         self.confidence_threshold = 50  # Mínimo para não exigir fallback manual
+        self.use_model = use_model
+    
+    @classmethod
+    def extension_index(cls) -> Tuple[Dict[str, str], List[int]]:
+        """
+        Índice sufixo (minúsculo) → linguagem, montado uma vez por classe,
+        e os tamanhos de sufixo existentes, do maior para o menor
+        """
+        index = cls.__dict__.get("_extension_index")
+        if index is None:
+            suffixes: Dict[str, str] = {}
+            for language, extensions in cls.EXTENSIONS.items():
+                for extension in extensions:
+                    suffix = extension.lower()
+                    winner = cls.EXTENSION_PRECEDENCE.get(suffix)
+                    if suffix not in suffixes or language == winner:
+                        suffixes[suffix] = language
+            lengths = sorted({len(suffix) for suffix in suffixes}, reverse=True)
+            index = (suffixes, lengths)
+            cls._extension_index = index
+        return index
+    
+    @classmethod
+    def compile_patterns(cls) -> Tuple[MultiPatternMatcher, RuleEngine]:
+        """
+        Monta (uma vez por classe) o matcher das palavras-chave de todas as
+        linguagens e o RuleEngine dos padrões sintáticos ("linguagem:índice")
+        """
+        compiled = cls.__dict__.get("_compiled_patterns")
+        if compiled is None:
+            matcher = MultiPatternMatcher(
+                keyword for keywords in cls.KEYWORDS.values() for keyword in keywords
+            )
+            syntax = RuleEngine({
+                f"{language}:{index}": RulePattern(
+                    pattern, re.MULTILINE | re.IGNORECASE,
+                    hints=cls.SYNTAX_HINTS.get(pattern, ())
+                )
+                for language, patterns in cls.SYNTAX_PATTERNS.items()
+                for index, pattern in enumerate(patterns)
+            })
+            compiled = (matcher, syntax)
+            cls._compiled_patterns = compiled
+        return compiled
     
     def detect(self, code: str, filename: Optional[str] = None) -> DetectionResult:
         """
         Detecção multi-camadas com nível de confiança
         1. Por extensão (95% confiança)
-        2. Por palavras-chave (70% confiança)
-        3. Por padrões sintáticos (80% confiança)
+        2. Por classificador de tokens (75-90%, conforme a margem)
+        3. Por palavras-chave (70% confiança)
+        4. Por padrões sintáticos (80% confiança)
         """
         # Camada 1: Extensão de arquivo
         if filename:
@@ -140,14 +253,122 @@ class LanguageDetector:
             if ext_result:
                 return ext_result
         
-        # Camada 2: Palavras-chave
+        # Camada 2: Classificador estatístico
+        model_result = self._detect_by_model(code)
+        if model_result:
+            return model_result
+        
+        # Camada 3: Palavras-chave
         keyword_result = self._detect_by_keywords(code)
         if keyword_result and keyword_result.confidence >= 70:
+            keyword_result.bytes_inspected = _utf8_len(code)
             return keyword_result
         
-        # Camada 3: Padrões sintáticos
+        # Camada 4: Padrões sintáticos
+        return self._detect_by_syntax_or_fallback(code, _utf8_len(code))
+    
+    def detect_bounded(self, code: str, filename: Optional[str] = None,
+                       prefix_bytes: int = DEFAULT_PREFIX_BYTES,
+                       max_bytes: int = DEFAULT_MAX_BYTES) -> DetectionResult:
+        """
+        Detecção lendo apenas parte do código (colagens grandes, /detect)
+        
+        Lê janelas crescentes a partir do início (prefix_bytes, 4x, 16x...)
+        até max_bytes; acima disso, o restante do orçamento vai para amostras
+        espaçadas ao longo do arquivo. Para assim que uma linguagem atinge a
+        confiança máxima com folga (DECISIVE_MARGIN) sobre as demais.
+        
+        As janelas terminam em fim de linha, então nenhuma palavra-chave é
+        cortada: código até max_bytes sem decisão antecipada tem exatamente
+        o mesmo resultado de detect(). Linhas muito longas (código minificado)
+        são cortadas no meio para respeitar o orçamento.
+        """
+        if filename:
+            ext_result = self._detect_by_extension(filename)
+            if ext_result:
+                return ext_result
+        
+        model_result = self._detect_by_model(code, max_bytes)
+        if model_result:
+            return model_result
+        
+        matcher, _ = self.compile_patterns()
+        present = set()
+        segments = []
+        inspected = 0
+        for start, end in self._bounded_windows(code, prefix_bytes, max_bytes):
+            segment = code[start:end]
+            segments.append(segment)
+            inspected += _utf8_len(segment)
+            present |= matcher.find(segment)
+            
+            counts = self._keyword_counts(present)
+            if self._is_decisive(counts):
+                result = self._keyword_result(counts)
+                result.bytes_inspected = inspected
+                return result
+        
+        keyword_result = self._keyword_result(self._keyword_counts(present))
+        if keyword_result and keyword_result.confidence >= 70:
+            keyword_result.bytes_inspected = inspected
+            return keyword_result
+        
+        sample = segments[0] if len(segments) == 1 else "\n".join(segments)
+        return self._detect_by_syntax_or_fallback(sample, inspected)
+    
+    def _bounded_windows(self, code: str, prefix_bytes: int,
+                         max_bytes: int) -> Iterator[Tuple[int, int]]:
+        """
+        Intervalos [início, fim) a ler, sem sobreposição e em fronteira de linha
+        Nenhum intervalo passa do orçamento: max_bytes em bytes UTF-8 no total
+        """
+        # Fim (em caracteres) dos primeiros max_bytes bytes
+        budget = _char_limit(code, 0, max_bytes)
+        
+        # Prefixos crescentes até o orçamento (ou o código inteiro)
+        position = 0
+        window = max(1, prefix_bytes)
+        while position < budget:
+            end = _line_end(code, min(position + window, budget), budget)
+            yield position, end
+            position = end
+            window *= 4
+        
+        # Código maior que o orçamento: amostras espaçadas no restante
+        if position >= len(code):
+            return
+        remaining = max_bytes - _utf8_len(code[:position])
+        if remaining <= 0:
+            return
+        
+        sample_size = max(1, prefix_bytes)
+        count = max(1, remaining // sample_size)
+        stride = (len(code) - position) // count
+        for index in range(count):
+            nominal = max(position + index * stride + stride - sample_size, position)
+            start = _line_end(code, nominal, min(len(code), nominal + sample_size))
+            limit = _char_limit(code, start, remaining)
+            end = _line_end(code, min(start + sample_size, limit), limit)
+            if start >= end:
+                continue
+            yield start, end
+            position = end
+            remaining -= _utf8_len(code[start:end])
+            if remaining <= 0:
+                return
+    
+    def _is_decisive(self, counts: Dict[str, int]) -> bool:
+        """Uma linguagem na confiança máxima e todas as outras bem atrás"""
+        ranked = sorted(counts.values(), reverse=True)
+        if not ranked or ranked[0] < self.KEYWORD_CAP_MATCHES:
+            return False
+        runner_up = ranked[1] if len(ranked) > 1 else 0
+        return runner_up <= self.KEYWORD_CAP_MATCHES - self.DECISIVE_MARGIN
+    
+    def _detect_by_syntax_or_fallback(self, code: str, inspected: int) -> DetectionResult:
         syntax_result = self._detect_by_syntax(code)
         if syntax_result:
+            syntax_result.bytes_inspected = inspected
             return syntax_result
         
         # Fallback: Baixa confiança
@@ -155,37 +376,108 @@ class LanguageDetector:
             language="auto",
             confidence=0,
             detected_by="none",
-            fallback_required=True
+            fallback_required=True,
+            bytes_inspected=inspected
         )
     
     def _detect_by_extension(self, filename: str) -> Optional[DetectionResult]:
-        """Detecção por extensão de arquivo"""
-        filename_lower = filename.lower()
-        
-        for language, extensions in self.EXTENSIONS.items():
-            for ext in extensions:
-                if filename_lower.endswith(ext.lower()) or filename_lower == ext.lower():
-                    return DetectionResult(
-                        language=language,
-                        confidence=95,
-                        detected_by="extension"
-                    )
+        """
+        Detecção por extensão de arquivo
+        O sufixo mais longo vence ("app.component.ts" → angular, não
+        typescript); nomes inteiros como "Dockerfile" também são sufixos
+        """
+        language = self._language_for_filename(filename)
+        if language is None:
+            return None
+        return DetectionResult(
+            language=language,
+            confidence=95,
+            detected_by="extension",
+            bytes_inspected=0
+        )
+    
+    def detect_many(self, filenames: List[str]) -> List[Optional[DetectionResult]]:
+        """
+        Detecção por extensão em lote (arquivos de um PR, varredura de repositório)
+        Apenas o nome é usado; None quando a extensão não é conhecida
+        """
+        suffixes, lengths = self.extension_index()
+        results: List[Optional[DetectionResult]] = []
+        for filename in filenames:
+            language = self._language_for_filename(filename, suffixes, lengths)
+            results.append(DetectionResult(
+                language=language,
+                confidence=95,
+                detected_by="extension",
+                bytes_inspected=0
+            ) if language else None)
+        return results
+    
+    def _language_for_filename(self, filename: str,
+                               suffixes: Optional[Dict[str, str]] = None,
+                               lengths: Optional[List[int]] = None) -> Optional[str]:
+        if suffixes is None:
+            suffixes, lengths = self.extension_index()
+        name = filename.lower()
+        for length in lengths:
+            if length <= len(name):
+                language = suffixes.get(name[-length:])
+                if language is not None:
+                    return language
         return None
     
-    def _detect_by_keywords(self, code: str) -> Optional[DetectionResult]:
-        """Detecção por palavras-chave"""
-        scores = {}
+    def _detect_by_model(self, code: str,
+                         max_bytes: Optional[int] = None) -> Optional[DetectionResult]:
+        """
+        Detecção pelo classificador de tokens sobre o início do código
+        Só decide com margem clara sobre a segunda linguagem; caso contrário
+        (ou sem modelo) as heurísticas seguem como antes
+        """
+        if not self.use_model:
+            return None
+        model = TokenModel.default()
+        if model is None:
+            return None
         
+        limit = self.MODEL_MAX_CHARS
+        if max_bytes is not None:
+            # Orçamento em bytes UTF-8, não caracteres
+            limit = min(limit, _char_limit(code, 0, max_bytes))
+        sample = code[:limit]
+        result = model.classify(sample, self.MODEL_MIN_TOKENS)
+        if result is None:
+            return None
+        language, margin, _ = result
+        if margin < self.MODEL_MIN_MARGIN:
+            return None
+        return DetectionResult(
+            language=language,
+            confidence=min(75 + int(margin - self.MODEL_MIN_MARGIN), 90),
+            detected_by="model",
+            bytes_inspected=_utf8_len(sample)
+        )
+    
+    def _detect_by_keywords(self, code: str) -> Optional[DetectionResult]:
+        """
+        Detecção por palavras-chave
+        Uma única busca multi-padrão no código; a pontuação de cada
+        linguagem sai do conjunto de palavras encontradas
+        """
+        matcher, _ = self.compile_patterns()
+        return self._keyword_result(self._keyword_counts(matcher.find(code)))
+    
+    def _keyword_counts(self, present: set) -> Dict[str, int]:
+        """Palavras-chave encontradas por linguagem (apenas linguagens com alguma)"""
+        counts = {}
         for language, keywords in self.KEYWORDS.items():
-            matches = 0
-            for keyword in keywords:
-                if keyword in code:
-                    matches += 1
-            
+            matches = sum(1 for keyword in keywords if keyword in present)
             if matches > 0:
-                # Confiança proporcional ao número de matches
-                confidence = min(70 + (matches * 5), 90)
-                scores[language] = confidence
+                counts[language] = matches
+        return counts
+    
+    def _keyword_result(self, counts: Dict[str, int]) -> Optional[DetectionResult]:
+        # Confiança proporcional ao número de matches
+        scores = {language: min(70 + (matches * 5), 90) for language, matches in counts.items()}
         
         if not scores:
             return None
@@ -199,18 +491,28 @@ class LanguageDetector:
         )
     
     def _detect_by_syntax(self, code: str) -> Optional[DetectionResult]:
-        """Detecção por padrões regex"""
+        """
+        Detecção por padrões regex (pré-compilados)
+        Empates ficam com a primeira linguagem, então a primeira a atingir a
+        confiança máxima já é a resposta e as demais não são avaliadas
+        """
+        _, syntax = self.compile_patterns()
+        rules = syntax.scan(code)
         scores = {}
         
         for language, patterns in self.SYNTAX_PATTERNS.items():
             matches = 0
-            for pattern in patterns:
-                if re.search(pattern, code, re.MULTILINE | re.IGNORECASE):
+            for index in range(len(patterns)):
+                if rules.found(f"{language}:{index}"):
                     matches += 1
+                    if matches >= self.SYNTAX_CAP_MATCHES:
+                        break
             
             if matches > 0:
                 confidence = min(70 + (matches * 10), 90)
                 scores[language] = confidence
+                if matches >= self.SYNTAX_CAP_MATCHES:
+                    break
         
         if not scores:
             return None
@@ -225,3 +527,43 @@ class LanguageDetector:
     def get_supported_languages(self) -> List[str]:
         """Retorna todas as linguagens suportadas"""
         return list(set(self.EXTENSIONS.keys()))
+
+
+def _utf8_len(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+
+
+def _char_limit(code: str, start: int, max_bytes: int) -> int:
+    """Maior fim tal que code[start:fim] cabe em max_bytes bytes UTF-8"""
+    chunk = code[start:start + max(0, max_bytes)]
+    if _utf8_len(chunk) <= max_bytes:
+        return start + len(chunk)
+    # Caracteres multibyte: busca binária no tamanho do trecho
+    low, high = 0, len(chunk)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _utf8_len(chunk[:middle]) <= max_bytes:
+            low = middle
+        else:
+            high = middle - 1
+    return start + low
+
+
+def _line_end(code: str, offset: int, limit: int) -> int:
+    """
+    Primeira fronteira de linha em [offset, limit); sem quebra de linha
+    nesse trecho, corta no próprio offset (nunca passa de limit)
+    """
+    if offset <= 0:
+        return 0
+    if offset >= len(code) or code[offset - 1] == "\n":
+        return min(offset, len(code))
+    newline = code.find("\n", offset, limit)
+    if newline == -1:
+        return offset
+    return newline + 1
+
+
+# Índices montados no carregamento do módulo (fora do caminho da requisição)
+LanguageDetector.extension_index()
+LanguageDetector.compile_patterns()
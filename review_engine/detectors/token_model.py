@@ -0,0 +1,108 @@
+"""
+Classificador estatístico de linguagem - FASE 1
+Naive Bayes multinomial (contagens binarizadas) sobre tokens de código,
+com pesos treinados offline (train_token_model.py, na raiz) a partir do corpus
+em detectors/corpus/ e distribuídos como arrays int16 compactos
+"""
+import base64
+import json
+import logging
+import math
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Identificadores/palavras reservadas e sequências curtas de símbolos
+# ("=>", ":=", "->", "<?", "${"...), com maiúsculas preservadas (SELECT ≠ select)
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[^\sA-Za-z0-9_]{1,2}")
+
+MODEL_PATH = Path(__file__).with_name("token_model.json")
+MODEL_FORMAT = 1
+
+
+def tokenize(code: str) -> List[str]:
+    """Tokens do código na ordem em que aparecem"""
+    return TOKEN_PATTERN.findall(code)
+
+
+class TokenModel:
+    """
+    Pesos log P(token | linguagem) quantizados (escala fixa), um array por
+    linguagem indexado pela posição do token no vocabulário
+    """
+
+    def __init__(self, languages: List[str], vocabulary: List[str],
+                 weights: Dict[str, array], scale: int):
+        self.languages = languages
+        self.vocabulary = {token: index for index, token in enumerate(vocabulary)}
+        self.scale = scale
+        self._rows = [(language, weights[language]) for language in languages]
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> "TokenModel":
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if data.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Formato de modelo não suportado: {data.get('format')}")
+
+        weights = {}
+        for language in data["languages"]:
+            row = array("h")
+            row.frombytes(base64.b64decode(data["weights"][language]))
+            if sys.byteorder == "big":
+                row.byteswap()  # gravado em little-endian
+            weights[language] = row
+        return cls(data["languages"], data["vocabulary"], weights, data["scale"])
+
+    @classmethod
+    def default(cls) -> Optional["TokenModel"]:
+        """
+        Modelo distribuído com o pacote, carregado uma vez por classe no
+        primeiro uso; None se o arquivo estiver ausente ou inválido
+        """
+        if "_default" not in cls.__dict__:
+            try:
+                model = cls.load()
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Modelo de tokens indisponível: {e}")
+                model = None
+            cls._default = model
+        return cls._default
+
+    def scores(self, code: str) -> Dict[str, float]:
+        """
+        Log-verossimilhança (em nats) de cada linguagem para os tokens
+        distintos do código; tokens fora do vocabulário são ignorados
+        """
+        indices = self._indices(code)
+        if not indices:
+            return {}
+        scale = self.scale
+        return {
+            language: sum(map(row.__getitem__, indices)) / scale
+            for language, row in self._rows
+        }
+
+    def classify(self, code: str, min_tokens: int = 1) -> Optional[Tuple[str, float, int]]:
+        """
+        (linguagem, margem em nats sobre a segunda colocada, tokens usados)
+        ou None com menos de min_tokens tokens conhecidos
+        """
+        indices = self._indices(code)
+        if len(indices) < max(1, min_tokens):
+            return None
+        ranked = sorted(
+            ((sum(map(row.__getitem__, indices)), language) for language, row in self._rows),
+            reverse=True
+        )
+        best_score, best_language = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else -math.inf
+        return best_language, (best_score - runner_up) / self.scale, len(indices)
+
+    def _indices(self, code: str) -> List[int]:
+        vocabulary = self.vocabulary
+        return [vocabulary[token] for token in set(tokenize(code)) if token in vocabulary]
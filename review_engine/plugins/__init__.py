@@ -1,4 +1,7 @@
 """Plugins module initialization"""
 from .base_plugin import BasePlugin, UniversalPlugin
+from .rule_engine import RuleEngine, RulePattern, RuleMatches
+from .registry import PluginRegistry, BUILTIN_PLUGINS, ENTRY_POINT_GROUP
 
-__all__ = ['BasePlugin', 'UniversalPlugin']
+__all__ = ['BasePlugin', 'UniversalPlugin', 'RuleEngine', 'RulePattern', 'RuleMatches',
+           'PluginRegistry', 'BUILTIN_PLUGINS', 'ENTRY_POINT_GROUP']
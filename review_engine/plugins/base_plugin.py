@@ -3,13 +3,25 @@ Base Plugin Interface - FASE 2
 Define o contrato que todos os plugins devem seguir
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from review_engine.core.dto import ReviewResult, Issue, Metrics
+from typing import List, Dict, Optional, Tuple
+from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
+from .rule_engine import RuleEngine, RuleMatches, RulePattern
 
 
 class BasePlugin(ABC):
     """Interface abstrata para plugins de análise de código"""
     
+    # Regras regex do plugin: {"RULE_ID": RulePattern(...)}
+    # Compiladas uma única vez por classe (ver compile_rules)
+    PATTERNS: Dict[str, RulePattern] = {}
+    
+    # Literais que localizam regras detectadas sem regex: {"RULE_ID": ("eval(",)}
+    ANCHORS: Dict[str, Tuple[str, ...]] = {}
+    
+    # Regras que julgam o arquivo inteiro (ex.: "falta set -e"); não valem
+    # para um trecho isolado e são descartadas no review de diff
+    FILE_SCOPE_RULES: Tuple[str, ...] = ()
+    
     def __init__(self):
         self.name = self.__class__.__name__
         self.version = "1.0.0"
@@ -46,6 +58,38 @@ class BasePlugin(ABC):
         """
         pass
     
+    @classmethod
+    def compile_rules(cls) -> RuleEngine:
+        """Compila PATTERNS da classe (uma vez) e retorna o RuleEngine"""
+        engine = cls.__dict__.get("_rule_engine")
+        if engine is None:
+            engine = RuleEngine(cls.PATTERNS, cls.ANCHORS)
+            cls._rule_engine = engine
+        return engine
+    
+    def scan(self, code: str) -> RuleMatches:
+        """Avalia as regras compiladas do plugin sobre o código"""
+        return self.compile_rules().scan(code)
+    
+    def locate_issues(self, issues: List[Issue], rules: RuleMatches) -> List[Issue]:
+        """
+        Preenche line_number/column_number/original_code das issues
+        Issues sem ocorrência localizável (ex.: "falta set -e") apontam
+        para a linha 1, pois se referem ao arquivo inteiro
+        """
+        for issue in issues:
+            if issue.line_number is not None or not issue.rule_id:
+                continue
+            location = rules.locate(issue.rule_id)
+            if location is None:
+                location = (1, 1, rules.lines.line_text(1))
+            line, column, excerpt = location
+            issue.line_number = line
+            issue.column_number = column
+            if issue.original_code is None:
+                issue.original_code = excerpt
+        return issues
+    
     def calculate_quality_score(self, issues: List[Issue]) -> int:
         """
         Calcula score de qualidade baseado nos issues encontrados
@@ -85,6 +129,10 @@ class UniversalPlugin(BasePlugin):
     - Duplicação
     """
     
+    PATTERNS = {
+        "UNIVERSAL_003": RulePattern(r'\b[a-z]\b', find_all=True)
+    }
+    
     def get_supported_languages(self) -> List[str]:
         return ["*"]  # Aplica-se a todas
     
@@ -122,17 +170,18 @@ class UniversalPlugin(BasePlugin):
         
         # Implementação simplificada - será expandida
         # Análise de nomes curtos (< 2 caracteres)
-        import re
-        short_vars = re.findall(r'\b[a-z]\b', code)
-        if len(short_vars) > 3:
+        rules = self.scan(code)
+        short_vars = rules.count("UNIVERSAL_003")
+        if short_vars > 3:
             issues.append(Issue(
                 title="Variáveis com nomes muito curtos",
-                description=f"Encontradas {len(short_vars)} variáveis com apenas 1 caractere",
-                severity="low",
+                description=f"Encontradas {short_vars} variáveis com apenas 1 caractere",
+                severity=SeverityLevel.LOW,
                 impact="Dificulta legibilidade e manutenção",
                 rule_id="UNIVERSAL_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         return ReviewResult(
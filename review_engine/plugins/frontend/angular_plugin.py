@@ -3,15 +3,26 @@ Angular Plugin - FASE 3
 Análise específica para Angular
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class AngularPlugin(BasePlugin):
     """Plugin para análise de código Angular"""
     
+    PATTERNS = {
+        "NG_003": RulePattern(r'\{\{.*?\(.*?\).*?\}\}')
+    }
+    
+    ANCHORS = {
+        "NG_001": (".subscribe(",),
+        "NG_002": ("@Component",)
+    }
+    
+    FILE_SCOPE_RULES = ("NG_001", "NG_002")
+    
     def get_supported_languages(self) -> List[str]:
         return ["angular"]
     
@@ -42,6 +53,7 @@ class AngularPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # NG_001: Subscription sem unsubscribe
         if '.subscribe(' in code and 'unsubscribe' not in code and 'takeUntil' not in code:
@@ -51,7 +63,8 @@ class AngularPlugin(BasePlugin):
                 severity=SeverityLevel.HIGH,
                 category="memory",
                 impact="Memory leak em componente",
-                recommendation="Use takeUntil() ou async pipe"
+                recommendation="Use takeUntil() ou async pipe",
+                rule_id="NG_001"
             ))
         
         # NG_002: ChangeDetectionStrategy
@@ -62,20 +75,23 @@ class AngularPlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="performance",
                 impact="Change detection desnecessário",
-                recommendation="Adicionar changeDetection: ChangeDetectionStrategy.OnPush"
+                recommendation="Adicionar changeDetection: ChangeDetectionStrategy.OnPush",
+                rule_id="NG_002"
             ))
         
         # NG_003: Função no template
-        if re.search(r'\{\{.*?\(.*?\).*?\}\}', code):
+        if rules.found("NG_003"):
             issues.append(Issue(
                 title="Função chamada no template",
                 description=self.get_rules()["NG_003"]["description"],
                 severity=SeverityLevel.MEDIUM,
                 category="performance",
                 impact="Re-execução a cada change detection",
-                recommendation="Usar pipe ou computed property"
+                recommendation="Usar pipe ou computed property",
+                rule_id="NG_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
@@ -3,15 +3,29 @@ Svelte Plugin - FASE 3
 Análise específica para Svelte
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class SveltePlugin(BasePlugin):
     """Plugin para análise de código Svelte"""
     
+    PATTERNS = {
+        "SVELTE_001": RulePattern(
+            r'\w+\.push\(|\w+\.pop\(|\w+\[\w+\]\s*=(?!\s*\w+\s*=)',
+            hints=(".push(", ".pop(", "]")
+        )
+    }
+    
+    ANCHORS = {
+        "SVELTE_002": (".subscribe(",),
+        "SVELTE_003": ("bind:",)
+    }
+    
+    FILE_SCOPE_RULES = ("SVELTE_002",)
+    
     def get_supported_languages(self) -> List[str]:
         return ["svelte"]
     
@@ -42,16 +56,18 @@ class SveltePlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # SVELTE_001: Reatividade quebrada
-        if re.search(r'\w+\.push\(|\w+\.pop\(|\w+\[\w+\]\s*=(?!\s*\w+\s*=)', code):
+        if rules.found("SVELTE_001"):
             issues.append(Issue(
                 title="Potencial problema de reatividade",
                 description=self.get_rules()["SVELTE_001"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="reactivity",
                 impact="UI não atualiza",
-                recommendation="Reatribuir após mutação: array = array"
+                recommendation="Reatribuir após mutação: array = array",
+                rule_id="SVELTE_001"
             ))
         
         # SVELTE_002: Store sem cleanup
@@ -62,7 +78,8 @@ class SveltePlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="memory",
                 impact="Memory leak possível",
-                recommendation="Use $ syntax ou unsubscribe em onDestroy"
+                recommendation="Use $ syntax ou unsubscribe em onDestroy",
+                rule_id="SVELTE_002"
             ))
         
         # SVELTE_003: bind desnecessário
@@ -74,9 +91,11 @@ class SveltePlugin(BasePlugin):
                 severity=SeverityLevel.LOW,
                 category="best-practice",
                 impact="Complexidade desnecessária",
-                recommendation="Considerar on: para eventos unidirecionais"
+                recommendation="Considerar on: para eventos unidirecionais",
+                rule_id="SVELTE_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
@@ -3,15 +3,21 @@ Vue.js Plugin - FASE 3
 Análise específica para Vue.js
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class VuePlugin(BasePlugin):
     """Plugin para análise de código Vue.js"""
     
+    PATTERNS = {
+        "VUE_001": RulePattern(r'v-for.*v-if|v-if.*v-for', hints=("v-if",)),
+        "VUE_002": RulePattern(r'v-for=(?!.*:key)'),
+        "VUE_003": RulePattern(r'this\.\w+\s*=.*props\.|props\.\w+\s*=', hints=("props.",))
+    }
+    
     def get_supported_languages(self) -> List[str]:
         return ["vue"]
     
@@ -42,40 +48,45 @@ class VuePlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # VUE_001: v-if e v-for juntos
-        if re.search(r'v-for.*v-if|v-if.*v-for', code):
+        if rules.found("VUE_001"):
             issues.append(Issue(
                 title="v-if e v-for no mesmo elemento",
                 description=self.get_rules()["VUE_001"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="performance",
                 impact="Re-renderização desnecessária",
-                recommendation="Mover v-if para elemento wrapper ou usar computed"
+                recommendation="Mover v-if para elemento wrapper ou usar computed",
+                rule_id="VUE_001"
             ))
         
         # VUE_002: v-for sem key
-        if re.search(r'v-for=(?!.*:key)', code):
+        if rules.found("VUE_002"):
             issues.append(Issue(
                 title=":key ausente em v-for",
                 description=self.get_rules()["VUE_002"]["description"],
                 severity=SeverityLevel.MEDIUM,
                 category="best-practice",
                 impact="Problemas de reconciliação DOM",
-                recommendation="Adicionar :key com valor único"
+                recommendation="Adicionar :key com valor único",
+                rule_id="VUE_002"
             ))
         
         # VUE_003: Mutação de prop
-        if re.search(r'this\.\w+\s*=.*props\.|props\.\w+\s*=', code):
+        if rules.found("VUE_003"):
             issues.append(Issue(
                 title="Mutação direta de prop detectada",
                 description=self.get_rules()["VUE_003"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="best-practice",
                 impact="Unidirectional data flow quebrado",
-                recommendation="Emitir evento ou usar computed com setter"
+                recommendation="Emitir evento ou usar computed com setter",
+                rule_id="VUE_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
@@ -6,12 +6,24 @@ from typing import List, Dict
 import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class GoPlugin(BasePlugin):
     """Plugin para análise de código Go"""
     
+    PATTERNS = {
+        "GO_001": RulePattern(r'(?<!if\s)(?<!,\s)err\s*:?=\s*\w+\(.*?\)\s*\n', hints=("err",)),
+        "GO_003": RulePattern(r'for\s+.*?\{[^}]*defer\s+', re.DOTALL, hints=("defer",))
+    }
+    
+    ANCHORS = {
+        "GO_002": ("go func()",)
+    }
+    
+    FILE_SCOPE_RULES = ("GO_002",)
+    
     def get_supported_languages(self) -> List[str]:
         return ["go"]
     
@@ -42,16 +54,18 @@ class GoPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # GO_001: Error não verificado
-        if re.search(r'(?<!if\s)(?<!,\s)err\s*:?=\s*\w+\(.*?\)\s*\n', code):
+        if rules.found("GO_001"):
             issues.append(Issue(
                 title="Error sem verificação detectado",
                 description=self.get_rules()["GO_001"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="error-handling",
                 impact="Pode ocultar falhas críticas",
-                recommendation="Sempre verificar: if err != nil { return err }"
+                recommendation="Sempre verificar: if err != nil { return err }",
+                rule_id="GO_001"
             ))
         
         # GO_002: Goroutine leak
@@ -62,20 +76,23 @@ class GoPlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="concurrency",
                 impact="Pode causar goroutine leak",
-                recommendation="Use context.Context para cancelamento"
+                recommendation="Use context.Context para cancelamento",
+                rule_id="GO_002"
             ))
         
         # GO_003: Defer em loop
-        if re.search(r'for\s+.*?\{[^}]*defer\s+', code, re.DOTALL):
+        if rules.found("GO_003"):
             issues.append(Issue(
                 title="Defer dentro de loop",
                 description=self.get_rules()["GO_003"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="memory",
                 impact="Memory leak até fim do loop",
-                recommendation="Extrair lógica para função separada"
+                recommendation="Extrair lógica para função separada",
+                rule_id="GO_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
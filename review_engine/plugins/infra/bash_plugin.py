@@ -3,15 +3,26 @@ Bash Plugin - FASE 3
 Análise específica para scripts Bash
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class BashPlugin(BasePlugin):
     """Plugin para análise de scripts Bash"""
     
+    PATTERNS = {
+        "BASH_001": RulePattern(r'(?<!")(\$\w+|\$\{\w+\})(?!")', hints=("$",), find_all=True),
+        "BASH_004": RulePattern(r'\|\s*while\s+read', hints=("while",))
+    }
+    
+    ANCHORS = {
+        "BASH_003": ("eval",)
+    }
+    
+    FILE_SCOPE_RULES = ("BASH_002",)
+    
     def get_supported_languages(self) -> List[str]:
         return ["bash", "shell", "sh"]
     
@@ -49,17 +60,19 @@ class BashPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # BASH_001: Variáveis sem aspas
-        unquoted_vars = re.findall(r'(?<!")(\$\w+|\$\{\w+\})(?!")', code)
-        if len(unquoted_vars) > 5:
+        unquoted_vars = rules.count("BASH_001")
+        if unquoted_vars > 5:
             issues.append(Issue(
-                title=f"Variáveis sem aspas ({len(unquoted_vars)}x)",
+                title=f"Variáveis sem aspas ({unquoted_vars}x)",
                 description=self.get_rules()["BASH_001"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="safety",
                 impact="Word splitting pode causar bugs",
-                recommendation='Usar "$VAR" em vez de $VAR'
+                recommendation='Usar "$VAR" em vez de $VAR',
+                rule_id="BASH_001"
             ))
         
         # BASH_002: Sem set -e
@@ -70,7 +83,8 @@ class BashPlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="error-handling",
                 impact="Erros silenciosos",
-                recommendation="Adicionar 'set -euo pipefail' no início"
+                recommendation="Adicionar 'set -euo pipefail' no início",
+                rule_id="BASH_002"
             ))
         
         # BASH_003: eval perigoso
@@ -81,20 +95,23 @@ class BashPlugin(BasePlugin):
                 severity=SeverityLevel.CRITICAL,
                 category="security",
                 impact="Code injection possível",
-                recommendation="Evitar eval ou sanitizar input cuidadosamente"
+                recommendation="Evitar eval ou sanitizar input cuidadosamente",
+                rule_id="BASH_003"
             ))
         
         # BASH_004: Pipe para while
-        if re.search(r'\|\s*while\s+read', code):
+        if rules.found("BASH_004"):
             issues.append(Issue(
                 title="Pipe para while read",
                 description=self.get_rules()["BASH_004"]["description"],
                 severity=SeverityLevel.MEDIUM,
                 category="logic",
                 impact="Variáveis definidas no loop não persistem",
-                recommendation="Usar while read < <(command) ou process substitution"
+                recommendation="Usar while read < <(command) ou process substitution",
+                rule_id="BASH_004"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
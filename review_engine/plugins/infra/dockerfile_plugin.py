@@ -6,12 +6,24 @@ from typing import List, Dict
 import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class DockerfilePlugin(BasePlugin):
     """Plugin para análise de Dockerfiles"""
     
+    PATTERNS = {
+        "DOCKER_001": RulePattern(r'FROM\s+\w+:latest', re.IGNORECASE, hints=("latest",)),
+        "DOCKER_002": RulePattern(r'^RUN\s+', re.MULTILINE, hints=("RUN",), find_all=True)
+    }
+    
+    ANCHORS = {
+        "DOCKER_004": ("CMD", "ENTRYPOINT")
+    }
+    
+    FILE_SCOPE_RULES = ("DOCKER_003", "DOCKER_004")
+    
     def get_supported_languages(self) -> List[str]:
         return ["dockerfile", "docker"]
     
@@ -49,20 +61,22 @@ class DockerfilePlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # DOCKER_001: :latest tag
-        if re.search(r'FROM\s+\w+:latest', code, re.IGNORECASE):
+        if rules.found("DOCKER_001"):
             issues.append(Issue(
                 title="Uso de tag :latest",
                 description=self.get_rules()["DOCKER_001"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="reproducibility",
                 impact="Builds não reproduzíveis",
-                recommendation="Especificar versão exata: FROM node:18.16.0"
+                recommendation="Especificar versão exata: FROM node:18.16.0",
+                rule_id="DOCKER_001"
             ))
         
         # DOCKER_002: Múltiplos RUN
-        run_count = len(re.findall(r'^RUN\s+', code, re.MULTILINE))
+        run_count = rules.count("DOCKER_002")
         if run_count > 3:
             issues.append(Issue(
                 title=f"Múltiplos comandos RUN ({run_count}x)",
@@ -70,7 +84,8 @@ class DockerfilePlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="performance",
                 impact="Imagem maior e build mais lento",
-                recommendation="Combinar RUN com && para reduzir layers"
+                recommendation="Combinar RUN com && para reduzir layers",
+                rule_id="DOCKER_002"
             ))
         
         # DOCKER_003: COPY antes de dependências
@@ -85,7 +100,11 @@ class DockerfilePlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="build-time",
                 impact="Cache invalidado desnecessariamente",
-                recommendation="Copiar package.json primeiro, instalar deps, depois COPY código"
+                recommendation="Copiar package.json primeiro, instalar deps, depois COPY código",
+                line_number=copy_idx + 1,
+                column_number=1,
+                original_code=lines[copy_idx],
+                rule_id="DOCKER_003"
             ))
         
         # DOCKER_004: Sem USER
@@ -96,9 +115,11 @@ class DockerfilePlugin(BasePlugin):
                 severity=SeverityLevel.HIGH,
                 category="security",
                 impact="Risco de segurança",
-                recommendation="Adicionar USER não-root antes de CMD/ENTRYPOINT"
+                recommendation="Adicionar USER não-root antes de CMD/ENTRYPOINT",
+                rule_id="DOCKER_004"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
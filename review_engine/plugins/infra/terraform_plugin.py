@@ -6,12 +6,29 @@ from typing import List, Dict
 import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class TerraformPlugin(BasePlugin):
     """Plugin para análise de código Terraform"""
     
+    PATTERNS = {
+        "TF_002": RulePattern(
+            r'password\s*=\s*["\'][^"\']+["\']|secret\s*=\s*["\'][^"\']+["\']|'
+            r'token\s*=\s*["\'][^"\']+["\']|key\s*=\s*["\'][\w-]{20,}["\']',
+            re.IGNORECASE, hints=("password", "secret", "token", "key")
+        ),
+        "TF_003": RulePattern(r'resource\s+"[^"]+"\s+"[^"]+"', hints=("resource",), find_all=True)
+    }
+    
+    ANCHORS = {
+        "TF_001": ("terraform {",),
+        "TF_004": ("terraform {",)
+    }
+    
+    FILE_SCOPE_RULES = ("TF_001", "TF_003", "TF_004")
+    
     def get_supported_languages(self) -> List[str]:
         return ["terraform", "tf", "hcl"]
     
@@ -49,6 +66,7 @@ class TerraformPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # TF_001: Versão não especificada
         if 'required_version' not in code and 'terraform {' in code:
@@ -58,30 +76,24 @@ class TerraformPlugin(BasePlugin):
                 severity=SeverityLevel.HIGH,
                 category="reproducibility",
                 impact="Incompatibilidades entre ambientes",
-                recommendation="Adicionar required_version = '>= 1.0' no bloco terraform"
+                recommendation="Adicionar required_version = '>= 1.0' no bloco terraform",
+                rule_id="TF_001"
             ))
         
         # TF_002: Secrets hardcoded
-        secret_patterns = [
-            r'password\s*=\s*["\'][^"\']+["\']',
-            r'secret\s*=\s*["\'][^"\']+["\']',
-            r'token\s*=\s*["\'][^"\']+["\']',
-            r'key\s*=\s*["\'][\w-]{20,}["\']'
-        ]
-        for pattern in secret_patterns:
-            if re.search(pattern, code, re.IGNORECASE):
-                issues.append(Issue(
-                    title="Secret hardcoded detectado",
-                    description=self.get_rules()["TF_002"]["description"],
-                    severity=SeverityLevel.CRITICAL,
-                    category="security",
-                    impact="Exposição de credenciais no código",
-                    recommendation="Usar var.senha ou data.aws_secretsmanager_secret"
-                ))
-                break
+        if rules.found("TF_002"):
+            issues.append(Issue(
+                title="Secret hardcoded detectado",
+                description=self.get_rules()["TF_002"]["description"],
+                severity=SeverityLevel.CRITICAL,
+                category="security",
+                impact="Exposição de credenciais no código",
+                recommendation="Usar var.senha ou data.aws_secretsmanager_secret",
+                rule_id="TF_002"
+            ))
         
         # TF_003: Recursos sem tags
-        resources = re.findall(r'resource\s+"[^"]+"\s+"[^"]+"', code)
+        resources = rules.findall("TF_003")
         resources_with_tags = code.count('tags = {')
         if len(resources) > 2 and resources_with_tags < len(resources) // 2:
             issues.append(Issue(
@@ -90,7 +102,8 @@ class TerraformPlugin(BasePlugin):
                 severity=SeverityLevel.LOW,
                 category="maintainability",
                 impact="Dificulta organização e billing",
-                recommendation="Adicionar tags (Environment, Project, Owner) em todos recursos"
+                recommendation="Adicionar tags (Environment, Project, Owner) em todos recursos",
+                rule_id="TF_003"
             ))
         
         # TF_004: Backend não configurado
@@ -101,9 +114,11 @@ class TerraformPlugin(BasePlugin):
                 severity=SeverityLevel.HIGH,
                 category="collaboration",
                 impact="State não compartilhado entre time",
-                recommendation="Configurar backend S3/Azure/GCS no bloco terraform"
+                recommendation="Configurar backend S3/Azure/GCS no bloco terraform",
+                rule_id="TF_004"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
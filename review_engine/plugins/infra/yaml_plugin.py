@@ -6,12 +6,30 @@ from typing import List, Dict
 import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class YAMLPlugin(BasePlugin):
     """Plugin para análise de arquivos YAML"""
     
+    PATTERNS = {
+        "YAML_002": RulePattern(r'^( +)\S', re.MULTILINE, find_all=True),
+        "YAML_003_ANCHOR": RulePattern(r'&(\w+)', hints=("&",), find_all=True),
+        "YAML_003_ALIAS": RulePattern(r'\*(\w+)', hints=("*",), find_all=True),
+        "YAML_004": RulePattern(
+            r'password\s*:\s*["\']?\w+|api[_-]?key\s*:\s*["\']?\w+|'
+            r'secret\s*:\s*["\']?\w+|token\s*:\s*["\']?\w+',
+            re.IGNORECASE, hints=("password", "key", "secret", "token")
+        )
+    }
+    
+    ANCHORS = {
+        "YAML_001": ("\t",)
+    }
+    
+    FILE_SCOPE_RULES = ("YAML_003",)
+    
     def get_supported_languages(self) -> List[str]:
         return ["yaml", "yml"]
     
@@ -49,6 +67,7 @@ class YAMLPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # YAML_001: Tabs
         if '\t' in code:
@@ -58,55 +77,64 @@ class YAMLPlugin(BasePlugin):
                 severity=SeverityLevel.CRITICAL,
                 category="syntax",
                 impact="YAML inválido",
-                recommendation="Substituir todos os tabs por espaços"
+                recommendation="Substituir todos os tabs por espaços",
+                rule_id="YAML_001"
             ))
         
         # YAML_002: Indentação inconsistente
-        indents = re.findall(r'^( +)\S', code, re.MULTILINE)
+        indents = rules.findall("YAML_002")
         indent_sizes = set(len(i) for i in indents)
         if len(indent_sizes) > 1 and not all(i % 2 == 0 for i in indent_sizes):
+            odd_indent = next(m for m in rules.matches("YAML_002") if len(m.group(1)) % 2)
+            line_number, column_number = rules.lines.position(odd_indent.start())
             issues.append(Issue(
                 title="Indentação inconsistente",
                 description=self.get_rules()["YAML_002"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="readability",
                 impact="Dificulta leitura e parsing",
-                recommendation="Usar consistentemente 2 ou 4 espaços"
+                recommendation="Usar consistentemente 2 ou 4 espaços",
+                line_number=line_number,
+                column_number=column_number,
+                original_code=rules.lines.line_text(line_number),
+                rule_id="YAML_002"
             ))
         
         # YAML_003: Anchor não usado
-        anchors = set(re.findall(r'&(\w+)', code))
-        aliases = set(re.findall(r'\*(\w+)', code))
+        anchors = set(rules.findall("YAML_003_ANCHOR"))
+        aliases = set(rules.findall("YAML_003_ALIAS"))
         unused_anchors = anchors - aliases
         if unused_anchors:
+            first_unused = next(
+                m for m in rules.matches("YAML_003_ANCHOR") if m.group(1) in unused_anchors
+            )
+            line_number, column_number = rules.lines.position(first_unused.start())
             issues.append(Issue(
-                title=f"Anchors não utilizados: {', '.join(unused_anchors)}",
+                title=f"Anchors não utilizados: {', '.join(sorted(unused_anchors))}",
                 description=self.get_rules()["YAML_003"]["description"],
                 severity=SeverityLevel.LOW,
                 category="maintainability",
                 impact="Código morto",
-                recommendation="Remover anchors não utilizados"
+                recommendation="Remover anchors não utilizados",
+                line_number=line_number,
+                column_number=column_number,
+                original_code=rules.lines.line_text(line_number),
+                rule_id="YAML_003"
             ))
         
         # YAML_004: Secrets em plaintext
-        secret_patterns = [
-            r'password\s*:\s*["\']?\w+',
-            r'api[_-]?key\s*:\s*["\']?\w+',
-            r'secret\s*:\s*["\']?\w+',
-            r'token\s*:\s*["\']?\w+'
-        ]
-        for pattern in secret_patterns:
-            if re.search(pattern, code, re.IGNORECASE):
-                issues.append(Issue(
-                    title="Possível secret em plaintext",
-                    description=self.get_rules()["YAML_004"]["description"],
-                    severity=SeverityLevel.CRITICAL,
-                    category="security",
-                    impact="Exposição de credenciais",
-                    recommendation="Usar variáveis de ambiente ou secrets manager"
-                ))
-                break
+        if rules.found("YAML_004"):
+            issues.append(Issue(
+                title="Possível secret em plaintext",
+                description=self.get_rules()["YAML_004"]["description"],
+                severity=SeverityLevel.CRITICAL,
+                category="security",
+                impact="Exposição de credenciais",
+                recommendation="Usar variáveis de ambiente ou secrets manager",
+                rule_id="YAML_004"
+            ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
@@ -3,15 +3,19 @@ JavaScript Plugin - FASE 3
 Análise específica para JavaScript/ECMAScript
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel, ImpactLevel
 
 
 class JavaScriptPlugin(BasePlugin):
     """Plugin para análise de código JavaScript"""
     
+    PATTERNS = {
+        "JS_001": RulePattern(r'\bvar\s+\w+', hints=("var",))
+    }
+    
     def __init__(self):
         super().__init__()
         self.name = "JavaScriptPlugin"
@@ -45,9 +49,10 @@ class JavaScriptPlugin(BasePlugin):
     def analyze(self, code: str, language: str) -> ReviewResult:
         """Análise JavaScript"""
         issues = []
+        rules = self.scan(code)
         
         # JS_001: Uso de var
-        if re.search(r'\bvar\s+\w+', code):
+        if rules.found("JS_001"):
             issues.append(Issue(
                 title="Uso de 'var' detectado",
                 description="Usar 'let' ou 'const' (ES6+) melhora escopo e previne bugs",
@@ -56,6 +61,7 @@ class JavaScriptPlugin(BasePlugin):
                 rule_id="JS_001"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         return ReviewResult(
@@ -3,15 +3,27 @@ Kotlin Plugin - FASE 3
 Análise específica para Kotlin
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class KotlinPlugin(BasePlugin):
     """Plugin para análise de código Kotlin"""
     
+    PATTERNS = {
+        "KOTLIN_003": RulePattern(r'data class.*var\s+\w+')
+    }
+    
+    ANCHORS = {
+        "KOTLIN_001": ("!!",),
+        "KOTLIN_002": ("suspend fun",),
+        "KOTLIN_004": (".forEach",)
+    }
+    
+    FILE_SCOPE_RULES = ("KOTLIN_002",)
+    
     def get_supported_languages(self) -> List[str]:
         return ["kotlin"]
     
@@ -49,6 +61,7 @@ class KotlinPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # KOTLIN_001: !! assertion
         not_null_count = code.count('!!')
@@ -59,7 +72,8 @@ class KotlinPlugin(BasePlugin):
                 severity=SeverityLevel.HIGH,
                 category="null-safety",
                 impact="Pode causar crashes em runtime",
-                recommendation="Usar ?.let, ?: ou safe calls"
+                recommendation="Usar ?.let, ?: ou safe calls",
+                rule_id="KOTLIN_001"
             ))
         
         # KOTLIN_002: Suspend sem scope
@@ -70,18 +84,20 @@ class KotlinPlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="concurrency",
                 impact="Lifecycle de coroutine mal gerenciado",
-                recommendation="Usar viewModelScope, lifecycleScope ou CoroutineScope"
+                recommendation="Usar viewModelScope, lifecycleScope ou CoroutineScope",
+                rule_id="KOTLIN_002"
             ))
         
         # KOTLIN_003: Data class mutation
-        if re.search(r'data class.*var\s+\w+', code):
+        if rules.found("KOTLIN_003"):
             issues.append(Issue(
                 title="Data class com propriedades mutáveis",
                 description=self.get_rules()["KOTLIN_003"]["description"],
                 severity=SeverityLevel.LOW,
                 category="immutability",
                 impact="Dificulta rastreamento de mudanças",
-                recommendation="Usar val e método .copy() para mutações"
+                recommendation="Usar val e método .copy() para mutações",
+                rule_id="KOTLIN_003"
             ))
         
         # KOTLIN_004: forEach performance
@@ -92,9 +108,11 @@ class KotlinPlugin(BasePlugin):
                 severity=SeverityLevel.LOW,
                 category="performance",
                 impact="Overhead de lambda",
-                recommendation="Usar for loop clássico para melhor performance"
+                recommendation="Usar for loop clássico para melhor performance",
+                rule_id="KOTLIN_004"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
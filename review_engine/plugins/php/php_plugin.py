@@ -6,12 +6,25 @@ from typing import List, Dict
 import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class PHPPlugin(BasePlugin):
     """Plugin para análise de código PHP"""
     
+    PATTERNS = {
+        "PHP_001": RulePattern(
+            r'\$.*?SELECT.*?\$|mysql_query.*?\$|mysqli_query.*?\$|"SELECT.*?\"\s*\.\s*\$',
+            re.IGNORECASE, hints=("select", "mysql")
+        ),
+        "PHP_003": RulePattern(r'@\s*\w+\s*\(')
+    }
+    
+    ANCHORS = {
+        "PHP_002": ("eval(",)
+    }
+    
     def get_supported_languages(self) -> List[str]:
         return ["php"]
     
@@ -42,25 +55,19 @@ class PHPPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # PHP_001: SQL Injection
-        sql_patterns = [
-            r'\$.*?SELECT.*?\$',
-            r'mysql_query.*?\$',
-            r'mysqli_query.*?\$',
-            r'"SELECT.*?\"\s*\.\s*\$'
-        ]
-        for pattern in sql_patterns:
-            if re.search(pattern, code, re.IGNORECASE):
-                issues.append(Issue(
-                    title="Potencial SQL Injection detectado",
-                    description=self.get_rules()["PHP_001"]["description"],
-                    severity=SeverityLevel.CRITICAL,
-                    category="security",
-                    impact="Vulnerabilidade crítica de segurança",
-                    recommendation="Use prepared statements (PDO ou mysqli)"
-                ))
-                break
+        if rules.found("PHP_001"):
+            issues.append(Issue(
+                title="Potencial SQL Injection detectado",
+                description=self.get_rules()["PHP_001"]["description"],
+                severity=SeverityLevel.CRITICAL,
+                category="security",
+                impact="Vulnerabilidade crítica de segurança",
+                recommendation="Use prepared statements (PDO ou mysqli)",
+                rule_id="PHP_001"
+            ))
         
         # PHP_002: eval()
         if 'eval(' in code:
@@ -70,20 +77,23 @@ class PHPPlugin(BasePlugin):
                 severity=SeverityLevel.CRITICAL,
                 category="security",
                 impact="Execução arbitrária de código",
-                recommendation="Remover eval() e usar alternativas seguras"
+                recommendation="Remover eval() e usar alternativas seguras",
+                rule_id="PHP_002"
             ))
         
         # PHP_003: Error suppression
-        if '@' in code and re.search(r'@\s*\w+\s*\(', code):
+        if rules.found("PHP_003"):
             issues.append(Issue(
                 title="Error suppression (@) encontrado",
                 description=self.get_rules()["PHP_003"]["description"],
                 severity=SeverityLevel.MEDIUM,
                 category="error-handling",
                 impact="Dificulta debugging",
-                recommendation="Remover @ e tratar erros adequadamente"
+                recommendation="Remover @ e tratar erros adequadamente",
+                rule_id="PHP_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
@@ -3,9 +3,9 @@ Python Plugin - Exemplo de Implementação
 FASE 3: Plugin específico com regras customizadas
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel, ImpactLevel
 
 
@@ -15,6 +15,15 @@ class PythonPlugin(BasePlugin):
     Implementa regras específicas da linguagem
     """
     
+    PATTERNS = {
+        "PY_001": RulePattern(r'for\s+\w+\s+in\s+range\s*\(\s*len\s*\(', hints=("range",)),
+        "PY_003": RulePattern(r'for\s+.*:\s*\n\s*\w+\s*\+=\s*["\']', hints=("+=",))
+    }
+    
+    ANCHORS = {
+        "PY_005": ("except Exception:", "except:")
+    }
+    
     def __init__(self):
         super().__init__()
         self.name = "PythonPlugin"
@@ -60,9 +69,10 @@ class PythonPlugin(BasePlugin):
     def analyze(self, code: str, language: str) -> ReviewResult:
         """Análise específica para Python"""
         issues = []
+        rules = self.scan(code)
         
         # PY_001: range(len()) anti-pattern
-        if re.search(r'for\s+\w+\s+in\s+range\s*\(\s*len\s*\(', code):
+        if rules.found("PY_001"):
             issues.append(Issue(
                 title="Uso de range(len()) detectado",
                 description="É mais Pythônico usar enumerate() para iterar com índice",
@@ -72,7 +82,7 @@ class PythonPlugin(BasePlugin):
             ))
         
         # PY_003: String concatenation in loop
-        if re.search(r'for\s+.*:\s*\n\s*\w+\s*\+=\s*["\']', code):
+        if rules.found("PY_003"):
             issues.append(Issue(
                 title="Concatenação de strings em loop",
                 description="Concatenar strings repetidamente é ineficiente",
@@ -91,6 +101,8 @@ class PythonPlugin(BasePlugin):
                 rule_id="PY_005"
             ))
         
+        self.locate_issues(issues, rules)
+        
         # Calcular métricas
         metrics = self._calculate_python_metrics(code, issues)
         
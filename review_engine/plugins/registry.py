@@ -0,0 +1,192 @@
+"""
+Plugin Registry - Carregamento sob demanda dos plugins
+Mapeia linguagem → classe do plugin ("modulo:Classe"); o módulo só é
+importado e o plugin instanciado na primeira análise daquela linguagem
+"""
+import importlib
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from .base_plugin import BasePlugin
+
+
+logger = logging.getLogger(__name__)
+
+
+# Grupo de entry points para plugins de terceiros. No pyproject.toml do pacote:
+#   [project.entry-points."review_engine.plugins"]
+#   elixir = "meu_pacote.elixir_plugin:ElixirPlugin"
+ENTRY_POINT_GROUP = "review_engine.plugins"
+
+# Plugins embutidos: linguagem → "modulo:Classe" (sem importar nada)
+BUILTIN_PLUGINS: Dict[str, str] = {
+    "python": "review_engine.plugins.python.python_plugin:PythonPlugin",
+    "javascript": "review_engine.plugins.javascript.javascript_plugin:JavaScriptPlugin",
+    "typescript": "review_engine.plugins.javascript.javascript_plugin:JavaScriptPlugin",
+    "react": "review_engine.plugins.javascript.javascript_plugin:JavaScriptPlugin",
+    "go": "review_engine.plugins.go.go_plugin:GoPlugin",
+    "rust": "review_engine.plugins.rust.rust_plugin:RustPlugin",
+    "php": "review_engine.plugins.php.php_plugin:PHPPlugin",
+    "ruby": "review_engine.plugins.ruby.ruby_plugin:RubyPlugin",
+    "vue": "review_engine.plugins.frontend.vue_plugin:VuePlugin",
+    "angular": "review_engine.plugins.frontend.angular_plugin:AngularPlugin",
+    "svelte": "review_engine.plugins.frontend.svelte_plugin:SveltePlugin",
+    "kotlin": "review_engine.plugins.kotlin.kotlin_plugin:KotlinPlugin",
+    "swift": "review_engine.plugins.swift.swift_plugin:SwiftPlugin",
+    "bash": "review_engine.plugins.infra.bash_plugin:BashPlugin",
+    "shell": "review_engine.plugins.infra.bash_plugin:BashPlugin",
+    "sh": "review_engine.plugins.infra.bash_plugin:BashPlugin",
+    "yaml": "review_engine.plugins.infra.yaml_plugin:YAMLPlugin",
+    "yml": "review_engine.plugins.infra.yaml_plugin:YAMLPlugin",
+    "dockerfile": "review_engine.plugins.infra.dockerfile_plugin:DockerfilePlugin",
+    "docker": "review_engine.plugins.infra.dockerfile_plugin:DockerfilePlugin",
+    "terraform": "review_engine.plugins.infra.terraform_plugin:TerraformPlugin",
+    "tf": "review_engine.plugins.infra.terraform_plugin:TerraformPlugin",
+    "hcl": "review_engine.plugins.infra.terraform_plugin:TerraformPlugin",
+}
+
+PluginTarget = Union[str, Type[BasePlugin]]
+
+
+class PluginRegistry:
+    """
+    Registro linguagem → plugin com instanciação preguiçosa
+
+    Ordem de precedência: register() explícito > entry points > embutidos.
+    Entry points são lidos uma única vez, na primeira consulta (não no
+    import/construção), para não pesar no cold start.
+    Linguagens que compartilham a mesma classe usam a mesma instância.
+    """
+
+    def __init__(self, builtins: Optional[Dict[str, str]] = None,
+                 discover_entry_points: bool = True):
+        self._targets: Dict[str, PluginTarget] = dict(BUILTIN_PLUGINS if builtins is None else builtins)
+        self._loaded: Dict[str, BasePlugin] = {}
+        self._instances: Dict[PluginTarget, Optional[BasePlugin]] = {}
+        self._pinned: set = set()
+        self._discovered = not discover_entry_points
+        self._lock = threading.RLock()
+
+    def register(self, plugin: BasePlugin) -> List[Tuple[str, Optional[BasePlugin]]]:
+        """
+        Registra uma instância já criada (tem precedência sobre entry points)
+        Retorna (linguagem, plugin carregado anterior) para cada linguagem
+        """
+        plugin.compile_rules()  # Regex compilados no registro, não por análise
+        replaced = []
+        with self._lock:
+            for language in plugin.get_supported_languages():
+                replaced.append((language, self._loaded.get(language)))
+                self._targets[language] = type(plugin)
+                self._loaded[language] = plugin
+                self._pinned.add(language)
+        return replaced
+
+    def register_lazy(self, language: str, target: PluginTarget):
+        """Registra "modulo:Classe" (ou a classe) para instanciar no primeiro uso"""
+        with self._lock:
+            self._targets[language] = target
+            self._loaded.pop(language, None)
+            self._pinned.discard(language)
+
+    def get(self, language: str, default: Optional[BasePlugin] = None) -> Optional[BasePlugin]:
+        """Plugin da linguagem, importando e instanciando se necessário"""
+        plugin = self._loaded.get(language)
+        if plugin is not None:
+            return plugin
+
+        with self._lock:
+            self._discover()
+            plugin = self._loaded.get(language)
+            if plugin is None:
+                target = self._targets.get(language)
+                if target is None:
+                    return default
+                plugin = self._instantiate(target)
+                if plugin is None:
+                    return default
+                self._loaded[language] = plugin
+        return plugin
+
+    def is_loaded(self, language: str) -> bool:
+        return language in self._loaded
+
+    def languages(self) -> List[str]:
+        """Linguagens registradas (sem carregar plugins)"""
+        with self._lock:
+            self._discover()
+            return list(self._targets)
+
+    def keys(self) -> List[str]:
+        """Compatível com o dict anterior (engine.plugins.keys())"""
+        return self.languages()
+
+    def items(self) -> Iterator[Tuple[str, BasePlugin]]:
+        """(linguagem, plugin) de todas as linguagens; carrega os pendentes"""
+        for language in self.languages():
+            plugin = self.get(language)
+            if plugin is not None:
+                yield language, plugin
+
+    def values(self) -> List[BasePlugin]:
+        """Plugins distintos (uma instância por classe)"""
+        unique = {}
+        for _, plugin in self.items():
+            unique[id(plugin)] = plugin
+        return list(unique.values())
+
+    def __contains__(self, language: str) -> bool:
+        return language in self._loaded or language in self.languages()
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def _discover(self):
+        """Lê entry points de plugins instalados (uma vez por registry)"""
+        if self._discovered:
+            return
+        self._discovered = True
+
+        from importlib.metadata import entry_points
+        try:
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except Exception as e:
+            logger.warning(f"Falha ao ler entry points de plugins: {e}")
+            return
+
+        for entry_point in found:
+            language = entry_point.name.lower()
+            if language in self._pinned:
+                continue
+            self._targets[language] = entry_point.value
+            self._loaded.pop(language, None)
+            logger.info(f"Plugin externo {entry_point.value} registrado para {language}")
+
+    def _instantiate(self, target: PluginTarget) -> Optional[BasePlugin]:
+        """Importa a classe e cria a instância (compartilhada entre linguagens)"""
+        if target in self._instances:
+            return self._instances[target]
+
+        plugin = None
+        try:
+            plugin_class = _resolve(target)
+            plugin = plugin_class()
+            plugin.compile_rules()
+            logger.info(f"Plugin {plugin.name} carregado")
+        except ImportError as e:
+            logger.warning(f"Plugin {target} não encontrado: {e}")
+        except Exception as e:
+            logger.error(f"Erro ao carregar plugin {target}: {e}")
+
+        # Falhas também são memorizadas: não repetir o import a cada análise
+        self._instances[target] = plugin
+        return plugin
+
+
+def _resolve(target: PluginTarget) -> Type[BasePlugin]:
+    if not isinstance(target, str):
+        return target
+    module_name, _, class_name = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
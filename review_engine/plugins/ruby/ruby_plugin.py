@@ -6,12 +6,19 @@ from typing import List, Dict
 import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class RubyPlugin(BasePlugin):
     """Plugin para análise de código Ruby"""
     
+    PATTERNS = {
+        "RUBY_001": RulePattern(r'\.each\s+do.*?\.find|\.where', re.DOTALL, hints=(".each", ".where")),
+        "RUBY_002": RulePattern(r'create\(params\[|\bnew\(params\[', hints=("params[",)),
+        "RUBY_003": RulePattern(r'\brescue\s*$', re.MULTILINE, hints=("rescue",))
+    }
+    
     def get_supported_languages(self) -> List[str]:
         return ["ruby"]
     
@@ -42,40 +49,45 @@ class RubyPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # RUBY_001: N+1 Query
-        if re.search(r'\.each\s+do.*?\.find|\.where', code, re.DOTALL):
+        if rules.found("RUBY_001"):
             issues.append(Issue(
                 title="Potencial N+1 Query detectado",
                 description=self.get_rules()["RUBY_001"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="performance",
                 impact="Múltiplas queries desnecessárias",
-                recommendation="Use .includes() ou .eager_load()"
+                recommendation="Use .includes() ou .eager_load()",
+                rule_id="RUBY_001"
             ))
         
         # RUBY_002: Mass assignment
-        if re.search(r'create\(params\[|\bnew\(params\[', code):
+        if rules.found("RUBY_002"):
             issues.append(Issue(
                 title="Mass assignment sem proteção",
                 description=self.get_rules()["RUBY_002"]["description"],
                 severity=SeverityLevel.CRITICAL,
                 category="security",
                 impact="Atributos não autorizados podem ser modificados",
-                recommendation="Use strong parameters ou attr_accessible"
+                recommendation="Use strong parameters ou attr_accessible",
+                rule_id="RUBY_002"
             ))
         
         # RUBY_003: Rescue genérico
-        if re.search(r'\brescue\s*$', code, re.MULTILINE):
+        if rules.found("RUBY_003"):
             issues.append(Issue(
                 title="Rescue sem especificar exceção",
                 description=self.get_rules()["RUBY_003"]["description"],
                 severity=SeverityLevel.MEDIUM,
                 category="error-handling",
                 impact="Pode capturar exceções inesperadas",
-                recommendation="Especificar exceção: rescue StandardError"
+                recommendation="Especificar exceção: rescue StandardError",
+                rule_id="RUBY_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
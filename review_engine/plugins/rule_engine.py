@@ -0,0 +1,163 @@
+"""
+Rule Engine - FASE 2
+Regras regex pré-compiladas uma única vez por classe de plugin,
+com pré-filtro por literais obrigatórios antes de rodar o regex
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from review_engine.core.line_index import LineIndex
+
+
+# Caracteres que o re.IGNORECASE casa com letras ASCII mas que lower()
+# não converte nelas (ex.: "ſ" casa com "s"); normalizados antes dos hints
+_IGNORECASE_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+def fold_case(code: str) -> str:
+    """Minúsculas compatíveis com re.IGNORECASE para checagem de hints"""
+    if not code.isascii():
+        code = code.translate(_IGNORECASE_FOLD)
+    return code.lower()
+
+
+@dataclass(frozen=True)
+class RulePattern:
+    """
+    Padrão de uma regra de plugin
+
+    regex: expressão regular da regra
+    flags: flags do módulo re (IGNORECASE, MULTILINE, DOTALL...)
+    hints: literais dos quais ao menos um precisa aparecer no código para
+           que o regex possa casar. Se nenhum aparece, o regex nem roda.
+           Com IGNORECASE os hints devem estar em minúsculas.
+           Desnecessário quando o regex já começa com literal (o re
+           faz essa busca sozinho).
+    find_all: True quando a regra precisa de todas as ocorrências (findall)
+    """
+    regex: str
+    flags: int = 0
+    hints: Tuple[str, ...] = ()
+    find_all: bool = False
+
+
+class RuleMatches:
+    """
+    Resultado de um scan: cada regra é avaliada no máximo uma vez,
+    sob demanda, e o resultado fica memorizado
+    """
+
+    def __init__(self, engine: "RuleEngine", code: str):
+        self._engine = engine
+        self._code = code
+        self._lowered: Optional[str] = None
+        self._lines: Optional[LineIndex] = None
+        self._results: Dict[str, object] = {}
+
+    @property
+    def lines(self) -> LineIndex:
+        """Índice de linhas do código (criado no primeiro uso)"""
+        if self._lines is None:
+            self._lines = LineIndex(self._code)
+        return self._lines
+
+    def _has_hint(self, rule: RulePattern) -> bool:
+        if not rule.hints:
+            return True
+        if rule.flags & re.IGNORECASE:
+            if self._lowered is None:
+                self._lowered = fold_case(self._code)
+            haystack = self._lowered
+        else:
+            haystack = self._code
+        return any(hint in haystack for hint in rule.hints)
+
+    def _evaluate(self, rule_id: str):
+        if rule_id in self._results:
+            return self._results[rule_id]
+
+        rule, compiled = self._engine.get(rule_id)
+        if not self._has_hint(rule):
+            result = [] if rule.find_all else None
+        elif rule.find_all:
+            result = compiled.findall(self._code)
+        else:
+            result = compiled.search(self._code)
+
+        self._results[rule_id] = result
+        return result
+
+    def search(self, rule_id: str) -> Optional[re.Match]:
+        """Primeira ocorrência (regras sem find_all)"""
+        return self._evaluate(rule_id)
+
+    def findall(self, rule_id: str) -> List:
+        """Todas as ocorrências, no formato de re.findall (regras com find_all)"""
+        return self._evaluate(rule_id)
+
+    def matches(self, rule_id: str) -> List[re.Match]:
+        """Todas as ocorrências como Match, quando a posição é necessária"""
+        key = f"{rule_id}:matches"
+        if key not in self._results:
+            rule, compiled = self._engine.get(rule_id)
+            if self._has_hint(rule):
+                self._results[key] = list(compiled.finditer(self._code))
+            else:
+                self._results[key] = []
+        return self._results[key]
+
+    def found(self, rule_id: str) -> bool:
+        return bool(self._evaluate(rule_id))
+
+    def count(self, rule_id: str) -> int:
+        result = self._evaluate(rule_id)
+        if isinstance(result, list):
+            return len(result)
+        return 1 if result else 0
+
+    def span(self, rule_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Intervalo da primeira ocorrência da regra
+        Usa o regex da regra ou, para regras sem regex, o literal âncora
+        que aparece primeiro no código
+        """
+        if rule_id in self._engine.patterns:
+            rule = self._engine.patterns[rule_id]
+            match = self.search(rule_id) if not rule.find_all else next(iter(self.matches(rule_id)), None)
+            return match.span() if match else None
+
+        best = None
+        for literal in self._engine.anchors.get(rule_id, ()):
+            index = self._code.find(literal)
+            if index >= 0 and (best is None or index < best[0]):
+                best = (index, index + len(literal))
+        return best
+
+    def locate(self, rule_id: str) -> Optional[Tuple[int, int, str]]:
+        """(linha, coluna, trecho) da primeira ocorrência da regra"""
+        span = self.span(rule_id)
+        if span is None:
+            return None
+        line, column = self.lines.position(span[0])
+        return line, column, self.lines.excerpt(*span)
+
+
+class RuleEngine:
+    """Conjunto de regras compiladas de um plugin"""
+
+    def __init__(self, patterns: Dict[str, RulePattern],
+                 anchors: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.patterns = dict(patterns)
+        self.anchors = dict(anchors or {})
+        self._compiled = {
+            rule_id: re.compile(rule.regex, rule.flags)
+            for rule_id, rule in self.patterns.items()
+        }
+
+    def get(self, rule_id: str) -> Tuple[RulePattern, re.Pattern]:
+        return self.patterns[rule_id], self._compiled[rule_id]
+
+    def scan(self, code: str) -> RuleMatches:
+        """Prepara avaliação das regras sobre o código"""
+        return RuleMatches(self, code)
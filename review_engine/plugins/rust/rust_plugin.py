@@ -3,15 +3,24 @@ Rust Plugin - FASE 3
 Análise específica para linguagem Rust
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class RustPlugin(BasePlugin):
     """Plugin para análise de código Rust"""
     
+    PATTERNS = {
+        "RUST_001": RulePattern(r'unsafe\s*\{', find_all=True)
+    }
+    
+    ANCHORS = {
+        "RUST_002": (".clone()",),
+        "RUST_003": (".unwrap()",)
+    }
+    
     def get_supported_languages(self) -> List[str]:
         return ["rust"]
     
@@ -42,20 +51,26 @@ class RustPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # RUST_001: Unsafe sem documentação
-        unsafe_matches = re.finditer(r'unsafe\s*\{', code)
+        unsafe_matches = rules.matches("RUST_001")
         for match in unsafe_matches:
             line_start = code.rfind('\n', 0, match.start()) + 1
             prev_line = code[line_start:match.start()].strip()
             if not prev_line.startswith('//'):
+                line_number, column_number = rules.lines.position(match.start())
                 issues.append(Issue(
                     title="Unsafe block sem comentário",
                     description=self.get_rules()["RUST_001"]["description"],
                     severity=SeverityLevel.CRITICAL,
                     category="safety",
                     impact="Undefined behavior possível",
-                    recommendation="Adicionar comentário explicando necessidade do unsafe"
+                    recommendation="Adicionar comentário explicando necessidade do unsafe",
+                    line_number=line_number,
+                    column_number=column_number,
+                    original_code=rules.lines.line_text(line_number),
+                    rule_id="RUST_001"
                 ))
         
         # RUST_002: Clone excessivo
@@ -67,7 +82,8 @@ class RustPlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="performance",
                 impact="Alocações desnecessárias em heap",
-                recommendation="Considerar usar referências (&) em vez de clones"
+                recommendation="Considerar usar referências (&) em vez de clones",
+                rule_id="RUST_002"
             ))
         
         # RUST_003: Unwrap perigoso
@@ -78,9 +94,11 @@ class RustPlugin(BasePlugin):
                 severity=SeverityLevel.HIGH,
                 category="error-handling",
                 impact="Pode causar panic em produção",
-                recommendation="Usar .expect() com mensagem ou match para tratar Result/Option"
+                recommendation="Usar .expect() com mensagem ou match para tratar Result/Option",
+                rule_id="RUST_003"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
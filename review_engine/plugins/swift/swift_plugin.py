@@ -3,15 +3,28 @@ Swift Plugin - FASE 3
 Análise específica para Swift
 """
 from typing import List, Dict
-import re
 
 from review_engine.plugins.base_plugin import BasePlugin
+from review_engine.plugins.rule_engine import RulePattern
 from review_engine.core.dto import ReviewResult, Issue, Metrics, SeverityLevel
 
 
 class SwiftPlugin(BasePlugin):
     """Plugin para análise de código Swift"""
     
+    PATTERNS = {
+        "SWIFT_001": RulePattern(r'\w+!(?!\s*=)', hints=("!",), find_all=True),
+        "SWIFT_002": RulePattern(r'\{[^}]*\bself\.[^}]*\}', hints=("self.",), find_all=True),
+        "SWIFT_002_WEAK": RulePattern(r'\[weak self\]|\[unowned self\]', hints=("self]",), find_all=True),
+        "SWIFT_004": RulePattern(r'var\s+\w+\s*:\s*\w+!', hints=("!",))
+    }
+    
+    ANCHORS = {
+        "SWIFT_003": ("class ",)
+    }
+    
+    FILE_SCOPE_RULES = ("SWIFT_003",)
+    
     def get_supported_languages(self) -> List[str]:
         return ["swift"]
     
@@ -49,9 +62,10 @@ class SwiftPlugin(BasePlugin):
     
     def analyze(self, code: str, language: str) -> ReviewResult:
         issues = []
+        rules = self.scan(code)
         
         # SWIFT_001: Force unwrap
-        force_unwrap_count = len(re.findall(r'\w+!(?!\s*=)', code))
+        force_unwrap_count = rules.count("SWIFT_001")
         if force_unwrap_count > 3:
             issues.append(Issue(
                 title=f"Force unwrap excessivo ({force_unwrap_count}x)",
@@ -59,20 +73,20 @@ class SwiftPlugin(BasePlugin):
                 severity=SeverityLevel.CRITICAL,
                 category="safety",
                 impact="Crash potencial em produção",
-                recommendation="Usar if let, guard let ou optional chaining (?)"
+                recommendation="Usar if let, guard let ou optional chaining (?)",
+                rule_id="SWIFT_001"
             ))
         
         # SWIFT_002: Retain cycle
-        closure_with_self = re.findall(r'\{[^}]*\bself\.[^}]*\}', code)
-        weak_self_closures = re.findall(r'\[weak self\]|\[unowned self\]', code)
-        if len(closure_with_self) > len(weak_self_closures):
+        if rules.count("SWIFT_002") > rules.count("SWIFT_002_WEAK"):
             issues.append(Issue(
                 title="Possível retain cycle em closure",
                 description=self.get_rules()["SWIFT_002"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="memory",
                 impact="Memory leak",
-                recommendation="Adicionar [weak self] ou [unowned self] em closures"
+                recommendation="Adicionar [weak self] ou [unowned self] em closures",
+                rule_id="SWIFT_002"
             ))
         
         # SWIFT_003: Class vs Struct
@@ -83,20 +97,23 @@ class SwiftPlugin(BasePlugin):
                 severity=SeverityLevel.MEDIUM,
                 category="performance",
                 impact="Alocação em heap desnecessária",
-                recommendation="Considerar usar struct para value types"
+                recommendation="Considerar usar struct para value types",
+                rule_id="SWIFT_003"
             ))
         
         # SWIFT_004: Implicitly unwrapped
-        if re.search(r'var\s+\w+\s*:\s*\w+!', code):
+        if rules.found("SWIFT_004"):
             issues.append(Issue(
                 title="Implicitly unwrapped optional detectado",
                 description=self.get_rules()["SWIFT_004"]["description"],
                 severity=SeverityLevel.HIGH,
                 category="safety",
                 impact="Crash se valor for nil",
-                recommendation="Usar optional regular (?) ou inicializar valor"
+                recommendation="Usar optional regular (?) ou inicializar valor",
+                rule_id="SWIFT_004"
             ))
         
+        self.locate_issues(issues, rules)
         quality_score = self.calculate_quality_score(issues)
         
         metrics = Metrics(
@@ -0,0 +1,14 @@
+"""Resilience module initialization"""
+from .breaker import CircuitBreaker, CircuitOpenError
+from .deadline import Deadline, DeadlineExceeded, watch_disconnect
+from .caller import ResilientCaller, RetryPolicy, HedgePolicy, is_retryable
+from .admission import AdmissionController, AdmissionRejected, Ticket
+from .rate_limit import (RateLimiter, RateLimitExhausted, TokenBucket, create_with_headers,
+                         create_with_headers_async)
+
+__all__ = ['CircuitBreaker', 'CircuitOpenError',
+           'Deadline', 'DeadlineExceeded', 'watch_disconnect',
+           'ResilientCaller', 'RetryPolicy', 'HedgePolicy', 'is_retryable',
+           'RateLimiter', 'RateLimitExhausted', 'TokenBucket', 'create_with_headers',
+           'create_with_headers_async',
+           'AdmissionController', 'AdmissionRejected', 'Ticket']
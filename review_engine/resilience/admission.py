@@ -0,0 +1,247 @@
+"""
+Admission Control - Filas por prioridade e descarte de carga nas análises
+Usuários interativos e jobs de CI disputam as mesmas threads do servidor;
+sem controle, todos esperam igualmente na fila de sockets do gunicorn.
+Aqui cada análise pega um slot, esperando na fila da sua prioridade; com
+a espera medida alta, a prioridade baixa cai para análise só estática ou
+é recusada (503 + Retry-After)
+"""
+import os
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from review_engine.resilience.deadline import Deadline
+
+
+logger = logging.getLogger(__name__)
+
+# Prioridades em ordem: a primeira nunca é degradada pela espera medida
+LANES = ("interactive", "batch")
+
+# Esperas recentes por fila usadas no p95 exposto em stats()
+WAIT_SAMPLES = 256
+
+
+class AdmissionRejected(RuntimeError):
+    """Análise recusada por sobrecarga (HTTP 503); retry_after em segundos"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """
+    Resultado da admissão: slot ocupado (release() ao terminar) ou
+    degradado (roda só a análise estática, sem slot)
+    """
+
+    def __init__(self, controller: Optional["AdmissionController"], lane: str,
+                 degraded: bool = False, wait: float = 0.0, reason: Optional[str] = None):
+        self._controller = controller
+        self.lane = lane
+        self.degraded = degraded
+        self.wait = wait
+        self.reason = reason
+        self._released = degraded or controller is None
+
+    def release(self):
+        """Devolve o slot (idempotente)"""
+        if self._released:
+            return
+        self._released = True
+        self._controller._release()
+
+    def to_dict(self) -> dict:
+        return {
+            "lane": self.lane,
+            "degraded": self.degraded,
+            "queueMs": round(self.wait * 1000, 1),
+            "reason": self.reason
+        }
+
+
+class _Waiter:
+    def __init__(self):
+        self.event = threading.Event()
+        self.enqueued = time.monotonic()
+        self.granted = False
+
+
+class _Lane:
+    """Fila e contadores de uma prioridade"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.queue: Deque[_Waiter] = deque()
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.wait_ewma = 0.0
+        self.admitted = 0
+        self.degraded = 0
+        self.shed = 0
+
+    def observe(self, wait: float, alpha: float = 0.2):
+        self.waits.append(wait)
+        self.wait_ewma += alpha * (wait - self.wait_ewma)
+
+    def p95(self) -> float:
+        if not self.waits:
+            return 0.0
+        ordered = sorted(self.waits)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+class AdmissionController:
+    """
+    Slots de análise com filas limitadas por prioridade (LANES)
+
+    - Slot livre e ninguém na fila: entra direto
+    - Senão espera na fila da prioridade; o slot liberado vai para o
+      primeiro da fila mais prioritária (FIFO dentro da fila)
+    - Prioridade baixa, com espera estimada (média móvel das esperas ou
+      idade do mais antigo à frente) >= degrade_wait ou fila cheia: roda
+      só estática, sem slot; >= shed_wait: 503 com Retry-After
+    - Prioridade alta com fila cheia: 503
+    - Ninguém espera além do prazo da requisição (nem, na prioridade baixa,
+      além de degrade_wait): ao desistir da fila, degrada
+    A fila real também é limitada pelas threads do servidor (--threads).
+    """
+
+    def __init__(self, enabled: bool = True,
+                 max_concurrency: int = 4,
+                 queue_limits: Optional[Dict[str, int]] = None,
+                 degrade_wait: float = 2.0,
+                 shed_wait: float = 10.0):
+        self.enabled = enabled
+        self.max_concurrency = max(1, max_concurrency)
+        self.degrade_wait = degrade_wait
+        self.shed_wait = shed_wait
+        limits = {"interactive": 4, "batch": 2, **(queue_limits or {})}
+        self._lanes: List[_Lane] = [_Lane(name, limits[name]) for name in LANES]
+        self.running = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """
+        ADMISSION_ENABLED (default true), ADMISSION_MAX_CONCURRENCY,
+        ADMISSION_QUEUE_INTERACTIVE, ADMISSION_QUEUE_BATCH,
+        ADMISSION_DEGRADE_WAIT_SECONDS, ADMISSION_SHED_WAIT_SECONDS
+        """
+        return cls(
+            enabled=os.getenv("ADMISSION_ENABLED", "true").lower() == "true",
+            max_concurrency=int(os.getenv("ADMISSION_MAX_CONCURRENCY", "4")),
+            queue_limits={
+                "interactive": int(os.getenv("ADMISSION_QUEUE_INTERACTIVE", "4")),
+                "batch": int(os.getenv("ADMISSION_QUEUE_BATCH", "2")),
+            },
+            degrade_wait=float(os.getenv("ADMISSION_DEGRADE_WAIT_SECONDS", "2.0")),
+            shed_wait=float(os.getenv("ADMISSION_SHED_WAIT_SECONDS", "10.0"))
+        )
+
+    def _lane(self, name: str) -> Tuple[int, _Lane]:
+        for index, lane in enumerate(self._lanes):
+            if lane.name == name:
+                return index, lane
+        raise ValueError(f"Prioridade inválida: {name!r} (use {', '.join(LANES)})")
+
+    def _queue_delay(self, index: int, now: float) -> float:
+        """Espera estimada na fila index: média das esperas ou o mais antigo à frente"""
+        delay = self._lanes[index].wait_ewma
+        for lane in self._lanes[:index + 1]:
+            if lane.queue:
+                delay = max(delay, now - lane.queue[0].enqueued)
+        return delay
+
+    def admit(self, lane: str, deadline: Optional[Deadline] = None) -> Ticket:
+        """Slot para a análise, Ticket degradado ou AdmissionRejected"""
+        if not self.enabled:
+            return Ticket(None, lane)
+        index, current = self._lane(lane)
+        low_priority = index > 0
+        now = time.monotonic()
+        with self._lock:
+            waiting = any(queued.queue for queued in self._lanes)
+            if self.running < self.max_concurrency and not waiting:
+                self.running += 1
+                current.admitted += 1
+                current.observe(0.0)
+                return Ticket(self, lane)
+
+            delay = self._queue_delay(index, now)
+            full = len(current.queue) >= current.limit
+            if low_priority and delay >= self.shed_wait:
+                current.shed += 1
+                raise AdmissionRejected(f"sobrecarga: espera estimada {delay:.1f}s", delay)
+            if low_priority and (full or delay >= self.degrade_wait):
+                current.degraded += 1
+                return Ticket(self, lane, degraded=True,
+                              reason="queue_full" if full else "queue_wait")
+            if full:
+                current.shed += 1
+                raise AdmissionRejected(f"fila {lane} cheia ({current.limit})", max(delay, 1.0))
+            waiter = _Waiter()
+            current.queue.append(waiter)
+
+        timeout = self.degrade_wait - delay if low_priority else None
+        unregister = lambda: None  # noqa: E731
+        if deadline is not None:
+            # Cliente desconectado/prazo cancelado: sai da fila na hora
+            timeout = deadline.bound(timeout)
+            unregister = deadline.on_cancel(waiter.event.set)
+        waiter.event.wait(timeout)
+        unregister()
+
+        with self._lock:
+            wait = time.monotonic() - waiter.enqueued
+            current.observe(wait)
+            if waiter.granted:
+                current.admitted += 1
+                return Ticket(self, lane, wait=wait)
+            current.queue.remove(waiter)
+            current.degraded += 1
+        reason = deadline.cause() if deadline is not None and deadline.expired() else "queue_timeout"
+        logger.info(f"Análise {lane} saiu da fila após {wait:.2f}s ({reason}): só estática")
+        return Ticket(self, lane, degraded=True, wait=wait, reason=reason)
+
+    def _release(self):
+        """Slot liberado vai direto para o próximo da fila mais prioritária"""
+        with self._lock:
+            for lane in self._lanes:
+                if lane.queue:
+                    waiter = lane.queue.popleft()
+                    waiter.granted = True
+                    waiter.event.set()
+                    return
+            self.running -= 1
+
+    def stats(self) -> dict:
+        """Profundidade das filas e esperas (métricas para autoscaling)"""
+        now = time.monotonic()
+        with self._lock:
+            lanes = {
+                lane.name: {
+                    "queued": len(lane.queue),
+                    "queueLimit": lane.limit,
+                    "admitted": lane.admitted,
+                    "degraded": lane.degraded,
+                    "shed": lane.shed,
+                    "waitEwmaMs": round(lane.wait_ewma * 1000, 1),
+                    "waitP95Ms": round(lane.p95() * 1000, 1),
+                    "queueDelayMs": round(self._queue_delay(index, now) * 1000, 1)
+                }
+                for index, lane in enumerate(self._lanes)
+            }
+            return {
+                "enabled": self.enabled,
+                "running": self.running,
+                "maxConcurrency": self.max_concurrency,
+                "queued": sum(len(lane.queue) for lane in self._lanes),
+                "degradeWaitSeconds": self.degrade_wait,
+                "shedWaitSeconds": self.shed_wait,
+                "lanes": lanes
+            }
@@ -0,0 +1,157 @@
+"""
+Circuit Breaker - Corta chamadas ao Groq quando ele está degradado
+Com a API fora do ar cada requisição esperaria o timeout inteiro; com o
+circuito aberto as análises seguem só com os plugins até o cooldown
+"""
+import os
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Chamada recusada sem ir ao upstream: circuito aberto"""
+
+
+class CircuitBreaker:
+    """
+    Circuito por taxa de falhas em janela deslizante
+
+    Estados:
+        closed    - chamadas normais; abre quando, nos últimos window
+                    segundos, houve min_calls chamadas e falhas >= failure_rate
+        open      - recusa chamadas por cooldown segundos
+        half_open - libera uma chamada de teste: sucesso fecha, falha reabre
+    Só falhas transitórias (timeout, 429, 5xx) contam como falha.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, enabled: bool = True,
+                 failure_rate: float = 0.5,
+                 min_calls: int = 10,
+                 window: float = 30.0,
+                 cooldown: float = 15.0):
+        self.enabled = enabled
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._lock = threading.Lock()
+
+        self.trips = 0
+        self.short_circuits = 0
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """
+        GROQ_BREAKER_ENABLED (default true), GROQ_BREAKER_FAILURE_RATE,
+        GROQ_BREAKER_MIN_CALLS, GROQ_BREAKER_WINDOW_SECONDS, GROQ_BREAKER_COOLDOWN_SECONDS
+        """
+        return cls(
+            enabled=os.getenv("GROQ_BREAKER_ENABLED", "true").lower() == "true",
+            failure_rate=float(os.getenv("GROQ_BREAKER_FAILURE_RATE", "0.5")),
+            min_calls=int(os.getenv("GROQ_BREAKER_MIN_CALLS", "10")),
+            window=float(os.getenv("GROQ_BREAKER_WINDOW_SECONDS", "30")),
+            cooldown=float(os.getenv("GROQ_BREAKER_COOLDOWN_SECONDS", "15"))
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def is_open(self) -> bool:
+        """Circuito recusaria a chamada agora (sem consumir a chamada de teste)"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.cooldown
+            return self._state == self.HALF_OPEN and self._probing
+
+    def allow(self) -> bool:
+        """Libera (True) ou recusa uma chamada; em half_open, só a de teste passa"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self.short_circuits += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    self.short_circuits += 1
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, success: bool):
+        """Resultado de uma chamada liberada por allow()"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._state = self.CLOSED
+                    logger.info("Circuito Groq fechado: chamada de teste bem-sucedida")
+                else:
+                    self._open(now)
+                return
+            if self._state == self.OPEN:
+                return
+
+            self._outcomes.append((now, success))
+            if not success:
+                self._failures += 1
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                _, ok = self._outcomes.popleft()
+                if not ok:
+                    self._failures -= 1
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+                logger.warning(f"Circuito Groq aberto: {self._failures}/{calls} falhas "
+                               f"nos últimos {self.window:.0f}s")
+                self._open(now)
+
+    def release(self):
+        """Chamada liberada e abandonada sem resultado (ex.: cancelada)"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+
+    def _open(self, now: float):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._failures = 0
+        self.trips += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "enabled": self.enabled,
+                "state": self._state,
+                "failureRate": round(self._failures / calls, 4) if calls else 0.0,
+                "windowCalls": calls,
+                "trips": self.trips,
+                "shortCircuits": self.short_circuits
+            }
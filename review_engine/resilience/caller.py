@@ -0,0 +1,418 @@
+"""
+Resilient Caller - Retry, deadline e hedging das chamadas ao Groq
+Cada chamada recebe um prazo total; falhas transitórias são repetidas com
+backoff exponencial limitado e jitter enquanto couber no prazo, passando
+pelo CircuitBreaker. Com hedging, uma segunda chamada idêntica sai quando
+a primeira passa do p95 de latência observado e vale a que terminar antes.
+"""
+import os
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, InvalidStateError, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+from review_engine.resilience.breaker import CircuitBreaker, CircuitOpenError
+from review_engine.resilience.deadline import Deadline, DeadlineExceeded
+from review_engine.resilience.rate_limit import RateLimitExhausted
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status HTTP que valem nova tentativa (timeout, conflito, rate limit)
+RETRYABLE_STATUS = (408, 409, 429)
+
+# Segundos restantes do prazo da requisição abaixo dos quais a falha é dela
+ABANDON_SLACK = 0.01
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Falha transitória do upstream: timeout, conexão, 408/409/429 ou 5xx
+    Erros do SDK são reconhecidos pelo status_code/nome, sem importar groq
+    """
+    if isinstance(error, (DeadlineExceeded, CircuitOpenError)):
+        return False
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+    name = type(error).__name__
+    return (isinstance(error, (TimeoutError, ConnectionError))
+            or "Timeout" in name or "Connection" in name)
+
+
+def _retry_after(error: BaseException) -> float:
+    """Header retry-after (segundos) de respostas 429/503, se houver"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    try:
+        return float(headers.get("retry-after", 0)) if headers is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class RetryPolicy:
+    """
+    Tentativas e backoff: espera aleatória em [0, min(max_delay, base_delay * 2^n)]
+    (full jitter), ou o retry-after do upstream se maior; deadline limita a
+    chamada inteira, incluindo as esperas
+    """
+
+    def __init__(self, max_attempts: int = 3,
+                 base_delay: float = 0.25,
+                 max_delay: float = 4.0,
+                 deadline: float = 30.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._random = random.Random()
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """GROQ_RETRY_MAX_ATTEMPTS, GROQ_RETRY_BASE_DELAY, GROQ_RETRY_MAX_DELAY, GROQ_DEADLINE_SECONDS"""
+        return cls(
+            max_attempts=int(os.getenv("GROQ_RETRY_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("GROQ_RETRY_BASE_DELAY", "0.25")),
+            max_delay=float(os.getenv("GROQ_RETRY_MAX_DELAY", "4.0")),
+            deadline=float(os.getenv("GROQ_DEADLINE_SECONDS", "30"))
+        )
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Espera antes da tentativa attempt + 1 (attempt começa em 1)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = self._random.uniform(0, ceiling)
+        return max(delay, _retry_after(error)) if error is not None else delay
+
+
+class HedgePolicy:
+    """
+    Hedging: segunda chamada quando a primeira passa do quantil de latência
+    Desligado por padrão (dobra o custo das chamadas lentas); max_fraction
+    limita a proporção de chamadas com hedge para não amplificar uma
+    degradação geral do upstream
+    """
+
+    def __init__(self, enabled: bool = False,
+                 quantile: float = 0.95,
+                 min_samples: int = 20,
+                 max_fraction: float = 0.1,
+                 window: int = 200):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.max_fraction = max_fraction
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        """GROQ_HEDGE_ENABLED (default false), GROQ_HEDGE_QUANTILE, GROQ_HEDGE_MAX_FRACTION"""
+        return cls(
+            enabled=os.getenv("GROQ_HEDGE_ENABLED", "false").lower() == "true",
+            quantile=float(os.getenv("GROQ_HEDGE_QUANTILE", "0.95")),
+            max_fraction=float(os.getenv("GROQ_HEDGE_MAX_FRACTION", "0.1"))
+        )
+
+    def observe(self, seconds: float):
+        """Latência de uma chamada bem-sucedida"""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self) -> Optional[float]:
+        """Espera antes do hedge (quantil observado), ou None sem amostras suficientes"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+
+
+class ResilientCaller:
+    """
+    Executa request(timeout) com circuit breaker, retry e hedging
+
+    request recebe os segundos restantes do prazo e os repassa ao SDK
+    (parâmetro timeout de chat.completions.create). Falhas não transitórias
+    (ex.: 400) sobem na primeira tentativa e não contam para o breaker.
+    """
+
+    def __init__(self, retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 hedge: Optional[HedgePolicy] = None):
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge or HedgePolicy()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+        self.abandoned = 0  # requisição cancelada/sem prazo no meio da tentativa
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_env(cls) -> "ResilientCaller":
+        return cls(RetryPolicy.from_env(), CircuitBreaker.from_env(), HedgePolicy.from_env())
+
+    def call(self, request: Callable[[float], T], timeout: Optional[float] = None,
+             hedge: bool = True, request_deadline: Optional[Deadline] = None) -> T:
+        """
+        Args:
+            timeout: Prazo total em segundos (default retry.deadline)
+            hedge: False para chamadas que não podem ser duplicadas (stream)
+            request_deadline: Prazo/cancelamento da requisição HTTP; limita o
+                              timeout e, se cancelado, libera o chamador na hora
+                              (a chamada HTTP síncrona segue até o timeout do SDK)
+        """
+        deadline = time.monotonic() + self._limit(timeout, request_deadline)
+        self._count("calls")
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._count("deadline_exceeded")
+                raise DeadlineExceeded("prazo da chamada Groq esgotado")
+            self._admit()
+            attempt += 1
+            self._count("attempts")
+            try:
+                result = self._attempt(request, remaining, hedge, request_deadline)
+            except Exception as e:
+                self._abandon(request_deadline)
+                delay = self._on_failure(e, attempt, deadline)
+                if delay is None:
+                    raise
+                if request_deadline is not None:
+                    if request_deadline.wait(delay):
+                        raise DeadlineExceeded("requisição cancelada") from e
+                else:
+                    time.sleep(delay)
+                continue
+            self.breaker.record(True)
+            return result
+
+    async def call_async(self, request: Callable[[float], Awaitable[T]],
+                         timeout: Optional[float] = None, hedge: bool = True,
+                         request_deadline: Optional[Deadline] = None) -> T:
+        """
+        Versão asyncio de call(); o hedge perdedor é cancelado (o cancelamento
+        da requisição chega como cancelamento da task do chamador)
+        """
+        import asyncio  # import tardio: api/index.py só usa call() (cold start)
+        deadline = time.monotonic() + self._limit(timeout, request_deadline)
+        self._count("calls")
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._count("deadline_exceeded")
+                raise DeadlineExceeded("prazo da chamada Groq esgotado")
+            self._admit()
+            attempt += 1
+            self._count("attempts")
+            try:
+                result = await self._attempt_async(request, remaining, hedge)
+            except asyncio.CancelledError:
+                # Chamador desistiu: sem resultado para o circuito
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self._abandon(request_deadline)
+                delay = self._on_failure(e, attempt, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record(True)
+            return result
+
+    def _limit(self, timeout: Optional[float], request_deadline: Optional[Deadline]) -> float:
+        limit = timeout if timeout is not None else self.retry.deadline
+        if request_deadline is not None:
+            limit = request_deadline.bound(limit)
+        return limit
+
+    def _abandon(self, request_deadline: Optional[Deadline]):
+        """
+        Prazo da requisição esgotado/cancelado: a tentativa foi abandonada
+        pelo chamador e não diz nada sobre o upstream (não conta no circuito)
+        """
+        remaining = request_deadline.remaining() if request_deadline is not None else None
+        # Folga: a espera limitada pelo prazo retorna um instante antes dele
+        if remaining is not None and remaining <= ABANDON_SLACK:
+            self.breaker.release()
+            self._count("abandoned")
+            raise DeadlineExceeded(f"requisição encerrada durante a chamada Groq "
+                                   f"({request_deadline.cause()})")
+
+    def _admit(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError("circuito Groq aberto")
+
+    def _on_failure(self, error: Exception, attempt: int, deadline: float) -> Optional[float]:
+        """Espera antes da próxima tentativa, ou None para propagar o erro"""
+        if isinstance(error, RateLimitExhausted):
+            # Recusada pela cota local, sem ir ao upstream: nada para o circuito
+            self.breaker.release()
+            return None
+        transient = is_retryable(error)
+        if transient or isinstance(error, DeadlineExceeded):
+            # Prazo estourado dentro da tentativa também indica upstream lento
+            self.breaker.record(False)
+        else:
+            # Erro do pedido (ex.: 400): nem falha nem sucesso para o circuito
+            self.breaker.release()
+        self._count("failures")
+        if isinstance(error, DeadlineExceeded):
+            self._count("deadline_exceeded")
+        if not transient or attempt >= self.retry.max_attempts:
+            return None
+        delay = self.retry.backoff(attempt, error)
+        if time.monotonic() + delay >= deadline:
+            return None
+        self._count("retries")
+        logger.warning(f"Chamada Groq falhou ({type(error).__name__}), tentativa "
+                       f"{attempt + 1}/{self.retry.max_attempts} em {delay:.2f}s")
+        return delay
+
+    def _hedge_delay(self, remaining: float) -> Optional[float]:
+        if not self.hedge.enabled:
+            return None
+        delay = self.hedge.delay()
+        if delay is None or delay >= remaining:
+            return None
+        with self._lock:
+            if self.hedges >= self.hedge.max_fraction * self.calls:
+                return None
+        return delay
+
+    def _attempt(self, request: Callable[[float], T], remaining: float, hedge: bool,
+                 request_deadline: Optional[Deadline] = None) -> T:
+        delay = self._hedge_delay(remaining) if hedge else None
+        started = time.monotonic()
+        if delay is None and request_deadline is None:
+            result = request(remaining)
+            self.hedge.observe(time.monotonic() - started)
+            return result
+
+        # Chamada síncrona perdedora (ou abandonada por cancelamento) não tem
+        # como ser interrompida: segue até o timeout do SDK e é descartada
+        pool = self._executor()
+        first = pool.submit(request, remaining)
+        pending = {first}
+        cancelled: Future = Future()
+        unregister = lambda: None  # noqa: E731
+        if request_deadline is not None:
+            unregister = request_deadline.on_cancel(lambda: _resolve(cancelled))
+        try:
+            if delay is not None:
+                done, _ = wait(pending | {cancelled}, timeout=delay, return_when=FIRST_COMPLETED)
+                if not done:
+                    self._count("hedges")
+                    pending.add(pool.submit(request, remaining - delay))
+            return self._first_result(pending, cancelled, first, started, remaining)
+        finally:
+            unregister()
+
+    def _first_result(self, pending: set, cancelled: Future, first: Future,
+                      started: float, remaining: float):
+        error: Optional[BaseException] = None
+        while pending:
+            left = remaining - (time.monotonic() - started)
+            done, _ = wait(pending | {cancelled}, timeout=max(left, 0), return_when=FIRST_COMPLETED)
+            if cancelled in done:
+                raise DeadlineExceeded("requisição cancelada durante a chamada Groq")
+            if not done:
+                raise DeadlineExceeded("prazo da chamada Groq esgotado")
+            pending -= done
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        self._count("hedge_wins")
+                    self.hedge.observe(time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _attempt_async(self, request: Callable[[float], Awaitable[T]],
+                             remaining: float, hedge: bool) -> T:
+        import asyncio
+        delay = self._hedge_delay(remaining) if hedge else None
+        started = time.monotonic()
+        first = asyncio.ensure_future(request(remaining))
+        pending = {first}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    self._count("hedges")
+                    pending.add(asyncio.ensure_future(request(remaining - delay)))
+            error: Optional[BaseException] = None
+            while pending:
+                left = remaining - (time.monotonic() - started)
+                done, pending = await asyncio.wait(pending, timeout=max(left, 0),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise DeadlineExceeded("prazo da chamada Groq esgotado")
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._count("hedge_wins")
+                        self.hedge.observe(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # Threads criadas sob demanda: hedges e chamadas com cancelamento
+                    self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="groq-call")
+        return self._pool
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict:
+        """Tentativas, retries, hedges e estado do circuito"""
+        with self._lock:
+            counters = {
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "failures": self.failures,
+                "deadlineExceeded": self.deadline_exceeded,
+                "abandoned": self.abandoned,
+                "hedges": self.hedges,
+                "hedgeWins": self.hedge_wins,
+            }
+        delay = self.hedge.delay()
+        return {
+            **counters,
+            "maxAttempts": self.retry.max_attempts,
+            "deadlineSeconds": self.retry.deadline,
+            "hedgeEnabled": self.hedge.enabled,
+            "hedgeDelaySeconds": round(delay, 3) if delay is not None else None,
+            "breaker": self.breaker.stats()
+        }
+
+
+def _resolve(future: Future):
+    try:
+        future.set_result(None)
+    except InvalidStateError:
+        pass
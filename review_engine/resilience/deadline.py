@@ -0,0 +1,130 @@
+"""
+Deadline - Prazo e cancelamento de uma requisição
+Criado na camada HTTP e repassado por detecção, plugin e chamada AI:
+cada etapa consulta o tempo restante e o engine devolve o melhor
+resultado parcial quando o prazo acaba ou o cliente desconecta
+"""
+import logging
+import select
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Prazo da chamada (todas as tentativas) esgotado ou requisição cancelada"""
+
+
+class Deadline:
+    """
+    Prazo absoluto (relógio monotônico) + cancelamento explícito
+
+    remaining() é None sem prazo; cancel() (ex.: cliente desconectou)
+    zera o tempo restante e dispara os callbacks de on_cancel
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.reason: Optional[str] = None  # motivo do cancelamento
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Segundos restantes (0 se esgotado ou cancelado), None sem prazo"""
+        if self._event.is_set():
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def cause(self) -> str:
+        """Motivo para gate_reason: "cancelled"/motivo do cancel() ou "deadline" """
+        return (self.reason or "cancelled") if self.cancelled else "deadline"
+
+    def bound(self, timeout: Optional[float]) -> Optional[float]:
+        """Menor entre timeout e o tempo restante"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def check(self, stage: str):
+        """DeadlineExceeded se não há mais tempo para a etapa"""
+        if self.expired():
+            raise DeadlineExceeded(f"prazo esgotado antes de {stage} ({self.cause()})")
+
+    def wait(self, seconds: float) -> bool:
+        """Dorme até seconds ou até o cancelamento; True se cancelado"""
+        return self._event.wait(seconds)
+
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        logger.info(f"Requisição cancelada ({reason})")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Callback de cancelamento falhou: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Registra callback (roda já se cancelado); retorna função que o remove"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return unregister
+        callback()
+        return lambda: None
+
+
+def watch_disconnect(sock: socket.socket, deadline: Deadline,
+                     interval: float = 0.5) -> Callable[[], None]:
+    """
+    Cancela o deadline quando o cliente fecha a conexão (EOF no socket)
+
+    Thread daemon que espia o socket da requisição (corpo já lido) até o
+    stop retornado ser chamado. Dados novos na conexão (pipelining)
+    encerram a vigilância sem cancelar.
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set() and not deadline.cancelled:
+            try:
+                readable, _, _ = select.select([sock], [], [], interval)
+                if not readable:
+                    continue
+                peek = sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                continue
+            except (OSError, ValueError):
+                peek = b""
+            if stop.is_set():
+                return
+            if not peek:
+                deadline.cancel("client_disconnected")
+            return
+
+    threading.Thread(target=run, name="disconnect-watch", daemon=True).start()
+    return stop.set
@@ -0,0 +1,404 @@
+"""
+Rate Limit - Agendador local da cota Groq por chave (requisições e tokens)
+O Groq limita cada chave em requisições e tokens por minuto; em vez de
+descobrir o limite com 429, cada chamada reserva a cota antes de sair
+(token bucket) e espera a sua vez na chave do pool que libera primeiro.
+Os headers x-ratelimit-* das respostas corrigem a estimativa local.
+"""
+import os
+import re
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, List, Mapping, Optional, Tuple, TypeVar
+
+from review_engine.resilience.deadline import Deadline, DeadlineExceeded
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Espera após um 429 sem retry-after/reset nos headers
+DEFAULT_BLOCK_SECONDS = 1.0
+
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+class RateLimitExhausted(RuntimeError):
+    """Nenhuma chave do pool terá cota dentro do prazo da chamada"""
+
+
+def parse_reset(value) -> Optional[float]:
+    """Duração dos headers retry-after/x-ratelimit-reset-* ("2m59.56s", "7.66s", "350ms", "3")"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    parts = _DURATION.findall(str(value))
+    if not parts:
+        return None
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+def _header_int(headers: Mapping, name: str) -> Optional[int]:
+    try:
+        value = headers.get(name)
+        return int(float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def create_with_headers(completions, **kwargs) -> Tuple[object, Optional[Mapping]]:
+    """
+    chat.completions.create com os headers da resposta (with_raw_response
+    do SDK); clientes sem with_raw_response devolvem headers None
+    """
+    raw_api = getattr(completions, "with_raw_response", None)
+    if raw_api is None:
+        return completions.create(**kwargs), None
+    raw = raw_api.create(**kwargs)
+    return raw.parse(), raw.headers
+
+
+async def create_with_headers_async(completions, **kwargs) -> Tuple[object, Optional[Mapping]]:
+    """Versão AsyncGroq de create_with_headers"""
+    raw_api = getattr(completions, "with_raw_response", None)
+    if raw_api is None:
+        return await completions.create(**kwargs), None
+    raw = await raw_api.create(**kwargs)
+    return await raw.parse(), raw.headers
+
+
+class TokenBucket:
+    """
+    Balde de capacity unidades por period segundos, reabastecido continuamente
+
+    O nível pode ficar negativo: cada reserva já agendada empurra a vez da
+    próxima, então as chamadas de uma chave saem em ordem de chegada.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.period = period
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Segundos até haver amount no balde (pedidos maiores que o balde esperam enchê-lo)"""
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        self.level -= amount
+        return amount
+
+    def give(self, amount: float, now: float):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def observe(self, limit: Optional[float], remaining: Optional[int], now: float):
+        """Cota informada pelo servidor: limite real (por period) e restante (prevalece se menor)"""
+        if limit:
+            self.capacity = float(limit)
+        self._refill(now)
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+
+class _KeyBudget:
+    """Baldes de requisições e tokens de uma chave + bloqueio após 429"""
+
+    def __init__(self, key: str, requests_per_minute: int, tokens_per_minute: int, period: float):
+        self.key = key
+        self.requests = TokenBucket(requests_per_minute, period)
+        self.tokens = TokenBucket(tokens_per_minute, period)
+        self.blocked_until = 0.0
+        self.calls = 0
+        self.rate_limited = 0
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now),
+                   self.blocked_until - now)
+
+
+class Lease:
+    """Cota reservada para uma chamada em uma chave (devolvida se a chamada não sair)"""
+
+    def __init__(self, key: Optional[str], tokens: float = 0.0, wait: float = 0.0,
+                 tracked: bool = True):
+        self.key = key
+        self.tokens = tokens
+        self.wait = wait
+        self.tracked = tracked
+
+
+class RateLimiter:
+    """
+    Agenda chamadas Groq dentro da cota de cada chave do pool
+
+    Cada chamada reserva 1 requisição + tokens estimados (prompt + max_tokens)
+    na chave que libera primeiro (empate: round-robin) e dorme até a sua vez;
+    se nenhuma chave libera dentro do prazo, RateLimitExhausted sem ir ao
+    upstream. Um 429 bloqueia a chave pelo retry-after e a chamada tenta
+    outra chave do pool. Cota por processo: com vários workers, divida os
+    limites (os headers do Groq corrigem o nível de qualquer forma).
+    """
+
+    def __init__(self, keys: List[str], enabled: bool = True,
+                 requests_per_minute: int = 30,
+                 tokens_per_minute: int = 6000,
+                 period: float = 60.0):
+        self.keys = list(keys)
+        self.enabled = enabled
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.period = period
+        self._budgets = [_KeyBudget(key, requests_per_minute, tokens_per_minute, period)
+                         for key in self.keys]
+        self._next = 0
+        self._lock = threading.Lock()
+
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.rejected = 0
+        self.failovers = 0
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str] = None) -> "RateLimiter":
+        """
+        GROQ_API_KEYS (chaves extras separadas por vírgula; api_key/GROQ_API_KEY
+        é a primeira), GROQ_RATE_LIMIT_ENABLED (default true), GROQ_RATE_RPM,
+        GROQ_RATE_TPM
+        """
+        primary = api_key or os.getenv("GROQ_API_KEY")
+        keys = [primary] if primary else []
+        for key in os.getenv("GROQ_API_KEYS", "").split(","):
+            key = key.strip()
+            if key and key not in keys:
+                keys.append(key)
+        return cls(
+            keys,
+            enabled=os.getenv("GROQ_RATE_LIMIT_ENABLED", "true").lower() == "true",
+            requests_per_minute=int(os.getenv("GROQ_RATE_RPM", "30")),
+            tokens_per_minute=int(os.getenv("GROQ_RATE_TPM", "6000"))
+        )
+
+    @property
+    def primary(self) -> Optional[str]:
+        return self.keys[0] if self.keys else None
+
+    def _reserve(self, tokens: int, timeout: Optional[float]) -> Lease:
+        """Reserva na chave que libera primeiro; RateLimitExhausted se nenhuma cabe no prazo"""
+        now = time.monotonic()
+        with self._lock:
+            count = len(self._budgets)
+            order = [(self._next + offset) % count for offset in range(count)]
+            waits = [(self._budgets[index].wait_time(tokens, now), index) for index in order]
+            wait, index = min(waits, key=lambda item: item[0])
+            if timeout is not None and wait > timeout:
+                self.rejected += 1
+                raise RateLimitExhausted(f"sem cota Groq nos próximos {timeout:.1f}s "
+                                         f"(próxima vaga em {wait:.1f}s)")
+            budget = self._budgets[index]
+            budget.requests.take(1, now)
+            taken = budget.tokens.take(tokens, now)
+            budget.calls += 1
+            self._next = (index + 1) % count
+            if wait > 0:
+                self.waits += 1
+                self.wait_seconds += wait
+        return Lease(budget.key, taken, wait)
+
+    def acquire(self, tokens: int, timeout: Optional[float] = None,
+                request_deadline: Optional[Deadline] = None) -> Lease:
+        """Reserva a cota e dorme até a vez da chamada (interrompido pelo cancelamento)"""
+        if not self.enabled or not self._budgets:
+            return Lease(self.primary, tracked=False)
+        lease = self._reserve(tokens, timeout)
+        if lease.wait > 0:
+            if request_deadline is not None:
+                if request_deadline.wait(lease.wait):
+                    self.refund(lease)
+                    raise DeadlineExceeded("requisição cancelada aguardando cota Groq")
+            else:
+                time.sleep(lease.wait)
+        return lease
+
+    async def acquire_async(self, tokens: int, timeout: Optional[float] = None) -> Lease:
+        """Versão asyncio de acquire(); cancelamento devolve a reserva"""
+        import asyncio  # import tardio: api/index.py só usa acquire() (cold start)
+        if not self.enabled or not self._budgets:
+            return Lease(self.primary, tracked=False)
+        lease = self._reserve(tokens, timeout)
+        if lease.wait > 0:
+            try:
+                await asyncio.sleep(lease.wait)
+            except asyncio.CancelledError:
+                self.refund(lease)
+                raise
+        return lease
+
+    def _budget(self, lease: Lease) -> Optional[_KeyBudget]:
+        if not lease.tracked:
+            return None
+        for budget in self._budgets:
+            if budget.key == lease.key:
+                return budget
+        return None
+
+    def refund(self, lease: Lease):
+        """Chamada que não saiu: devolve requisição e tokens reservados"""
+        budget = self._budget(lease)
+        if budget is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            budget.requests.give(1, now)
+            budget.tokens.give(lease.tokens, now)
+            budget.calls -= 1
+
+    def complete(self, lease: Lease, response, headers: Optional[Mapping] = None):
+        """Acerta a reserva com o usage da resposta e sincroniza com os headers"""
+        budget = self._budget(lease)
+        if budget is None:
+            return
+        usage = getattr(response, "usage", None)
+        used = getattr(usage, "total_tokens", None)
+        now = time.monotonic()
+        with self._lock:
+            if isinstance(used, int):
+                if used < lease.tokens:
+                    budget.tokens.give(lease.tokens - used, now)
+                else:
+                    budget.tokens.take(used - lease.tokens, now)
+            self._observe(budget, headers, now)
+
+    def failed(self, lease: Lease, error: BaseException) -> bool:
+        """Registra a falha da chamada; True se foi 429 (chave bloqueada até o reset)"""
+        budget = self._budget(lease)
+        if budget is None or getattr(error, "status_code", None) != 429:
+            return False
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        block = (parse_reset(headers.get("retry-after"))
+                 or parse_reset(headers.get("x-ratelimit-reset-tokens"))
+                 or DEFAULT_BLOCK_SECONDS)
+        now = time.monotonic()
+        with self._lock:
+            budget.rate_limited += 1
+            budget.blocked_until = max(budget.blocked_until, now + block)
+            self._observe(budget, headers, now)
+        logger.warning(f"Groq 429 na chave #{self.keys.index(budget.key) + 1}: "
+                       f"bloqueada por {block:.1f}s")
+        return True
+
+    def _observe(self, budget: _KeyBudget, headers: Optional[Mapping], now: float):
+        """Headers x-ratelimit-*: tokens por minuto e requisições (cota diária no Groq)"""
+        if not headers:
+            return
+        limit = _header_int(headers, "x-ratelimit-limit-tokens")  # por minuto
+        budget.tokens.observe(limit * budget.tokens.period / 60 if limit else None,
+                              _header_int(headers, "x-ratelimit-remaining-tokens"), now)
+        if _header_int(headers, "x-ratelimit-remaining-requests") == 0:
+            reset = parse_reset(headers.get("x-ratelimit-reset-requests")) or DEFAULT_BLOCK_SECONDS
+            budget.blocked_until = max(budget.blocked_until, now + reset)
+
+    def schedule(self, send: Callable[[Optional[str], float], Tuple[T, Optional[Mapping]]],
+                 tokens: int, request_deadline: Optional[Deadline] = None) -> Callable[[float], T]:
+        """
+        Tentativa para o ResilientCaller: espera a cota, chama send(chave,
+        timeout) -> (resposta, headers) e, em 429, tenta as outras chaves
+        """
+        def request(timeout: float) -> T:
+            started = time.monotonic()
+            error: Optional[BaseException] = None
+            for _ in range(max(1, len(self.keys))):
+                try:
+                    lease = self.acquire(tokens, timeout - (time.monotonic() - started),
+                                         request_deadline)
+                except RateLimitExhausted:
+                    if error is not None:
+                        raise error
+                    raise
+                try:
+                    response, headers = send(lease.key, timeout - (time.monotonic() - started))
+                except Exception as e:
+                    if not self.failed(lease, e) or len(self.keys) < 2:
+                        raise
+                    error = e
+                    self._count_failover()
+                    continue
+                self.complete(lease, response, headers)
+                return response
+            raise error
+        return request
+
+    def schedule_async(self, send: Callable[[Optional[str], float], Awaitable[Tuple[T, Optional[Mapping]]]],
+                       tokens: int) -> Callable[[float], Awaitable[T]]:
+        """Versão asyncio de schedule()"""
+        async def request(timeout: float) -> T:
+            started = time.monotonic()
+            error: Optional[BaseException] = None
+            for _ in range(max(1, len(self.keys))):
+                try:
+                    lease = await self.acquire_async(tokens, timeout - (time.monotonic() - started))
+                except RateLimitExhausted:
+                    if error is not None:
+                        raise error
+                    raise
+                try:
+                    response, headers = await send(lease.key, timeout - (time.monotonic() - started))
+                except Exception as e:
+                    if not self.failed(lease, e) or len(self.keys) < 2:
+                        raise
+                    error = e
+                    self._count_failover()
+                    continue
+                self.complete(lease, response, headers)
+                return response
+            raise error
+        return request
+
+    def _count_failover(self):
+        with self._lock:
+            self.failovers += 1
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            keys = []
+            for budget in self._budgets:
+                budget.requests._refill(now)
+                budget.tokens._refill(now)
+                keys.append({
+                    "calls": budget.calls,
+                    "rateLimited": budget.rate_limited,
+                    "requestsLeft": round(budget.requests.level, 1),
+                    "tokensLeft": round(budget.tokens.level),
+                    "tokensPerMinute": round(budget.tokens.capacity * 60 / budget.tokens.period),
+                    "blockedSeconds": round(max(0.0, budget.blocked_until - now), 2)
+                })
+            return {
+                "enabled": self.enabled,
+                "keys": len(self._budgets),
+                "requestsPerMinute": self.requests_per_minute,
+                "tokensPerMinute": self.tokens_per_minute,
+                "waits": self.waits,
+                "waitSeconds": round(self.wait_seconds, 2),
+                "rejected": self.rejected,
+                "failovers": self.failovers,
+                "perKey": keys
+            }
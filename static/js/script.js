@@ -15,6 +15,10 @@ let detectionTimer = null;
 // Instância do CodeMirror
 let codeEditor = null;
 
+// Backend sem /analyze/stream (ex.: api/index.py): após o primeiro 404/405,
+// as análises vão direto para /analyze sem reenviar o código
+let streamUnsupported = false;
+
 /**
  * Sistema de logging estruturado para Railway/Vercel
  */
@@ -506,25 +510,32 @@ async function analyzeCode() {
     '<i class="fas fa-spinner fa-spin"></i> <span class="btn-text">Analisando...</span>';
 
   try {
-    const response = await fetch(`${API_URL}/analyze`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify({ code: code, language: language }),
-    });
+    // Streaming primeiro (resultado do plugin aparece antes da IA terminar)
+    const streamed = !streamUnsupported && (await analyzeCodeStream(code, language));
+
+    if (!streamed) {
+      const response = await fetch(`${API_URL}/analyze`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-Review-Priority": "interactive",
+        },
+        body: JSON.stringify({ code: code, language: language }),
+      });
 
-    if (!response.ok) {
-      throw new Error(`Erro HTTP: ${response.status}`);
-    }
+      if (!response.ok) {
+        throw new Error(`Erro HTTP: ${response.status}`);
+      }
 
-    const result = await response.json();
+      const result = await response.json();
+
+      if (!result.success) {
+        throw new Error(result.error || "Erro desconhecido na análise");
+      }
 
-    if (!result.success) {
-      throw new Error(result.error || "Erro desconhecido na análise");
+      displayResults(result);
     }
 
-    displayResults(result);
     showToast("✅ Análise semântica concluída via IA!", "success");
   } catch (error) {
     logger.error("Erro na análise de código", error);
@@ -537,6 +548,98 @@ async function analyzeCode() {
   }
 }
 
+/**
+ * Análise via streaming (NDJSON, um evento por linha)
+ * Eventos: admission → detection → plugin → ai_issue (n) → result
+ * Retorna false se o backend não oferecer /analyze/stream (usa /analyze)
+ */
+async function analyzeCodeStream(code, language) {
+  const response = await fetch(`${API_URL}/analyze/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      "X-Review-Priority": "interactive",
+    },
+    body: JSON.stringify({ code: code, language: language }),
+  });
+
+  if (response.status === 404 || response.status === 405 || !response.body) {
+    logger.debug("Streaming indisponível, usando /analyze nas próximas análises");
+    streamUnsupported = true;
+    return false;
+  }
+
+  if (!response.ok) {
+    throw new Error(`Erro HTTP: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let partial = null;
+  let finished = false;
+
+  const handleEvent = (event) => {
+    switch (event.event) {
+      case "admission":
+        // Servidor sobrecarregado: análise só estática, sem IA
+        if (event.data?.degraded) {
+          logger.warn("Servidor sobrecarregado: análise sem IA", event.data);
+        }
+        break;
+      case "detection":
+        logger.debug("Linguagem detectada (stream)", event.data);
+        break;
+      case "plugin":
+        // Resultado estático: exibido imediatamente enquanto a IA processa
+        partial = event.data;
+        displayResults({ data: partial, model: "plugins" });
+        break;
+      case "ai_issue":
+        if (partial) {
+          partial.issues = partial.issues || [];
+          partial.issues.push(event.data);
+          partial.hasIssues = true;
+          displayIssues(partial.issues);
+          document.getElementById("issuesSection").style.display = "block";
+        }
+        break;
+      case "result":
+        displayResults({ data: event.data, model: "review-engine-v2.0" });
+        finished = true;
+        break;
+      case "error":
+        throw new Error(event.data?.error || "Erro desconhecido na análise");
+    }
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+
+    let newline;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) {
+        handleEvent(JSON.parse(line));
+      }
+    }
+  }
+
+  if (buffer.trim()) {
+    handleEvent(JSON.parse(buffer));
+  }
+
+  if (!finished) {
+    throw new Error("Análise interrompida antes do resultado final");
+  }
+
+  return true;
+}
+
 /**
  * Exibe os resultados da análise v4.0 (Groq API)
  */
@@ -746,6 +849,7 @@ function displayIssues(issues) {
             <div class="issue-title">
                 <i class="fas fa-exclamation-circle"></i>
                 <span>${issue.title}</span>
+                ${issue.lineNumber ? `<span class="issue-line">Linha ${issue.lineNumber}</span>` : ""}
                 <span class="issue-badge ${issue.severity}">${getSeverityLabel(
       issue.severity
     )}</span>
@@ -0,0 +1,149 @@
+"""
+Treino offline do classificador de tokens - FASE 1
+
+    python train_token_model.py
+    python train_token_model.py --evaluate /caminho/de/codigo
+
+Cada arquivo review_engine/detectors/corpus/<linguagem>.txt é dividido em blocos
+(separados por linha em branco); a contagem de um token é o número de
+blocos em que ele aparece. Os pesos log P(token | linguagem), com
+suavização de Laplace, são gravados quantizados em token_model.json.
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import review_engine.core  # noqa: E402,F401  (ordem de import do pacote)
+from review_engine.detectors.language_detector import LanguageDetector  # noqa: E402
+from review_engine.detectors.token_model import (  # noqa: E402
+    MODEL_FORMAT, MODEL_PATH, TokenModel, tokenize
+)
+
+CORPUS_DIR = MODEL_PATH.with_name("corpus")
+SCALE = 1000        # milinats: log-probabilidades até -32.7 cabem em int16
+ALPHA = 0.5         # suavização de Laplace
+MIN_COUNT = 2       # tokens vistos em menos blocos (somando linguagens) ficam de fora
+
+
+def load_corpus(corpus_dir: Path) -> Dict[str, List[str]]:
+    """Blocos de código por linguagem"""
+    corpus = {}
+    for path in sorted(corpus_dir.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        corpus[path.stem] = [block for block in text.split("\n\n") if block.strip()]
+    return corpus
+
+
+def train(corpus: Dict[str, List[str]]) -> dict:
+    counts = {
+        language: Counter(token for block in blocks for token in set(tokenize(block)))
+        for language, blocks in corpus.items()
+    }
+    totals = Counter()
+    for language_counts in counts.values():
+        totals.update(language_counts)
+    vocabulary = sorted(token for token, count in totals.items() if count >= MIN_COUNT)
+
+    weights = {}
+    for language, language_counts in counts.items():
+        denominator = sum(language_counts[token] for token in vocabulary) + ALPHA * len(vocabulary)
+        row = array("h", (
+            max(-32768, round(SCALE * math.log((language_counts[token] + ALPHA) / denominator)))
+            for token in vocabulary
+        ))
+        if sys.byteorder == "big":
+            row.byteswap()
+        weights[language] = base64.b64encode(row.tobytes()).decode("ascii")
+
+    return {
+        "format": MODEL_FORMAT,
+        "scale": SCALE,
+        "languages": sorted(corpus),
+        "vocabulary": vocabulary,
+        "weights": weights,
+    }
+
+
+def evaluate(model: TokenModel, paths: List[str], limit: int, max_chars: int) -> None:
+    """
+    Acurácia em arquivos reais rotulados pela extensão (amostra aleatória
+    de até `limit` por linguagem): modelo sozinho, detector completo e
+    apenas as heurísticas (palavras-chave/sintaxe)
+    """
+    with_model = LanguageDetector(use_model=True)
+    heuristics = LanguageDetector(use_model=False)
+    known = set(model.languages)
+    files: Dict[str, List[Path]] = {}
+    for root in paths:
+        for path in Path(root).rglob("*"):
+            language = heuristics._language_for_filename(path.name)
+            if language in known and path.is_file():
+                files.setdefault(language, []).append(path)
+
+    rng = random.Random(0)
+    print(f"{'linguagem':<12}{'arquivos':>9}{'modelo':>9}{'detector':>10}{'heurística':>12}")
+    overall = Counter()
+    elapsed = 0.0
+    for language in sorted(files):
+        sample = files[language] if len(files[language]) <= limit else rng.sample(files[language], limit)
+        hits = Counter()
+        for path in sample:
+            try:
+                code = path.read_text(encoding="utf-8")[:max_chars]
+            except (OSError, UnicodeDecodeError):
+                continue
+            if not code.strip():
+                continue
+            hits["files"] += 1
+            started = time.perf_counter()
+            result = model.classify(code)
+            elapsed += time.perf_counter() - started
+            hits["model"] += bool(result and result[0] == language)
+            hits["detector"] += with_model.detect(code).language == language
+            hits["heuristic"] += heuristics.detect(code).language == language
+        overall.update(hits)
+        _report(language, hits)
+    _report("total", overall)
+    if overall["files"]:
+        print(f"classificação: {elapsed / overall['files'] * 1e3:.3f} ms/arquivo")
+
+
+def _report(label: str, hits: Counter) -> None:
+    if hits["files"]:
+        files = hits["files"]
+        print(f"{label:<12}{files:>9}{hits['model'] / files:>9.1%}"
+              f"{hits['detector'] / files:>10.1%}{hits['heuristic'] / files:>12.1%}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Treina o classificador de tokens")
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR)
+    parser.add_argument("--output", type=Path, default=MODEL_PATH)
+    parser.add_argument("--evaluate", nargs="*", default=[],
+                        help="diretórios com código real para medir acurácia")
+    parser.add_argument("--limit", type=int, default=200, help="arquivos por linguagem")
+    parser.add_argument("--max-chars", type=int, default=LanguageDetector.MODEL_MAX_CHARS)
+    args = parser.parse_args(argv)
+
+    data = train(load_corpus(args.corpus))
+    args.output.write_text(json.dumps(data, separators=(",", ":")) + "\n", encoding="utf-8")
+    print(f"{len(data['languages'])} linguagens, {len(data['vocabulary'])} tokens → {args.output}")
+
+    if args.evaluate:
+        evaluate(TokenModel.load(args.output), args.evaluate, args.limit, args.max_chars)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())